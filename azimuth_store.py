@@ -0,0 +1,152 @@
+import csv
+import glob
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+STATUS_OK = 'ok'
+
+# Katalog, do którego trafiają pliki antenna_data_<id>.csv po migracji
+MIGRATED_CSV_DIR = 'antenna_data_csv'
+
+
+def parse_azimuths(value):
+    """
+    Zamienia zapisane azymuty (np. "120°, 240°") na liczby z zakresu 0-360.
+
+    Args:
+        value (str): Azymuty rozdzielone przecinkami.
+
+    Returns:
+        list: Azymuty w stopniach (float); niepoprawne wartości są pomijane.
+    """
+    azimuths = []
+    for az in value.split(','):
+        az = az.strip()
+        if not az:
+            continue
+        try:
+            azimuth_value = float(az.replace('°', ''))
+        except ValueError:
+            logging.debug(f"Nieprawidłowy format azymutu: {az}")
+            continue
+        if 0 <= azimuth_value <= 360:
+            azimuths.append(azimuth_value)
+    return azimuths
+
+
+class AzimuthStore:
+    """
+    Baza SQLite z azymutami wyekstrahowanymi z raportów PDF.
+
+    Jeden wiersz przypada na parę (StationId, PDF) i zawiera azymuty, status ekstrakcji
+    (STATUS_OK lub komunikat błędu), poziom ekstrakcji i czas zapisu. Zastępuje pliki
+    antenna_data_<StationId>.csv.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS azimuths ('
+                'station_id TEXT NOT NULL, pdf_file TEXT NOT NULL, azimuths TEXT, status TEXT, tier TEXT, '
+                'updated_at REAL, PRIMARY KEY (station_id, pdf_file))'
+            )
+            self._connection.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    def save_station(self, station_id, entries):
+        """
+        Zastępuje wyniki ekstrakcji dla stacji.
+
+        Args:
+            station_id (str): StationId.
+            entries (list): Słowniki z extract_information_for_stations.
+        """
+        now = time.time()
+        rows = []
+        for entry in entries:
+            if isinstance(entry['Azymuts'], list):
+                rows.append((station_id, entry['PDF File'], ', '.join(entry['Azymuts']), STATUS_OK, entry.get('Tier'), now))
+            else:
+                rows.append((station_id, entry['PDF File'], None, entry['Azymuts'], None, now))
+        with self._lock, self._connection:
+            self._connection.execute('DELETE FROM azimuths WHERE station_id = ?', (station_id,))
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO azimuths (station_id, pdf_file, azimuths, status, tier, updated_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)', rows
+            )
+        logging.info(f"Zapisano {len(rows)} wyników ekstrakcji dla StationId {station_id}")
+
+    def azimuths_for(self, station_ids):
+        """
+        Zwraca azymuty wielu stacji jednym zapytaniem.
+
+        Args:
+            station_ids (iterable): StationId.
+
+        Returns:
+            dict: StationId -> lista azymutów (float); stacje bez azymutów są pomijane.
+        """
+        station_ids = [str(station_id) for station_id in station_ids]
+        if not station_ids:
+            return {}
+        with self._lock:
+            rows = self._connection.execute(
+                'SELECT station_id, azimuths FROM azimuths '
+                'WHERE station_id IN (SELECT value FROM json_each(?)) AND status = ? ORDER BY station_id, pdf_file',
+                (json.dumps(station_ids), STATUS_OK)
+            ).fetchall()
+        result = {}
+        for station_id, azimuths in rows:
+            values = parse_azimuths(azimuths or '')
+            if values:
+                result.setdefault(station_id, []).extend(values)
+        return result
+
+    def migrate_csv_files(self, directory='.'):
+        """
+        Jednorazowo importuje pliki antenna_data_<StationId>.csv i przenosi je do MIGRATED_CSV_DIR.
+
+        Args:
+            directory (str): Katalog z plikami CSV.
+
+        Returns:
+            int: Liczba zaimportowanych plików.
+        """
+        with self._lock:
+            done = self._connection.execute("SELECT value FROM meta WHERE key = 'csv_migrated'").fetchone()
+        if done:
+            return 0
+
+        csv_files = glob.glob(os.path.join(directory, 'antenna_data_*.csv'))
+        imported = 0
+        for csv_file in csv_files:
+            station_id = os.path.basename(csv_file)[len('antenna_data_'):-len('.csv')]
+            try:
+                with open(csv_file, mode='r', encoding='utf-8') as file:
+                    entries = [
+                        {
+                            'PDF File': row.get('PDF File', ''),
+                            'Azymuts': [az.strip() for az in row['Azymuts'].split(',')]
+                            if parse_azimuths(row.get('Azymuts') or '') else (row.get('Azymuts') or ''),
+                        }
+                        for row in csv.DictReader(file)
+                    ]
+                self.save_station(station_id, entries)
+                os.makedirs(os.path.join(directory, MIGRATED_CSV_DIR), exist_ok=True)
+                os.replace(csv_file, os.path.join(directory, MIGRATED_CSV_DIR, os.path.basename(csv_file)))
+                imported += 1
+            except Exception as e:
+                logging.error(f"Błąd podczas migracji pliku {csv_file}: {e}")
+
+        with self._lock, self._connection:
+            self._connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('csv_migrated', ?)", (str(time.time()),))
+        if csv_files:
+            logging.info(f"Zaimportowano {imported} z {len(csv_files)} plików antenna_data_*.csv do {self.path}")
+        return imported
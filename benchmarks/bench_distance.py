@@ -0,0 +1,50 @@
+"""
+Porównanie filtrowania po promieniu: geodesic() wiersz po wierszu vs. geo.within_radius.
+
+Użycie:
+    python benchmarks/bench_distance.py [ścieżka_do_output.csv] [--lat 52.2297 --lon 21.0122 --radius 10]
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+from geopy.distance import geodesic
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geo import within_radius  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('csv', nargs='?', default='output.csv')
+    parser.add_argument('--lat', type=float, default=52.2297)
+    parser.add_argument('--lon', type=float, default=21.0122)
+    parser.add_argument('--radius', type=float, default=10)
+    args = parser.parse_args()
+
+    df = pd.read_csv(args.csv, delimiter=';', encoding='utf-8-sig', usecols=['LATIuke', 'LONGuke'])
+    df = df.dropna()
+    location = (args.lat, args.lon)
+    print(f"Wiersze: {len(df)}")
+
+    start = time.perf_counter()
+    distances = df.apply(lambda row: geodesic(location, (row['LATIuke'], row['LONGuke'])).km, axis=1)
+    expected = distances <= args.radius
+    geodesic_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    mask = within_radius(location, df['LATIuke'].to_numpy(), df['LONGuke'].to_numpy(), args.radius)
+    vectorized_time = time.perf_counter() - start
+
+    identical = bool((expected.to_numpy() == mask).all())
+    print(f"geodesic (apply):  {geodesic_time:.3f} s")
+    print(f"within_radius:     {vectorized_time:.3f} s")
+    print(f"Przyspieszenie:    {geodesic_time / max(vectorized_time, 1e-9):.1f}x")
+    print(f"Znalezione stacje: {int(mask.sum())}, zgodność wyników: {identical}")
+    return 0 if identical else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
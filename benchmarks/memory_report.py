@@ -0,0 +1,45 @@
+"""
+Raport zużycia pamięci tabeli nadajników: ramka z pd.read_csv vs. zwarta tabela StationStore.
+
+Zwraca kod 1, gdy zwarta tabela przekracza --max-ratio pamięci oryginału (do sprawdzania w CI).
+
+Użycie:
+    python benchmarks/memory_report.py [ścieżka_do_output.csv] [--max-ratio 0.35] [--json raport.json]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stations import compact_station_table, memory_report, read_stations_csv  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('csv', nargs='?', default='output.csv')
+    parser.add_argument('--max-ratio', type=float, default=0.35)
+    parser.add_argument('--json', help='Ścieżka pliku JSON z raportem')
+    args = parser.parse_args()
+
+    before = read_stations_csv(args.csv)
+    for column in ('StationId', 'pasmo', 'siec_id'):
+        before[column] = before[column].astype(str)
+    after = compact_station_table(before)
+    report = memory_report(before, after)
+
+    print(f"Wiersze: {report['rows']}")
+    print(f"{'Kolumna':<16}{'Przed [B]':>14}{'Po [B]':>14}")
+    for column, usage in report['columns'].items():
+        print(f"{column:<16}{usage['before']:>14}{usage['after']:>14}")
+    ratio = report['total_after'] / max(report['total_before'], 1)
+    print(f"{'Razem':<16}{report['total_before']:>14}{report['total_after']:>14}  ({ratio:.1%})")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    return 0 if ratio <= args.max_ratio else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
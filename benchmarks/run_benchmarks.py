@@ -0,0 +1,414 @@
+"""
+Zestaw benchmarków: wczytanie bazy, zapytania po promieniu, agregacja lokalizacji,
+rozmiar i czas generowania danych mapy oraz przepustowość potoku PDF.
+
+Bazy są generowane przez synthetic_data.py (i zapamiętywane w --data-dir), a potok
+PDF korzysta z lokalnego serwera si2pem_fixture.py. Wyniki trafiają do pliku JSON;
+--compare porównuje je z wcześniejszym plikiem i zwraca kod 1, gdy któryś czas
+wzrósł ponad --threshold.
+
+Pełny przebieg PdfWorker (etap pdf_pipeline) wymaga PyQt5; bez niego jest pomijany,
+a etapy pdf_download i pdf_extract mierzą PdfCache i ekstrakcję bez GUI.
+
+Użycie:
+    python benchmarks/run_benchmarks.py [--sizes 10000 100000 1000000] [--queries 200] [--radius 5]
+        [--pdf-stations 100] [--latency-ms 20] [--json bench_data/benchmark_results.json]
+        [--compare poprzednie.json]
+"""
+import argparse
+import concurrent.futures
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+
+import numpy as np
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from azimuth_store import AzimuthStore  # noqa: E402
+from engine import QueryEngine, site_records  # noqa: E402
+from map_layers import DETAIL_ZOOM, build_map_page, js_call, site_payload  # noqa: E402
+from pdf_cache import PdfCache  # noqa: E402
+from pdf_extract import extract_information_for_stations  # noqa: E402
+from si2pem import HttpClient  # noqa: E402
+from si2pem_fixture import Si2pemFixture  # noqa: E402
+from stations import StationStore, cache_dir_for, read_stations_csv  # noqa: E402
+from synthetic_data import ensure_dataset  # noqa: E402
+
+RESULTS_VERSION = 1
+
+
+def timing_stats(samples):
+    """
+    Zwraca statystyki czasów (w milisekundach).
+
+    Args:
+        samples (list): Czasy w sekundach.
+
+    Returns:
+        dict: mean_ms, p50_ms, p95_ms, max_ms.
+    """
+    values = np.asarray(samples, dtype=np.float64) * 1000
+    if not len(values):
+        return {}
+    return {
+        'mean_ms': round(float(values.mean()), 3),
+        'p50_ms': round(float(np.percentile(values, 50)), 3),
+        'p95_ms': round(float(np.percentile(values, 95)), 3),
+        'max_ms': round(float(values.max()), 3),
+    }
+
+
+def query_locations(df, count, seed):
+    """
+    Losuje lokalizacje zapytań w pobliżu nadajników (tak jak adresy użytkowników).
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(df), count)
+    lats = df['LATIuke'].to_numpy()[rows] + rng.normal(0, 0.01, count)
+    lons = df['LONGuke'].to_numpy()[rows] + rng.normal(0, 0.015, count)
+    return list(zip(lats.tolist(), lons.tolist()))
+
+
+def bench_load(csv_path):
+    """
+    Wczytanie bazy: bez cache (CSV, budowa indeksu i tabeli lokalizacji) i z gotowego cache.
+    """
+    shutil.rmtree(cache_dir_for(csv_path), ignore_errors=True)
+    if os.path.exists(csv_path + '.idx.npz'):
+        os.remove(csv_path + '.idx.npz')
+
+    start = time.perf_counter()
+    df = StationStore(csv_path).load()
+    cold = time.perf_counter() - start
+
+    start = time.perf_counter()
+    StationStore(csv_path).load()
+    warm = time.perf_counter() - start
+    return {
+        'rows': len(df),
+        'cold_s': round(cold, 4),
+        'warm_s': round(warm, 4),
+        'memory_bytes': int(df.memory_usage(deep=True, index=False).sum()),
+    }
+
+
+def bench_queries(csv_path, azimuth_db, queries, radius_km, seed):
+    """
+    Zapytania po promieniu, agregacja do lokalizacji i dane mapy (jak w MainWindow.display_map).
+    """
+    store = StationStore(csv_path)
+    engine = QueryEngine(store, AzimuthStore(azimuth_db), geocoder=None)
+    df = store.load()
+
+    filter_times, aggregation_times, render_times = [], [], []
+    stations = sites = payload_bytes = 0
+    for location in query_locations(df, queries, seed):
+        start = time.perf_counter()
+        found = engine.stations_within(location, radius_km)
+        filtered = time.perf_counter()
+        site_table = store.sites_for(found)
+        site_records(site_table, engine.site_azimuths(site_table), location)
+        aggregated = time.perf_counter()
+        script = (
+            js_call('clear') + js_call('setLocation', *location) + js_call('setView', *location, DETAIL_ZOOM)
+            + js_call('addSites', site_payload(site_table))
+        )
+        rendered = time.perf_counter()
+
+        filter_times.append(filtered - start)
+        aggregation_times.append(aggregated - filtered)
+        render_times.append(rendered - aggregated)
+        stations += len(found)
+        sites += len(site_table)
+        payload_bytes += len(script.encode('utf-8'))
+
+    total = sum(filter_times)
+    return {
+        'query': {
+            'queries': queries,
+            'radius_km': radius_km,
+            'mean_stations': round(stations / queries, 1),
+            'queries_per_s': round(queries / max(total, 1e-9), 1),
+            **timing_stats(filter_times),
+        },
+        'aggregation': {'mean_sites': round(sites / queries, 1), **timing_stats(aggregation_times)},
+        'map_payload': {'mean_bytes': payload_bytes // queries, **timing_stats(render_times)},
+    }
+
+
+def bench_map_page():
+    """
+    Strona mapy (build_map_page) - generowana raz przy starcie programu.
+    """
+    start = time.perf_counter()
+    page = build_map_page()
+    elapsed = time.perf_counter() - start
+    return {'bytes': len(page.encode('utf-8')), 'time_s': round(elapsed, 4)}
+
+
+def pdf_jobs(fixture, station_ids):
+    """
+    Zwraca URL-e raportów wybranych stacji z mapą URL -> StationId (jak po etapie WFS).
+    """
+    station_set = set(station_ids)
+    jobs = {}
+    for index, site_stations in enumerate(fixture.data.site_stations):
+        matching = [station_id for station_id in site_stations if station_id in station_set]
+        if matching:
+            jobs[f"{fixture.base_url}/pdf/raport_{index}.pdf"] = matching
+    return jobs
+
+
+def bench_pdf_stages(fixture, station_ids, workdir, workers):
+    """
+    Pobieranie raportów przez PdfCache i ekstrakcja azymutów w puli procesów (bez GUI).
+    """
+    jobs = pdf_jobs(fixture, station_ids)
+    http = HttpClient(max_connections=16, max_per_host=8, rate_limit=0)
+    cache = PdfCache(os.path.join(workdir, 'pdfs'), http)
+
+    bytes_before = fixture.bytes_sent
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=16) as executor:
+        paths = dict(zip(jobs, executor.map(cache.get, jobs)))
+    download = time.perf_counter() - start
+    downloaded_bytes = fixture.bytes_sent - bytes_before
+
+    tiers = Counter()
+    start = time.perf_counter()
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(extract_information_for_stations, path, jobs[url], url.split('/')[-1])
+            for url, path in paths.items() if path
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            tiers.update(entry.get('Tier', 'brak') for entry in future.result())
+    extract = time.perf_counter() - start
+
+    return {
+        'pdf_download': {
+            'pdfs': len(jobs),
+            'time_s': round(download, 4),
+            'pdfs_per_s': round(len(jobs) / max(download, 1e-9), 1),
+            'mb_per_s': round(downloaded_bytes / 1024 / 1024 / max(download, 1e-9), 2),
+        },
+        'pdf_extract': {
+            'pdfs': len(futures),
+            'workers': workers,
+            'time_s': round(extract, 4),
+            'pdfs_per_s': round(len(futures) / max(extract, 1e-9), 1),
+            'tiers': dict(tiers),
+        },
+    }
+
+
+def bench_pdf_pipeline(fixture, csv_path, station_ids, workdir, http_rate_limit=None):
+    """
+    Pełny przebieg PdfWorker (base_station, WFS, pobieranie, ekstrakcja) w osobnym procesie.
+
+    Proces potomny działa w katalogu z własnym config.ini, w którym si2pem_url wskazuje
+    na serwer testowy, a cache i bazy SQLite są puste. Bez http_rate_limit obowiązuje
+    domyślny limit zapytań na sekundę, jak w aplikacji.
+    """
+    with open(os.path.join(workdir, 'config.ini'), 'w', encoding='utf-8') as f:
+        f.write(
+            f"[Paths]\ndatabase_path = {os.path.abspath(csv_path)}\npdf_dir = pdfs\n\n"
+            f"[Settings]\nsi2pem_url = {fixture.base_url}\n"
+        )
+        if http_rate_limit is not None:
+            f.write(f"http_rate_limit = {http_rate_limit}\n")
+    with open(os.path.join(workdir, 'stations.json'), 'w', encoding='utf-8') as f:
+        json.dump(station_ids, f)
+
+    requests_before = dict(fixture.requests)
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), '--pdf-worker-child', workdir],
+        cwd=workdir, capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        reason = completed.stderr.strip().splitlines()[-1] if completed.stderr.strip() else 'błąd procesu'
+        return {'skipped': reason}
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result['requests'] = {
+        endpoint: count - requests_before.get(endpoint, 0) for endpoint, count in fixture.requests.items()
+    }
+    result['stations_per_s'] = round(len(station_ids) / max(result['time_s'], 1e-9), 2)
+    return result
+
+
+def pdf_worker_child(workdir):
+    """
+    Uruchamia PdfWorker synchronicznie (bez pętli zdarzeń) i wypisuje wynik jako JSON.
+
+    Wynik zawiera łączne czasy etapów przebiegu (spany z metrics.METRICS).
+    """
+    os.chdir(workdir)
+    sys.path.insert(0, REPO_DIR)
+    try:
+        import gui
+    except ImportError as e:
+        print(f"PyQt5 niedostępne: {e}", file=sys.stderr)
+        return 2
+    with open('stations.json', encoding='utf-8') as f:
+        station_ids = json.load(f)
+    worker = gui.PdfWorker(station_ids)
+    start = time.perf_counter()
+    worker.run()
+    elapsed = time.perf_counter() - start
+    snapshot = gui.METRICS.snapshot()
+    print(json.dumps({
+        'stations': len(station_ids),
+        'time_s': round(elapsed, 4),
+        'failed': len(worker.failed_stations),
+        'tiers': dict(worker.tier_counts),
+        'stages': {
+            f"{h['labels']['span']}_s": h['sum'] for h in snapshot['histograms'] if h['name'] == 'span_seconds'
+        },
+        'cache_hit_rates': snapshot['cache_hit_rates'],
+    }))
+    return 0
+
+
+def flatten_timings(results, prefix=''):
+    """
+    Zwraca płaski słownik czasów (klucze kończące się na _s lub _ms, bez przepustowości *_per_s).
+    """
+    timings = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            timings.update(flatten_timings(value, f"{name}."))
+        elif isinstance(value, (int, float)) and key.endswith(('_s', '_ms')) and '_per_' not in key:
+            timings[name] = value
+    return timings
+
+
+def compare_results(previous, current, threshold):
+    """
+    Porównuje czasy z dwóch plików wyników.
+
+    Returns:
+        list: Nazwy metryk, których czas wzrósł ponad threshold razy.
+    """
+    before = flatten_timings(previous['results'])
+    after = flatten_timings(current['results'])
+    regressions = []
+    print(f"\nPorównanie z {previous['meta'].get('commit')} ({previous['meta'].get('timestamp')}):")
+    for name in sorted(before.keys() & after.keys()):
+        ratio = after[name] / before[name] if before[name] else 1.0
+        marker = ''
+        if ratio > threshold and after[name] - before[name] > 1e-3:
+            marker = '  <-- regresja'
+            regressions.append(name)
+        print(f"  {name:<48}{before[name]:>12.4f}{after[name]:>12.4f}  x{ratio:.2f}{marker}")
+    return regressions
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    if len(sys.argv) == 3 and sys.argv[1] == '--pdf-worker-child':
+        return pdf_worker_child(sys.argv[2])
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--data-dir', default='bench_data')
+    parser.add_argument('--queries', type=int, default=200)
+    parser.add_argument('--radius', type=float, default=5)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--pdf-stations', type=int, default=100, help='liczba stacji w benchmarku PDF (0 - pomiń)')
+    parser.add_argument('--pdf-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--latency-ms', type=float, default=20, help='opóźnienie odpowiedzi serwera si2pem')
+    parser.add_argument('--jitter-ms', type=float, default=10)
+    parser.add_argument('--http-rate-limit', type=float, help='limit zapytań/s PdfWorker (domyślnie jak w aplikacji)')
+    parser.add_argument('--json', help='plik wyników (domyślnie benchmark_results.json w --data-dir)')
+    parser.add_argument('--compare', help='wcześniejszy plik wyników do porównania')
+    parser.add_argument('--threshold', type=float, default=1.5, help='dopuszczalny wzrost czasu przy --compare')
+    args = parser.parse_args()
+    # Wyniki trafiają domyślnie do katalogu danych, pomijanego przez git
+    args.json = args.json or os.path.join(args.data_dir, 'benchmark_results.json')
+
+    results = {'map_page': bench_map_page()}
+    print(f"Strona mapy: {results['map_page']['bytes']} B, {results['map_page']['time_s']:.3f} s")
+
+    for rows in args.sizes:
+        csv_path = ensure_dataset(args.data_dir, rows, args.seed)
+        with tempfile.TemporaryDirectory() as workdir:
+            dataset = {'load': bench_load(csv_path)}
+            dataset.update(bench_queries(
+                csv_path, os.path.join(workdir, 'azimuths.sqlite'), args.queries, args.radius, args.seed
+            ))
+        results[f"rows_{rows}"] = dataset
+        print(
+            f"{rows} wierszy: wczytanie {dataset['load']['cold_s']:.2f} s (cache {dataset['load']['warm_s']:.2f} s), "
+            f"zapytanie p50 {dataset['query']['p50_ms']:.2f} ms ({dataset['query']['queries_per_s']} zapytań/s), "
+            f"agregacja p50 {dataset['aggregation']['p50_ms']:.2f} ms, "
+            f"dane mapy {dataset['map_payload']['mean_bytes']} B / p50 {dataset['map_payload']['p50_ms']:.2f} ms"
+        )
+
+    if args.pdf_stations:
+        csv_path = ensure_dataset(args.data_dir, min(args.sizes), args.seed)
+        df = read_stations_csv(csv_path)
+        # Stacje z jednego obszaru, tak jak po wyszukiwaniu w GUI
+        store = StationStore(csv_path)
+        location = query_locations(store.load(), 1, args.seed)[0]
+        nearby = store.query_radius(location, 50)['StationId'].astype(str).unique().tolist()
+        station_ids = nearby[:args.pdf_stations]
+        with Si2pemFixture(df, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000) as fixture, \
+                tempfile.TemporaryDirectory() as workdir:
+            results.update(bench_pdf_stages(fixture, station_ids, workdir, args.pdf_workers))
+            pipeline_dir = os.path.join(workdir, 'pipeline')
+            os.makedirs(pipeline_dir)
+            results['pdf_pipeline'] = bench_pdf_pipeline(
+                fixture, csv_path, station_ids, pipeline_dir, args.http_rate_limit
+            )
+        print(
+            f"PDF: pobieranie {results['pdf_download']['pdfs_per_s']} PDF/s, "
+            f"ekstrakcja {results['pdf_extract']['pdfs_per_s']} PDF/s, "
+            f"PdfWorker: {results['pdf_pipeline'].get('skipped') or str(results['pdf_pipeline']['time_s']) + ' s'}"
+        )
+
+    report = {
+        'version': RESULTS_VERSION,
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'args': vars(args),
+        },
+        'results': results,
+    }
+    # Poprzednie wyniki są czytane przed zapisem, bo --compare może wskazywać ten sam plik co --json
+    previous = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            previous = json.load(f)
+    os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+    with open(args.json, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"Wyniki zapisane w {args.json}")
+
+    if previous is not None and compare_results(previous, report, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
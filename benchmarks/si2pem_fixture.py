@@ -0,0 +1,266 @@
+"""
+Lokalny serwer zastępujący si2pem w benchmarkach: base_station, WFS GetFeature i raporty PDF.
+
+Dane pochodzą z bazy nadajników (output.csv): każda lokalizacja ma jeden raport PDF
+z listą jej StationId i tabelą azymutów na stronie 3, a warstwa WFS public:measures_all
+zwraca punkt pomiarowy z adresem tego raportu. Każda odpowiedź jest opóźniana o
+--latency-ms (plus losowe --jitter-ms).
+
+Aplikację kieruje się na serwer ustawieniem si2pem_url w config.ini.
+
+Użycie:
+    python benchmarks/si2pem_fixture.py output.csv [--port 8765] [--latency-ms 50] [--jitter-ms 20]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stations import read_stations_csv  # noqa: E402
+
+# Warstwa WFS z raportami (pozostałe warstwy zwracają puste kolekcje)
+REPORT_LAYER = 'public:measures_all'
+
+# Połowa boku bounding boxa stacji zwracanego przez base_station (stopnie)
+BBOX_HALF_DEG = 0.002
+
+
+def pdf_text(value):
+    """
+    Koduje tekst jako napis PDF (WinAnsi, z escapowaniem nawiasów).
+    """
+    value = value.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return b'(' + value.encode('cp1252', errors='replace') + b')'
+
+
+def make_report_pdf(station_ids, azimuths, page_number=3):
+    """
+    Tworzy minimalny raport PDF z tabelą azymutów na stronie page_number.
+
+    Args:
+        station_ids (list): StationId wypisywane na stronie z tabelą.
+        azimuths (list): Azymuty (int) sektorów.
+        page_number (int): Numer strony z tabelą.
+
+    Returns:
+        bytes: Zawartość pliku PDF.
+    """
+    pages = []
+    for number in range(1, page_number + 1):
+        lines = [(50, 800, 14, f"Raport z pomiarów PEM - strona {number}")]
+        if number == page_number:
+            lines.append((50, 770, 10, 'Stacje bazowe: ' + ' '.join(station_ids)))
+            lines.append((50, 740, 10, 'Sektor'))
+            lines.append((150, 740, 10, 'Azymut H [°]'))
+            lines.append((260, 740, 10, 'Wysokość [m]'))
+            for row, azimuth in enumerate(azimuths):
+                top = 720 - row * 18
+                lines.append((50, top, 10, str(row + 1)))
+                lines.append((150, top, 10, f"{azimuth}°"))
+                lines.append((260, top, 10, '30'))
+        content = b''.join(
+            b'BT /F1 %d Tf %d %d Td ' % (size, x, y) + pdf_text(text) + b' Tj ET\n' for x, y, size, text in lines
+        )
+        pages.append(zlib.compress(content))
+
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [' + b' '.join(b'%d 0 R' % (4 + 2 * i) for i in range(len(pages)))
+        + b'] /Count %d >>' % len(pages),
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    ]
+    for i, content in enumerate(pages):
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> '
+            b'/Contents %d 0 R >>' % (5 + 2 * i)
+        )
+        objects.append(b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(content) + content + b'\nendstream')
+
+    pdf = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(pdf)
+    pdf += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    pdf += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    pdf += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+class FixtureData:
+    """
+    Dane serwera: stacje, lokalizacje i raporty PDF wyliczone z bazy nadajników.
+    """
+
+    def __init__(self, df):
+        first_rows = df.dropna(subset=['LATIuke', 'LONGuke']).drop_duplicates('StationId')
+        self.station_location = {
+            station_id: (float(lat), float(lon))
+            for station_id, lat, lon in zip(first_rows['StationId'], first_rows['LATIuke'], first_rows['LONGuke'])
+        }
+        sites = first_rows.groupby(['LATIuke', 'LONGuke'], sort=True)['StationId'].apply(list)
+        self.site_lats = np.array([lat for lat, _ in sites.index], dtype=np.float64)
+        self.site_lons = np.array([lon for _, lon in sites.index], dtype=np.float64)
+        self.site_stations = sites.tolist()
+        self._pdfs = {}
+        self._lock = threading.Lock()
+
+    def base_station(self, station_id):
+        location = self.station_location.get(station_id)
+        if location is None:
+            return []
+        lat, lon = location
+        bbox = [lat - BBOX_HALF_DEG, lat + BBOX_HALF_DEG, lon - BBOX_HALF_DEG, lon + BBOX_HALF_DEG]
+        return [{'id': station_id, 'boundingbox': [f"{value:.6f}" for value in bbox]}]
+
+    def features(self, bbox, base_url):
+        min_lon, min_lat, max_lon, max_lat = bbox
+        mask = (
+            (self.site_lats >= min_lat) & (self.site_lats <= max_lat)
+            & (self.site_lons >= min_lon) & (self.site_lons <= max_lon)
+        )
+        return [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [float(self.site_lons[i]), float(self.site_lats[i])]},
+                'properties': {'url': f"{base_url}/pdf/raport_{i}.pdf"},
+            }
+            for i in np.flatnonzero(mask).tolist()
+        ]
+
+    def pdf(self, site_index):
+        with self._lock:
+            if site_index not in self._pdfs:
+                station_ids = self.site_stations[site_index]
+                # Azymuty zależą tylko od numeru lokalizacji, więc są powtarzalne
+                rng = random.Random(site_index)
+                start = rng.randrange(0, 120, 5)
+                azimuths = [start + sector * 120 for sector in range(rng.choice([1, 2, 3]))]
+                self._pdfs[site_index] = make_report_pdf(station_ids, azimuths)
+            return self._pdfs[site_index]
+
+
+class Si2pemFixture:
+    """
+    Serwer HTTP w wątku tła; base_url wskazuje jego adres (np. http://127.0.0.1:8765).
+
+    Liczniki requests i bytes_sent pozwalają sprawdzić, ile zapytań i danych wymagał przebieg.
+    """
+
+    def __init__(self, df, host='127.0.0.1', port=0, latency=0.0, jitter=0.0):
+        self.data = FixtureData(df)
+        self.latency = latency
+        self.jitter = jitter
+        self.requests = {}
+        self.bytes_sent = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self.base_url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+
+    def _handler_class(self):
+        fixture = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                fixture.delay()
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                if url.path == '/api/public/base_station':
+                    self.send(200, 'application/json', json.dumps(fixture.data.base_station(query.get('search', [''])[0])).encode())
+                    fixture.count('base_station')
+                elif url.path == '/geoserver/public/wfs':
+                    layers = query.get('typeName', [''])[0].split(',')
+                    bbox = [float(value) for value in query.get('bbox', ['0,0,0,0'])[0].split(',')[:4]]
+                    features = fixture.data.features(bbox, fixture.base_url) if REPORT_LAYER in layers else []
+                    body = json.dumps({'type': 'FeatureCollection', 'features': features}).encode()
+                    self.send(200, 'application/json', body)
+                    fixture.count('wfs')
+                elif url.path.startswith('/pdf/raport_') and url.path.endswith('.pdf'):
+                    try:
+                        site_index = int(url.path[len('/pdf/raport_'):-len('.pdf')])
+                        body = fixture.data.pdf(site_index)
+                    except (ValueError, IndexError):
+                        self.send(404, 'text/plain', b'not found')
+                        return
+                    self.send(200, 'application/pdf', body)
+                    fixture.count('pdf')
+                else:
+                    self.send(404, 'text/plain', b'not found')
+
+            def send(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with fixture._lock:
+                    fixture.bytes_sent += len(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def delay(self):
+        delay = self.latency + random.uniform(0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def count(self, endpoint):
+        with self._lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('csv', nargs='?', default='output.csv')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0)
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    args = parser.parse_args()
+
+    fixture = Si2pemFixture(
+        read_stations_csv(args.csv), args.host, args.port, args.latency_ms / 1000, args.jitter_ms / 1000
+    )
+    print(f"Serwer si2pem: {fixture.base_url} (si2pem_url = {fixture.base_url} w config.ini), Ctrl+C kończy")
+    try:
+        fixture.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        fixture.server.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+Generator syntetycznej bazy nadajników UKE (output.csv) do benchmarków.
+
+Plik ma kolumny i format bazy UKE (separator ';', UTF-8 z BOM). Lokalizacje są
+skupione wokół miast (gęściej w dużych), z tłem rozproszonym po całym kraju. Na
+jednej lokalizacji bywa kilku operatorów, a każdy operator ma na niej jeden StationId
+i kilka wierszy (pasmo, standard).
+
+Użycie:
+    python benchmarks/synthetic_data.py --rows 10000 100000 1000000 [--out-dir bench_data] [--seed 1]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from stations import STATION_COLUMNS  # noqa: E402
+
+# (miasto, lat, lon, waga, województwo) - waga ~ liczba mieszkańców w tysiącach
+CITIES = [
+    ('Warszawa', 52.2297, 21.0122, 1860, 'Mazowieckie'),
+    ('Kraków', 50.0647, 19.9450, 800, 'Małopolskie'),
+    ('Wrocław', 51.1079, 17.0385, 670, 'Dolnośląskie'),
+    ('Łódź', 51.7592, 19.4560, 660, 'Łódzkie'),
+    ('Poznań', 52.4064, 16.9252, 540, 'Wielkopolskie'),
+    ('Gdańsk', 54.3520, 18.6466, 490, 'Pomorskie'),
+    ('Szczecin', 53.4285, 14.5528, 390, 'Zachodniopomorskie'),
+    ('Bydgoszcz', 53.1235, 18.0084, 330, 'Kujawsko-Pomorskie'),
+    ('Lublin', 51.2465, 22.5684, 330, 'Lubelskie'),
+    ('Białystok', 53.1325, 23.1688, 290, 'Podlaskie'),
+    ('Katowice', 50.2649, 19.0238, 280, 'Śląskie'),
+    ('Kielce', 50.8661, 20.6286, 185, 'Świętokrzyskie'),
+    ('Rzeszów', 50.0412, 21.9991, 195, 'Podkarpackie'),
+    ('Olsztyn', 53.7784, 20.4801, 170, 'Warmińsko-Mazurskie'),
+    ('Opole', 50.6751, 17.9213, 125, 'Opolskie'),
+    ('Zielona Góra', 51.9356, 15.5062, 140, 'Lubuskie'),
+    ('Gorzów Wielkopolski', 52.7368, 15.2288, 120, 'Lubuskie'),
+    ('Toruń', 53.0138, 18.5984, 200, 'Kujawsko-Pomorskie'),
+    ('Częstochowa', 50.8118, 19.1203, 215, 'Śląskie'),
+    ('Radom', 51.4027, 21.1471, 205, 'Mazowieckie'),
+]
+
+# Zasięg Polski (lat, lon) dla lokalizacji rozproszonych
+POLAND_BBOX = (49.0, 54.8, 14.1, 24.1)
+
+OPERATORS = ['T-Mobile', 'Orange', 'Play', 'Plus']
+
+# Pasmo -> standard, jak w bazie UKE
+BANDS = {
+    'GSM900': 'GSM', 'GSM1800': 'GSM',
+    'UMTS900': 'UMTS', 'UMTS2100': 'UMTS',
+    'LTE800': 'LTE', 'LTE900': 'LTE', 'LTE1800': 'LTE', 'LTE2100': 'LTE', 'LTE2600': 'LTE',
+    '5G700': '5G', '5G2100': '5G', '5G3600': '5G',
+}
+
+# Udział lokalizacji w miastach i średnia liczba wierszy (pasm) na operatora
+CITY_SHARE = 0.65
+MEAN_BANDS_PER_STATION = 4
+
+
+def generate_stations(rows, seed=1):
+    """
+    Generuje syntetyczną tabelę nadajników o dokładnie podanej liczbie wierszy.
+
+    Args:
+        rows (int): Liczba wierszy.
+        seed (int): Ziarno generatora (ten sam seed daje ten sam plik).
+
+    Returns:
+        pd.DataFrame: Tabela z kolumnami STATION_COLUMNS.
+    """
+    rng = np.random.default_rng(seed)
+    # Z zapasem - nadmiarowe wiersze są obcinane
+    n_sites = max(1, int(rows / MEAN_BANDS_PER_STATION / 1.3 * 1.2) + 1)
+
+    city_lats = np.array([city[1] for city in CITIES])
+    city_lons = np.array([city[2] for city in CITIES])
+    weights = np.array([city[3] for city in CITIES], dtype=np.float64)
+    city_voivodeships = np.array([city[4] for city in CITIES], dtype=object)
+
+    in_city = rng.random(n_sites) < CITY_SHARE
+    city = rng.choice(len(CITIES), size=n_sites, p=weights / weights.sum())
+    # Promień miasta rośnie z liczbą mieszkańców (~0.03° dla 100 tys., ~0.13° dla Warszawy)
+    spread = 0.003 * np.sqrt(weights[city])
+    lats = np.where(in_city, city_lats[city] + rng.normal(0, 1, n_sites) * spread,
+                    rng.uniform(POLAND_BBOX[0], POLAND_BBOX[1], n_sites))
+    lons = np.where(in_city, city_lons[city] + rng.normal(0, 1, n_sites) * spread * 1.6,
+                    rng.uniform(POLAND_BBOX[2], POLAND_BBOX[3], n_sites))
+    # Województwo lokalizacji spoza miast - województwo najbliższego miasta z listy
+    nearest = np.argmin((lats[:, None] - city_lats) ** 2 + ((lons[:, None] - city_lons) * 0.62) ** 2, axis=1)
+    voivodeships = city_voivodeships[np.where(in_city, city, nearest)]
+
+    # Operatorzy na lokalizacji: najczęściej jeden, czasem kilku (wspólne maszty)
+    operator_counts = rng.choice([1, 2, 3, 4], size=n_sites, p=[0.78, 0.15, 0.05, 0.02])
+    station_site = np.repeat(np.arange(n_sites), operator_counts)
+    first_operator = rng.integers(0, len(OPERATORS), n_sites)
+    offsets = np.arange(len(station_site)) - np.repeat(np.cumsum(operator_counts) - operator_counts, operator_counts)
+    station_operator = (first_operator[station_site] + offsets) % len(OPERATORS)
+
+    # Pasma stacji: losowy podzbiór listy pasm (bez powtórzeń w ramach stacji)
+    band_names = np.array(list(BANDS), dtype=object)
+    band_counts = np.clip(rng.poisson(MEAN_BANDS_PER_STATION - 1, len(station_site)) + 1, 1, len(band_names))
+    row_station = np.repeat(np.arange(len(station_site)), band_counts)
+    row_offsets = np.arange(len(row_station)) - np.repeat(np.cumsum(band_counts) - band_counts, band_counts)
+    band_shift = rng.integers(0, len(band_names), len(station_site))
+    row_band = band_names[(band_shift[row_station] + row_offsets) % len(band_names)]
+
+    row_station = row_station[:rows]
+    row_band = row_band[:rows]
+    row_site = station_site[row_station]
+    df = pd.DataFrame({
+        'siec_id': np.array(OPERATORS, dtype=object)[station_operator[row_station]],
+        'LONGuke': np.round(lons[row_site], 6),
+        'LATIuke': np.round(lats[row_site], 6),
+        'StationId': (100000 + row_station).astype(str),
+        'wojewodztwo_id': voivodeships[row_site],
+        'pasmo': row_band,
+        'standard': pd.Series(row_band).map(BANDS).to_numpy(),
+    })
+    if len(df) < rows:
+        # Przy bardzo małych losowaniach dopełniamy kopią początkowych wierszy
+        df = pd.concat([df] * (rows // max(len(df), 1) + 1), ignore_index=True).iloc[:rows]
+    return df[STATION_COLUMNS]
+
+
+def write_stations_csv(df, path):
+    """
+    Zapisuje tabelę w formacie bazy UKE (separator ';', UTF-8 z BOM).
+    """
+    df.to_csv(path, sep=';', index=False, encoding='utf-8-sig')
+
+
+def dataset_path(directory, rows):
+    """
+    Zwraca ścieżkę pliku syntetycznej bazy o podanej liczbie wierszy (np. output_100k.csv).
+    """
+    label = f"{rows // 1_000_000}m" if rows % 1_000_000 == 0 else f"{rows // 1000}k" if rows % 1000 == 0 else str(rows)
+    return os.path.join(directory, f"output_{label}.csv")
+
+
+def ensure_dataset(directory, rows, seed=1):
+    """
+    Tworzy plik syntetycznej bazy, jeśli jeszcze nie istnieje.
+
+    Returns:
+        str: Ścieżka pliku CSV.
+    """
+    path = dataset_path(directory, rows)
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        write_stations_csv(generate_stations(rows, seed), path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--out-dir', default='bench_data')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for rows in args.rows:
+        start = time.perf_counter()
+        df = generate_stations(rows, args.seed)
+        path = dataset_path(args.out_dir, rows)
+        write_stations_csv(df, path)
+        print(f"{path}: {len(df)} wierszy, {df['StationId'].nunique()} stacji, "
+              f"{df.groupby(['LATIuke', 'LONGuke']).ngroups} lokalizacji ({time.perf_counter() - start:.1f} s)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+import threading
+
+
+class Cancelled(Exception):
+    """
+    Zgłaszany, gdy operacja została przerwana przez CancelToken.
+    """
+
+
+class CancelToken:
+    """
+    Współdzielony znacznik anulowania operacji.
+
+    Wątki sprawdzają go między etapami pracy (cancelled, raise_if_cancelled), a zamiast
+    time.sleep używają wait, które kończy się natychmiast po anulowaniu.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, timeout):
+        """
+        Czeka timeout sekund lub do anulowania.
+
+        Returns:
+            bool: True, jeśli operacja została anulowana.
+        """
+        return self._event.wait(timeout)
+
+
+def sleep(seconds, cancel_token=None):
+    """
+    Odpowiednik time.sleep przerywany przez CancelToken.
+
+    Raises:
+        Cancelled: Gdy token został anulowany w trakcie oczekiwania.
+    """
+    if cancel_token is None:
+        threading.Event().wait(seconds)
+        return
+    if cancel_token.wait(seconds):
+        raise Cancelled()
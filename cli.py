@@ -0,0 +1,281 @@
+"""
+Wsadowe wyszukiwanie lokalizacji nadajników i azymutów bez GUI (bez importu PyQt).
+
+Każdy niepusty wiersz pliku wejściowego to jedno zapytanie: para współrzędnych
+"lat,lon" (separator przecinek, średnik, spacja lub tabulator) albo adres do
+geokodowania przez OpenCage. Wiersze zaczynające się od '#' są pomijane. Zapytania są
+wykonywane w puli procesów, a wyniki zapisywane strumieniowo w kolejności wejścia.
+
+Użycie:
+    python cli.py adresy.txt --radius 5 --format geojson -o wyniki.geojson
+    python cli.py wspolrzedne.txt --radius 2 --format jsonl --workers 8 --api-key KLUCZ
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import logging
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from engine import QueryEngine
+from settings import HTTP_RATE_LIMIT, MAX_RADIUS_KM
+
+OUTPUT_FORMATS = ('csv', 'geojson', 'jsonl')
+
+COORDINATES_RE = re.compile(r'^\s*(-?\d+(?:\.\d+)?)\s*[,;\s]\s*(-?\d+(?:\.\d+)?)\s*$')
+
+CSV_COLUMNS = [
+    'query_id', 'input', 'query_lat', 'query_lon', 'wojewodztwo', 'error',
+    'site_lat', 'site_lon', 'distance_km', 'operators', 'station_ids', 'bands', 'azimuths',
+]
+
+# Silnik procesu roboczego (tworzony raz na proces w init_worker)
+_engine = None
+_api_key = None
+_radius_km = None
+
+
+def parse_query(text):
+    """
+    Rozpoznaje, czy wiersz wejścia to współrzędne, czy adres.
+
+    Args:
+        text (str): Wiersz pliku wejściowego.
+
+    Returns:
+        tuple | str: (lat, lon) dla współrzędnych lub adres (str).
+
+    Raises:
+        ValueError: Gdy współrzędne są poza zakresem.
+    """
+    match = COORDINATES_RE.match(text)
+    if not match:
+        return text.strip()
+    lat, lon = float(match.group(1)), float(match.group(2))
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Współrzędne poza zakresem: {text}")
+    return lat, lon
+
+
+def read_queries(path):
+    """
+    Wczytuje zapytania z pliku (lub stdin dla '-').
+
+    Returns:
+        list: Krotki (query_id, tekst zapytania); query_id to numer wiersza.
+    """
+    f = sys.stdin if path == '-' else open(path, encoding='utf-8-sig')
+    try:
+        return [
+            (line_number, line.strip())
+            for line_number, line in enumerate(f, start=1)
+            if line.strip() and not line.lstrip().startswith('#')
+        ]
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def init_worker(radius_km, api_key, http_rate_limit, log_level):
+    """
+    Inicjalizuje proces roboczy: własny silnik, bazy i klient HTTP.
+    """
+    global _engine, _api_key, _radius_km
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    _engine = QueryEngine.from_settings(http_rate_limit=http_rate_limit)
+    _api_key = api_key
+    _radius_km = radius_km
+
+
+def run_query(query):
+    """
+    Wykonuje jedno zapytanie w procesie roboczym.
+
+    Args:
+        query (tuple): (query_id, tekst zapytania).
+
+    Returns:
+        dict: Wynik z kluczami query_id, input, lat, lon, wojewodztwo, stations, sites, error.
+    """
+    query_id, text = query
+    record = {
+        'query_id': query_id, 'input': text, 'lat': None, 'lon': None,
+        'wojewodztwo': None, 'stations': 0, 'sites': [], 'error': None,
+    }
+    try:
+        parsed = parse_query(text)
+        if isinstance(parsed, tuple):
+            result = _engine.query(parsed, _radius_km)
+        else:
+            result = _engine.search(parsed, _api_key, _radius_km)
+            if result is None:
+                record['error'] = "Nie udało się pobrać lokalizacji."
+                return record
+    except Exception as e:
+        logging.error(f"Błąd zapytania {query_id} ({text}): {e}")
+        record['error'] = str(e)
+        return record
+    record['lat'], record['lon'] = result.location
+    record['wojewodztwo'] = result.wojewodztwo
+    record['stations'] = len(result.stations)
+    record['sites'] = result.sites
+    return record
+
+
+class CsvResultWriter:
+    """
+    Zapis wyników jako CSV: jeden wiersz na lokalizację (lub jeden wiersz dla zapytania bez wyników).
+    """
+
+    def __init__(self, stream):
+        self.writer = csv.writer(stream)
+        self.writer.writerow(CSV_COLUMNS)
+
+    def write(self, record):
+        query = [record['query_id'], record['input'], record['lat'], record['lon'], record['wojewodztwo'], record['error']]
+        if not record['sites']:
+            self.writer.writerow(query + [''] * (len(CSV_COLUMNS) - len(query)))
+            return
+        for site in record['sites']:
+            self.writer.writerow(query + [
+                site['lat'], site['lon'], site['distance_km'],
+                '|'.join(site['operators']),
+                '|'.join(site['station_ids']),
+                '|'.join(f"{operator}: {summary}" for operator, summary in site['bands'].items()),
+                '|'.join(f"{azimuth:g}" for azimuth in site['azimuths']),
+            ])
+
+    def close(self):
+        pass
+
+
+class GeoJsonResultWriter:
+    """
+    Zapis wyników jako GeoJSON FeatureCollection (punkt na lokalizację), zapisywany strumieniowo.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.first = True
+        self.stream.write('{"type": "FeatureCollection", "features": [\n')
+
+    def write(self, record):
+        for site in record['sites']:
+            feature = {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [site['lon'], site['lat']]},
+                'properties': {
+                    'query_id': record['query_id'],
+                    'input': record['input'],
+                    'distance_km': site['distance_km'],
+                    'operators': site['operators'],
+                    'station_ids': site['station_ids'],
+                    'bands': site['bands'],
+                    'azimuths': site['azimuths'],
+                },
+            }
+            self.stream.write(('' if self.first else ',\n') + json.dumps(feature, ensure_ascii=False))
+            self.first = False
+
+    def close(self):
+        self.stream.write('\n]}\n')
+
+
+class JsonLinesResultWriter:
+    """
+    Zapis wyników jako JSON Lines: jeden obiekt na zapytanie.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        pass
+
+
+RESULT_WRITERS = {
+    'csv': CsvResultWriter,
+    'geojson': GeoJsonResultWriter,
+    'jsonl': JsonLinesResultWriter,
+}
+
+
+def run_queries(queries, radius_km, api_key, workers, chunksize, log_level):
+    """
+    Wykonuje zapytania w puli procesów (lub w bieżącym procesie dla workers=1).
+
+    Yields:
+        dict: Wyniki run_query w kolejności zapytań.
+    """
+    if workers <= 1:
+        init_worker(radius_km, api_key, HTTP_RATE_LIMIT, log_level)
+        yield from map(run_query, queries)
+        return
+    # Limit zapytań HTTP (OpenCage) jest dzielony między procesy
+    initargs = (radius_km, api_key, HTTP_RATE_LIMIT / workers, log_level)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=initargs) as executor:
+        yield from executor.map(run_query, queries, chunksize=chunksize)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Wsadowe wyszukiwanie nadajników w promieniu od adresów lub współrzędnych."
+    )
+    parser.add_argument('input', help="plik z zapytaniami (jedno na wiersz) lub '-' dla stdin")
+    parser.add_argument('--radius', type=float, default=1.0, help="promień wyszukiwania w km (domyślnie 1)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='jsonl', help="format wyników (domyślnie jsonl)")
+    parser.add_argument('-o', '--output', default='-', help="plik wynikowy (domyślnie stdout)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="liczba procesów (domyślnie liczba rdzeni)")
+    parser.add_argument('--chunksize', type=int, default=16, help="liczba zapytań przekazywanych procesowi naraz")
+    parser.add_argument('--api-key', default=os.environ.get('OPENCAGE_API_KEY'),
+                        help="klucz API OpenCage (domyślnie zmienna OPENCAGE_API_KEY)")
+    parser.add_argument('-v', '--verbose', action='store_true', help="szczegółowe logi na stderr")
+    args = parser.parse_args(argv)
+
+    if not 0 < args.radius <= MAX_RADIUS_KM:
+        parser.error(f"promień musi mieścić się w zakresie (0, {MAX_RADIUS_KM}] km")
+    log_level = logging.INFO if args.verbose else logging.WARNING
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    queries = read_queries(args.input)
+
+    # Wczytanie bazy w procesie głównym tworzy cache kolumnowy, indeks i tabelę lokalizacji,
+    # więc procesy robocze tylko mapują gotowe pliki
+    start = time.perf_counter()
+    QueryEngine.from_settings().store.load()
+    load_time = time.perf_counter() - start
+
+    stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    writer = RESULT_WRITERS[args.format](stream)
+    count = errors = sites = 0
+    start = time.perf_counter()
+    try:
+        for record in run_queries(queries, args.radius, args.api_key, args.workers, args.chunksize, log_level):
+            writer.write(record)
+            count += 1
+            errors += record['error'] is not None
+            sites += len(record['sites'])
+        writer.close()
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Wczytanie bazy: {load_time:.2f} s. Zapytania: {count} ({errors} błędów, {sites} lokalizacji) "
+        f"w {elapsed:.2f} s: {count / max(elapsed, 1e-9):.1f} zapytań/s ({args.workers} procesów)",
+        file=sys.stderr
+    )
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
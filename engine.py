@@ -0,0 +1,197 @@
+import logging
+from collections import namedtuple
+
+import numpy as np
+
+from azimuth_store import AzimuthStore
+from geo import haversine_km
+from geocoding import GeocodeCache, Geocoder, voivodeship_from_stations
+from http_cache import ResponseCache
+from metrics import METRICS
+from settings import (
+    AZIMUTH_DB_PATH, DATABASE_PATH, GEOCODE_CACHE_PATH, GEOCODE_CACHE_SIZE, HTTP_BURST, HTTP_CACHE_PATH,
+    HTTP_CIRCUIT_COOLDOWN_S, HTTP_CIRCUIT_FAILURES, HTTP_MAX_RETRIES, HTTP_RATE_LIMIT, HTTP_TIMEOUT_S,
+    MAX_CONNECTIONS, MAX_CONNECTIONS_PER_HOST, MAX_RADIUS_KM, OFFLINE
+)
+from si2pem import HttpClient
+from stations import StationStore
+
+# Wynik zapytania o adres lub współrzędne
+QueryResult = namedtuple('QueryResult', ['location', 'wojewodztwo', 'stations', 'sites'])
+
+
+def create_http_client(rate_limit=HTTP_RATE_LIMIT):
+    """
+    Tworzy klienta HTTP z ustawieniami z config.ini.
+
+    Args:
+        rate_limit (float): Limit zapytań na sekundę na host (np. część limitu przy wielu procesach).
+
+    Returns:
+        HttpClient: Klient z pulą połączeń i cache odpowiedzi.
+    """
+    return HttpClient(
+        max_connections=MAX_CONNECTIONS, max_per_host=MAX_CONNECTIONS_PER_HOST,
+        cache=ResponseCache(HTTP_CACHE_PATH), offline=OFFLINE,
+        rate_limit=rate_limit, burst=HTTP_BURST, max_retries=HTTP_MAX_RETRIES,
+        circuit_failures=HTTP_CIRCUIT_FAILURES, circuit_cooldown=HTTP_CIRCUIT_COOLDOWN_S, timeout=HTTP_TIMEOUT_S
+    )
+
+
+def site_records(sites, station_azimuths, location=None):
+    """
+    Zamienia tabelę lokalizacji na listę słowników gotowych do zapisu (CSV, GeoJSON, JSON).
+
+    Args:
+        sites (pd.DataFrame): Lokalizacje z StationStore.sites_for.
+        station_azimuths (dict): StationId -> lista azymutów (z AzimuthStore.azimuths_for).
+        location (tuple): Współrzędne (lat, lon) zapytania; gdy podane, lokalizacje mają
+            odległość distance_km i są posortowane od najbliższej.
+
+    Returns:
+        list: Słowniki z kluczami lat, lon, distance_km, operators, station_ids, bands, azimuths.
+    """
+    lats = sites['LATIuke'].to_numpy(dtype=np.float64)
+    lons = sites['LONGuke'].to_numpy(dtype=np.float64)
+    if location is not None:
+        distances = haversine_km(location[0], location[1], lats, lons)
+        order = np.argsort(distances, kind='stable')
+    else:
+        distances = np.full(len(sites), np.nan)
+        order = np.arange(len(sites))
+
+    operators = sites['operators'].tolist()
+    station_ids = sites['station_ids'].tolist()
+    tooltip_operators = sites['tooltip_operators'].tolist()
+    band_summary = sites['band_summary'].tolist()
+    first_station_ids = sites['station_id'].tolist()
+
+    records = []
+    for i in order.tolist():
+        records.append({
+            'lat': round(float(lats[i]), 6),
+            'lon': round(float(lons[i]), 6),
+            'distance_km': None if np.isnan(distances[i]) else round(float(distances[i]), 3),
+            'operators': operators[i],
+            'station_ids': station_ids[i],
+            'bands': dict(zip(tooltip_operators[i], band_summary[i])),
+            # Azymuty lokalizacji pochodzą z pierwszego StationId, tak jak na mapie
+            'azimuths': station_azimuths.get(first_station_ids[i], []),
+        })
+    return records
+
+
+class QueryEngine:
+    """
+    Logika wyszukiwania nadajników niezależna od PyQt.
+
+    Łączy geokodowanie, filtrowanie po promieniu, agregację do lokalizacji i odczyt
+    azymutów. Używana przez GUI (Worker) i przez wsadowe CLI (cli.py).
+    """
+
+    def __init__(self, store, azimuth_store, geocoder, max_radius_km=MAX_RADIUS_KM):
+        self.store = store
+        self.azimuth_store = azimuth_store
+        self.geocoder = geocoder
+        self.max_radius_km = max_radius_km
+
+    @classmethod
+    def from_settings(cls, http_rate_limit=HTTP_RATE_LIMIT):
+        """
+        Tworzy silnik z własnymi instancjami baz i klienta HTTP według config.ini.
+
+        Args:
+            http_rate_limit (float): Limit zapytań na sekundę dla klienta HTTP tej instancji.
+
+        Returns:
+            QueryEngine: Nowy silnik.
+        """
+        store = StationStore(DATABASE_PATH)
+        geocoder = Geocoder(create_http_client(http_rate_limit), GeocodeCache(GEOCODE_CACHE_PATH, GEOCODE_CACHE_SIZE))
+        return cls(store, AzimuthStore(AZIMUTH_DB_PATH), geocoder)
+
+    def locate(self, address, api_key, cancel_token=None):
+        """
+        Geokoduje adres.
+
+        Args:
+            address (str): Adres do geokodowania.
+            api_key (str): Klucz API OpenCage.
+            cancel_token (CancelToken): Przerywa zapytanie i jego ponowienia.
+
+        Returns:
+            tuple: ((lat, lon), wojewodztwo) lub (None, None) w przypadku błędu.
+
+        Raises:
+            Cancelled: Gdy cancel_token został anulowany.
+        """
+        with METRICS.span('geocode'):
+            return self.geocoder.locate(address, api_key, cancel_token)
+
+    def stations_within(self, location, radius_km):
+        """
+        Zwraca nadajniki w promieniu od lokalizacji.
+
+        Args:
+            location (tuple): Współrzędne (lat, lon).
+            radius_km (float): Promień w kilometrach.
+
+        Returns:
+            pd.DataFrame: Nadajniki w promieniu.
+
+        Raises:
+            ValueError: Gdy promień jest niedodatni lub większy niż max_radius_km.
+        """
+        if not 0 < radius_km <= self.max_radius_km:
+            raise ValueError(f"Promień musi mieścić się w zakresie (0, {self.max_radius_km}] km: {radius_km}")
+        # Pierwsze zapytanie wczytuje bazę poza spanem filter, aby każdy etap miał własny czas
+        self.store.load()
+        with METRICS.span('filter'):
+            return self.store.query_radius(location, radius_km)
+
+    def site_azimuths(self, sites):
+        """
+        Zwraca azymuty lokalizacji (pierwszy StationId lokalizacji) jednym zapytaniem.
+
+        Args:
+            sites (pd.DataFrame): Lokalizacje z tabeli lokalizacji.
+
+        Returns:
+            dict: StationId -> lista azymutów.
+        """
+        return self.azimuth_store.azimuths_for(sites['station_id'].unique())
+
+    def query(self, location, radius_km, wojewodztwo=None):
+        """
+        Wyszukuje lokalizacje nadajników w promieniu od współrzędnych.
+
+        Args:
+            location (tuple): Współrzędne (lat, lon).
+            radius_km (float): Promień w kilometrach.
+            wojewodztwo (str): Województwo używane, gdy nie da się go ustalić z bazy nadajników
+                (np. nazwa z geokodowania).
+
+        Returns:
+            QueryResult: Lokalizacja, województwo, nadajniki i lista lokalizacji (site_records).
+        """
+        stations = self.stations_within(location, radius_km)
+        sites = self.store.sites_for(stations)
+        with METRICS.span('records'):
+            records = site_records(sites, self.site_azimuths(sites), location)
+        # Ustalane po filtrowaniu, gdy baza jest już wczytana
+        with METRICS.span('voivodeship'):
+            wojewodztwo = voivodeship_from_stations(self.store, location) or wojewodztwo
+        logging.debug(f"Zapytanie {location}, promień {radius_km} km: {len(stations)} nadajników, {len(records)} lokalizacji")
+        return QueryResult(location, wojewodztwo, stations, records)
+
+    def search(self, address, api_key, radius_km):
+        """
+        Geokoduje adres i wyszukuje lokalizacje nadajników w promieniu.
+
+        Returns:
+            QueryResult | None: Wynik lub None, gdy nie udało się ustalić lokalizacji.
+        """
+        location, wojewodztwo = self.locate(address, api_key)
+        if location is None:
+            return None
+        return self.query(location, radius_km, wojewodztwo)
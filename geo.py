@@ -0,0 +1,259 @@
+import logging
+import os
+
+import numpy as np
+from geopy.distance import geodesic
+
+# Średni promień Ziemi (IUGG) w kilometrach
+EARTH_RADIUS_KM = 6371.0088
+
+# Maksymalny względny błąd wzoru haversine względem elipsoidy WGS84 (~0.56%)
+HAVERSINE_TOLERANCE = 0.006
+
+
+def haversine_km(lat, lon, lats, lons):
+    """
+    Oblicza odległości wielkiego koła od punktu do tablicy punktów (wektorowo).
+
+    Args:
+        lat (float): Szerokość geograficzna punktu odniesienia.
+        lon (float): Długość geograficzna punktu odniesienia.
+        lats (array-like): Szerokości geograficzne punktów.
+        lons (array-like): Długości geograficzne punktów.
+
+    Returns:
+        np.ndarray: Odległości w kilometrach.
+    """
+    lat1 = np.radians(lat)
+    lon1 = np.radians(lon)
+    lat2 = np.radians(np.asarray(lats, dtype=np.float64))
+    lon2 = np.radians(np.asarray(lons, dtype=np.float64))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def within_radius(location, lats, lons, radius_km, exact=True):
+    """
+    Zwraca maskę punktów leżących w promieniu od lokalizacji.
+
+    Odległość liczona jest wektorowo wzorem haversine. Jeśli exact=True, punkty
+    leżące w pasie niepewności wokół granicy promienia są weryfikowane dokładną
+    odległością geodezyjną, dzięki czemu wynik jest identyczny z geodesic().
+
+    Args:
+        location (tuple): Współrzędne (lat, lon).
+        lats (array-like): Szerokości geograficzne punktów.
+        lons (array-like): Długości geograficzne punktów.
+        radius_km (float): Promień w kilometrach.
+        exact (bool): Czy weryfikować punkty graniczne geodezyjnie.
+
+    Returns:
+        np.ndarray: Maska logiczna.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    distances = haversine_km(location[0], location[1], lats, lons)
+    if not exact:
+        return distances <= radius_km
+
+    margin = radius_km * HAVERSINE_TOLERANCE + 1e-3
+    mask = distances <= radius_km - margin
+    boundary = np.flatnonzero(np.abs(distances - radius_km) <= margin)
+    for i in boundary:
+        mask[i] = geodesic(location, (lats[i], lons[i])).km <= radius_km
+    return mask
+
+
+class SpatialIndex:
+    """
+    Indeks przestrzenny stacji oparty na jednorodnej siatce lat/lon.
+
+    Wiersze są posortowane według numeru komórki, a cell_starts wskazuje początek
+    każdej komórki w tablicy order. Zapytanie o promień dotyka tylko komórek
+    pokrywających prostokąt otaczający okrąg.
+    """
+
+    VERSION = 1
+
+    def __init__(self, order, cell_starts, lat0, lon0, n_rows, n_cols, cell_deg):
+        self.order = order
+        self.cell_starts = cell_starts
+        self.lat0 = lat0
+        self.lon0 = lon0
+        self.n_rows = n_rows
+        self.n_cols = n_cols
+        self.cell_deg = cell_deg
+
+    @classmethod
+    def build(cls, lats, lons, cell_deg=0.05):
+        """
+        Buduje indeks z tablic współrzędnych.
+
+        Args:
+            lats (array-like): Szerokości geograficzne.
+            lons (array-like): Długości geograficzne.
+            cell_deg (float): Rozmiar komórki siatki w stopniach.
+
+        Returns:
+            SpatialIndex: Zbudowany indeks.
+        """
+        lats = np.asarray(lats, dtype=np.float64)
+        lons = np.asarray(lons, dtype=np.float64)
+        valid = np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+        if len(valid) == 0:
+            return cls(np.empty(0, dtype=np.int32), np.zeros(2, dtype=np.int64), 0.0, 0.0, 1, 1, cell_deg)
+
+        lat0 = float(np.floor(lats[valid].min() / cell_deg) * cell_deg)
+        lon0 = float(np.floor(lons[valid].min() / cell_deg) * cell_deg)
+        rows = ((lats[valid] - lat0) // cell_deg).astype(np.int64)
+        cols = ((lons[valid] - lon0) // cell_deg).astype(np.int64)
+        n_rows = int(rows.max()) + 1
+        n_cols = int(cols.max()) + 1
+        cells = rows * n_cols + cols
+
+        sort = np.argsort(cells, kind='stable')
+        order = valid[sort].astype(np.int32)
+        counts = np.bincount(cells, minlength=n_rows * n_cols)
+        cell_starts = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+        return cls(order, cell_starts, lat0, lon0, n_rows, n_cols, cell_deg)
+
+    def candidates(self, location, radius_km):
+        """
+        Zwraca pozycje wierszy z komórek pokrywających okrąg o danym promieniu.
+
+        Args:
+            location (tuple): Współrzędne (lat, lon).
+            radius_km (float): Promień w kilometrach.
+
+        Returns:
+            np.ndarray: Pozycje wierszy (nieposortowane).
+        """
+        lat, lon = location
+        dlat = np.degrees(radius_km / EARTH_RADIUS_KM) * (1 + HAVERSINE_TOLERANCE)
+        max_lat = min(abs(lat) + dlat, 89.9)
+        dlon = dlat / np.cos(np.radians(max_lat))
+        return self.candidates_in_bbox(lat - dlat, lat + dlat, lon - dlon, lon + dlon)
+
+    def candidates_in_bbox(self, min_lat, max_lat, min_lon, max_lon):
+        """
+        Zwraca pozycje wierszy z komórek pokrywających prostokąt.
+
+        Args:
+            min_lat (float): Minimalna szerokość geograficzna.
+            max_lat (float): Maksymalna szerokość geograficzna.
+            min_lon (float): Minimalna długość geograficzna.
+            max_lon (float): Maksymalna długość geograficzna.
+
+        Returns:
+            np.ndarray: Pozycje wierszy (nieposortowane).
+        """
+        row_lo = max(int((min_lat - self.lat0) // self.cell_deg), 0)
+        row_hi = min(int((max_lat - self.lat0) // self.cell_deg), self.n_rows - 1)
+        col_lo = max(int((min_lon - self.lon0) // self.cell_deg), 0)
+        col_hi = min(int((max_lon - self.lon0) // self.cell_deg), self.n_cols - 1)
+        if row_lo > row_hi or col_lo > col_hi:
+            return np.empty(0, dtype=np.int32)
+
+        chunks = []
+        for row in range(row_lo, row_hi + 1):
+            start = self.cell_starts[row * self.n_cols + col_lo]
+            end = self.cell_starts[row * self.n_cols + col_hi + 1]
+            if end > start:
+                chunks.append(self.order[start:end])
+        if not chunks:
+            return np.empty(0, dtype=np.int32)
+        return np.concatenate(chunks)
+
+    def query_radius(self, location, radius_km, lats, lons):
+        """
+        Zwraca posortowane pozycje wierszy leżących w promieniu od lokalizacji.
+
+        Args:
+            location (tuple): Współrzędne (lat, lon).
+            radius_km (float): Promień w kilometrach.
+            lats (np.ndarray): Szerokości geograficzne wszystkich wierszy.
+            lons (np.ndarray): Długości geograficzne wszystkich wierszy.
+
+        Returns:
+            np.ndarray: Posortowane pozycje wierszy.
+        """
+        candidates = np.sort(self.candidates(location, radius_km))
+        mask = within_radius(location, lats[candidates], lons[candidates], radius_km)
+        return candidates[mask]
+
+    def save(self, path, source_path):
+        """
+        Zapisuje indeks do pliku .npz razem z rozmiarem i czasem modyfikacji pliku źródłowego.
+
+        Args:
+            path (str): Ścieżka pliku indeksu.
+            source_path (str): Ścieżka pliku CSV, z którego zbudowano indeks.
+        """
+        stat = os.stat(source_path)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(
+                f,
+                order=self.order,
+                cell_starts=self.cell_starts,
+                meta=np.array([
+                    self.VERSION, stat.st_size, stat.st_mtime_ns,
+                    self.n_rows, self.n_cols,
+                ], dtype=np.int64),
+                origin=np.array([self.lat0, self.lon0, self.cell_deg], dtype=np.float64),
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path, source_path):
+        """
+        Wczytuje indeks, jeśli jest aktualny względem pliku źródłowego.
+
+        Args:
+            path (str): Ścieżka pliku indeksu.
+            source_path (str): Ścieżka pliku CSV.
+
+        Returns:
+            SpatialIndex | None: Indeks lub None, gdy brak pliku albo jest nieaktualny.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            stat = os.stat(source_path)
+            with np.load(path) as data:
+                version, size, mtime_ns, n_rows, n_cols = data['meta'].tolist()
+                if version != cls.VERSION or size != stat.st_size or mtime_ns != stat.st_mtime_ns:
+                    return None
+                lat0, lon0, cell_deg = data['origin'].tolist()
+                return cls(data['order'], data['cell_starts'], lat0, lon0, n_rows, n_cols, cell_deg)
+        except (OSError, KeyError, ValueError) as e:
+            logging.warning(f"Nie udało się wczytać indeksu przestrzennego {path}: {e}")
+            return None
+
+    @classmethod
+    def for_csv(cls, source_path, lats, lons):
+        """
+        Zwraca indeks dla pliku CSV: wczytuje zapisany lub buduje i zapisuje nowy.
+
+        Args:
+            source_path (str): Ścieżka pliku CSV.
+            lats (array-like): Szerokości geograficzne wszystkich wierszy.
+            lons (array-like): Długości geograficzne wszystkich wierszy.
+
+        Returns:
+            SpatialIndex: Indeks przestrzenny.
+        """
+        path = source_path + '.idx.npz'
+        index = cls.load(path, source_path)
+        if index is not None and (len(index.order) == 0 or index.order.max() < len(lats)):
+            return index
+
+        logging.info(f"Budowanie indeksu przestrzennego dla {source_path}")
+        index = cls.build(lats, lons)
+        try:
+            index.save(path, source_path)
+        except OSError as e:
+            logging.warning(f"Nie udało się zapisać indeksu przestrzennego {path}: {e}")
+        return index
@@ -0,0 +1,220 @@
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+from cancellation import Cancelled
+from metrics import METRICS
+
+OPENCAGE_URL = 'https://api.opencagedata.com/geocode/v1/json'
+
+# Mapowanie województw (nazwy angielskie zwracane przez OpenCage -> nazwy z bazy UKE)
+WOJEWODZTW_MAP = {
+    "Podlaskie Voivodeship": "Podlaskie",
+    "West Pomeranian Voivodeship": "Zachodniopomorskie",
+    "Greater Poland Voivodeship": "Wielkopolskie",
+    "Warmian-Masurian Voivodeship": "Warmińsko-Mazurskie",
+    "Lesser Poland Voivodeship": "Małopolskie",
+    "Lublin Voivodeship": "Lubelskie",
+    "Holy Cross Voivodeship": "Świętokrzyskie",
+    "Masovian Voivodeship": "Mazowieckie",
+    "Opole Voivodeship": "Opolskie",
+    "Silesian Voivodeship": "Śląskie",
+    "Lower Silesian Voivodeship": "Dolnośląskie",
+    "Lubusz Voivodeship": "Lubuskie",
+    "Kuyavian-Pomeranian Voivodeship": "Kujawsko-Pomorskie",
+    "Łódź Voivodeship": "Łódzkie",
+    "Subcarpathian Voivodeship": "Podkarpackie",
+    "Pomeranian Voivodeship": "Pomorskie",
+}
+
+# Promienie (km), w których szukamy najbliższych nadajników do ustalenia województwa
+VOIVODESHIP_SEARCH_RADII_KM = (2, 5, 10, 25)
+
+
+def normalize_address(address):
+    """
+    Normalizuje adres do klucza cache (małe litery, bez interpunkcji i zbędnych spacji).
+
+    Args:
+        address (str): Adres wpisany przez użytkownika.
+
+    Returns:
+        str: Znormalizowany adres.
+    """
+    address = re.sub(r'[^\w\s-]', ' ', address.lower())
+    return ' '.join(address.split())
+
+
+def map_state_name(state):
+    """
+    Zamienia nazwę województwa z OpenCage na nazwę używaną w bazie UKE.
+
+    Args:
+        state (str): Nazwa z OpenCage (np. "Masovian Voivodeship" lub "województwo mazowieckie").
+
+    Returns:
+        str | None: Nazwa województwa lub None, gdy nie udało się jej rozpoznać.
+    """
+    if not state:
+        return None
+    if state in WOJEWODZTW_MAP:
+        return WOJEWODZTW_MAP[state]
+    if state.lower().startswith('województwo '):
+        return state[len('województwo '):].title()
+    return None
+
+
+def voivodeship_from_stations(store, location):
+    """
+    Ustala województwo lokalizacji offline na podstawie najbliższych nadajników z bazy UKE.
+
+    Każdy nadajnik w bazie ma przypisane województwo, więc wynikiem jest województwo
+    najczęściej występujące wśród nadajników w najmniejszym promieniu, w którym
+    jakiekolwiek nadajniki istnieją.
+
+    Args:
+        store (StationStore): Baza nadajników.
+        location (tuple): Współrzędne (lat, lon).
+
+    Returns:
+        str | None: Nazwa województwa lub None (np. poza Polską).
+    """
+    for radius_km in VOIVODESHIP_SEARCH_RADII_KM:
+        nearby = store.query_radius(location, radius_km)['wojewodztwo_id'].dropna()
+        if len(nearby):
+            return str(nearby.value_counts().idxmax())
+    return None
+
+
+class GeocodeCache:
+    """
+    Trwały cache geokodowania w bazie SQLite z usuwaniem najdawniej używanych wpisów.
+
+    Kluczem jest znormalizowany adres (normalize_address), więc różnice w wielkości
+    liter, spacjach i interpunkcji nie powodują ponownych zapytań.
+    """
+
+    def __init__(self, path, max_entries=1000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # Z cache korzysta też kilka procesów wsadowego CLI, stąd WAL i dłuższy timeout blokady
+        self._connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS geocode ('
+                'address TEXT PRIMARY KEY, lat REAL, lon REAL, state TEXT, last_used REAL)'
+            )
+
+    def get(self, address):
+        """
+        Zwraca zapisany wynik geokodowania.
+
+        Returns:
+            tuple | None: ((lat, lon), state) lub None, gdy adresu nie ma w cache.
+        """
+        key = normalize_address(address)
+        with self._lock, self._connection:
+            row = self._connection.execute('SELECT lat, lon, state FROM geocode WHERE address = ?', (key,)).fetchone()
+            if row is None:
+                return None
+            self._connection.execute('UPDATE geocode SET last_used = ? WHERE address = ?', (time.time(), key))
+        lat, lon, state = row
+        return (lat, lon), state
+
+    def put(self, address, location, state):
+        """
+        Zapisuje wynik geokodowania i usuwa najdawniej używane wpisy ponad limit.
+        """
+        key = normalize_address(address)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO geocode (address, lat, lon, state, last_used) VALUES (?, ?, ?, ?, ?)',
+                (key, location[0], location[1], state, time.time())
+            )
+            self._connection.execute(
+                'DELETE FROM geocode WHERE address NOT IN '
+                '(SELECT address FROM geocode ORDER BY last_used DESC LIMIT ?)', (self.max_entries,)
+            )
+
+
+class Geocoder:
+    """
+    Geokodowanie adresów przez OpenCage z cache.
+
+    Województwo zwracane przez locate pochodzi z OpenCage. Dokładniejsze ustalenie
+    offline (voivodeship_from_stations) wykonuje wywołujący, gdy go potrzebuje, bo
+    wymaga wczytanej bazy nadajników.
+    """
+
+    def __init__(self, http, cache, timeout=10):
+        self.http = http
+        self.cache = cache
+        self.timeout = timeout
+
+    def query_opencage(self, address, api_key, cancel_token=None):
+        """
+        Pobiera współrzędne i nazwę województwa z OpenCage API.
+
+        Returns:
+            tuple: ((lat, lon), state) lub (None, None) w przypadku błędu.
+
+        Raises:
+            Cancelled: Gdy cancel_token został anulowany.
+        """
+        try:
+            response = self.http.get(
+                OPENCAGE_URL, params={'q': address, 'key': api_key}, timeout=self.timeout, endpoint='opencage',
+                cancel_token=cancel_token
+            )
+            # W trybie offline i przy otwartym bezpieczniku HttpClient zwraca CachedResponse (504/503)
+            if response.status_code != 200:
+                logging.error(f"Błąd HTTP {response.status_code} podczas geokodowania adresu {address}.")
+                return None, None
+            data = response.json()
+        except Cancelled:
+            raise
+        except Exception as e:
+            logging.error(f"Błąd podczas geokodowania adresu {address}: {e}")
+            return None, None
+        if not data or not data.get('results'):
+            logging.warning(f"Brak wyników geokodowania dla adresu: {address}")
+            return None, None
+        result = data['results'][0]
+        lat = float(result['geometry']['lat'])
+        lon = float(result['geometry']['lng'])
+        return (lat, lon), result['components'].get('state')
+
+    def locate(self, address, api_key, cancel_token=None):
+        """
+        Zwraca współrzędne i województwo adresu (nazwa z OpenCage zamieniona na nazwę
+        z bazy UKE); powtórne zapytania obsługuje z cache.
+
+        Args:
+            address (str): Adres do geokodowania.
+            api_key (str): Klucz API OpenCage.
+            cancel_token (CancelToken): Przerywa zapytanie do OpenCage i jego ponowienia.
+
+        Returns:
+            tuple: ((lat, lon), wojewodztwo) lub (None, None) w przypadku błędu.
+
+        Raises:
+            Cancelled: Gdy cancel_token został anulowany.
+        """
+        cached = self.cache.get(address)
+        METRICS.cache_result('geocode', 'miss' if cached is None else 'hit')
+        if cached is not None:
+            location, state = cached
+            logging.info(f"Lokalizacja adresu {address} z cache: {location}")
+        else:
+            location, state = self.query_opencage(address, api_key, cancel_token)
+            if location is None:
+                return None, None
+            self.cache.put(address, location, state)
+
+        wojewodztwo = map_state_name(state) or state
+        logging.info(f"Pobrano lokalizację dla adresu {address}: {location}, województwo: {wojewodztwo}")
+        return location, wojewodztwo
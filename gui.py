@@ -0,0 +1,1139 @@
+import sys
+from PyQt5.QtWidgets import (
+    QApplication, QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QDialog, QFileDialog,
+    QLineEdit, QPushButton, QProgressBar, QLabel, QMessageBox, QSpinBox, QPlainTextEdit
+)
+from PyQt5.QtGui import QIcon, QFontDatabase
+from PyQt5.QtWebEngineWidgets import QWebEngineView
+from PyQt5.QtCore import QThread, QTimer, pyqtSignal
+import folium
+import pandas as pd
+import logging
+import concurrent.futures
+from collections import Counter
+import time
+from functools import partial
+import re
+from urllib.parse import urlencode
+from math import cos, sin, ceil, log2
+import json
+from map_layers import (
+    CLUSTER_MIN_ZOOM, DETAIL_ZOOM, azimuth_feature_collection, azimuth_segments, build_map_page, js_call, site_payload
+)
+from azimuth_store import AzimuthStore
+from cancellation import CancelToken, Cancelled
+from engine import QueryEngine, create_http_client
+from geocoding import GeocodeCache, Geocoder
+from job_journal import STATE_DOWNLOADED, STATE_FAILED, STATE_FETCHED, STATE_PARSED, STATE_PROGRESS, JobJournal
+from metrics import METRICS
+from pdf_cache import PdfCache
+from pdf_extract import extract_information_for_stations_timed
+from settings import (
+    AZIMUTH_DB_PATH, BASE_STATION_TTL_S, DATABASE_PATH, DUMP_EXTRACTED_TEXT, EXTRACTED_TEXT_DIR, GEOCODE_CACHE_PATH,
+    GEOCODE_CACHE_SIZE, JOB_JOURNAL_PATH, MAX_CONNECTIONS, MAX_RADIUS_KM, METRICS_EXPORT_PATH, METRICS_PANEL,
+    PDF_CACHE_MAX_MB, PDF_DIR, PDF_PAGE_NR, PDF_REVALIDATE, PDF_WORKERS, WFS_MULTI_TYPENAME, WFS_TILE_DEG, WFS_TTL_S
+)
+from si2pem import (
+    BASE_STATION_URL, FEATURE_TYPES, WFS_URL, assign_features_to_stations, parse_bbox, plan_tiles
+)
+from stations import StationStore
+
+# Liczba StationId pokazywanych na liście stacji oczekujących na pobranie PDF-ów
+PDF_QUEUE_PREVIEW = 10
+
+# Promień, do którego długość linii azymutów rośnie razem z promieniem wyszukiwania
+AZIMUTH_LENGTH_MAX_RADIUS_KM = 10
+
+# Postęp wyszukiwania (%) po kolejnych etapach Worker; 100 ustawia display_map
+SEARCH_PROGRESS = {'start': 5, 'geocode': 30, 'load': 70, 'filter': 90}
+
+# Co ile sekund PdfWorker sprawdza, czy przebieg anulowano, czekając na zadania puli
+CANCEL_POLL_S = 0.5
+
+# Odświeżanie panelu metryk (ms)
+METRICS_REFRESH_MS = 1000
+
+# Ustawienia logowania
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Baza nadajników współdzielona przez wszystkie wątki (wczytywana przy pierwszym zapytaniu)
+STATION_STORE = StationStore(DATABASE_PATH)
+
+# Wspólna sesja HTTP (pula połączeń) dla wszystkich zapytań do si2pem
+HTTP_CLIENT = create_http_client()
+
+# Cache pobranych raportów PDF
+PDF_CACHE = PdfCache(PDF_DIR, HTTP_CLIENT, max_bytes=PDF_CACHE_MAX_MB * 1024 * 1024, revalidate=PDF_REVALIDATE)
+
+# Wyniki ekstrakcji azymutów
+AZIMUTH_STORE = AzimuthStore(AZIMUTH_DB_PATH)
+
+# Dziennik przebiegów PdfWorker (wznawianie przerwanych pobrań)
+JOB_JOURNAL = JobJournal(JOB_JOURNAL_PATH)
+
+# Geokodowanie adresów z cache
+GEOCODER = Geocoder(HTTP_CLIENT, GeocodeCache(GEOCODE_CACHE_PATH, GEOCODE_CACHE_SIZE))
+
+# Logika wyszukiwania współdzielona z wsadowym CLI (engine.py)
+ENGINE = QueryEngine(STATION_STORE, AZIMUTH_STORE, GEOCODER)
+
+def normalize_operator_name(name):
+    """
+    Normalizuje nazwę operatora poprzez usunięcie znaków specjalnych i przekształcenie na małe litery.
+    
+    Args:
+        name (str): Nazwa operatora do normalizacji.
+        
+    Returns:
+        str: Znormalizowana nazwa operatora.
+    """
+    return re.sub(r'[^a-zA-Z0-9]', '', name).lower()
+
+# Mapowanie operatorów na kolory z normalizacją
+OPERATOR_COLORS = {
+    normalize_operator_name('Tmobile'): 'pink',
+    normalize_operator_name('T-Mobile'): 'pink',
+    normalize_operator_name('Play'): 'purple',
+    normalize_operator_name('Orange'): 'orange',
+    normalize_operator_name('Plus'): 'green'
+}
+
+def create_svg_icon(operators, operator_colors, size=30):
+    """
+    Tworzy SVG ikony z kolorami operatorów.
+    
+    Args:
+        operators (list): Lista operatorów.
+        operator_colors (dict): Słownik mapujący operatorów na kolory.
+        size (int): Rozmiar SVG.
+        
+    Returns:
+        folium.DivIcon: Utworzony DivIcon z SVG.
+    """
+    svg = f'<svg width="{size}" height="{size}" xmlns="http://www.w3.org/2000/svg">'
+    svg += f'<circle cx="{size/2}" cy="{size/2}" r="{size/2 - 1}" fill="white" stroke="black" stroke-width="1"/>'
+
+    if len(operators) == 1:
+        color = operator_colors.get(operators[0], 'gray')
+        svg = f'<svg width="{size}" height="{size}" xmlns="http://www.w3.org/2000/svg">'
+        svg += f'<circle cx="{size/2}" cy="{size/2}" r="{size/2 - 1}" fill="{color}" stroke="black" stroke-width="1"/>'
+    else:
+        num_operators = len(operators)
+        angle_step = 360 / num_operators
+        for i, operator in enumerate(operators):
+            color = operator_colors.get(operator, 'gray')
+            start_angle = i * angle_step
+            end_angle = (i + 1) * angle_step
+            start_rad = start_angle * (3.141592653589793 / 180)
+            end_rad = end_angle * (3.141592653589793 / 180)
+            x1 = size/2 + (size/2 - 1) * cos(start_rad)
+            y1 = size/2 + (size/2 - 1) * sin(start_rad)
+            x2 = size/2 + (size/2 - 1) * cos(end_rad)
+            y2 = size/2 + (size/2 - 1) * sin(end_rad)
+            large_arc = 1 if angle_step > 180 else 0
+            svg += f'<path d="M {size/2},{size/2} L {x1},{y1} A {size/2 - 1},{size/2 - 1} 0 {large_arc},1 {x2},{y2} Z" fill="{color}" stroke="black" stroke-width="1"/>'
+
+    svg += '</svg>'
+    return folium.DivIcon(html=svg)
+
+class Worker(QThread):
+    progress = pyqtSignal(int)
+    result = pyqtSignal(pd.DataFrame)
+    # Komunikat dla użytkownika, gdy nie udało się ustalić lokalizacji
+    failed = pyqtSignal(str)
+
+    def __init__(self, address, api_key, radius, engine=ENGINE):
+        super().__init__()
+        self.address = address
+        self.api_key = api_key
+        self.location = None
+        self.wojewodztwo = None
+        self.radius_km = radius
+        self.engine = engine
+        self.filtered_df = pd.DataFrame()
+        self.cancel_token = CancelToken()
+
+    def cancel(self):
+        """
+        Przerywa wyszukiwanie; wynik anulowanego wątku nie jest emitowany.
+        """
+        self.cancel_token.cancel()
+
+    def run(self):
+        try:
+            self.progress.emit(SEARCH_PROGRESS['start'])
+            # Geokodowanie działa w tym wątku, więc nie blokuje interfejsu
+            self.location, self.wojewodztwo = self.engine.locate(self.address, self.api_key, self.cancel_token)
+            if self.cancel_token.cancelled:
+                return
+            self.progress.emit(SEARCH_PROGRESS['geocode'])
+            if self.location is None:
+                self.failed.emit("Nie udało się pobrać lokalizacji.")
+                return
+            logging.info(f"Rozpoczęto filtrowanie nadajników dla lokalizacji {self.location}, województwo: {self.wojewodztwo}, promień: {self.radius_km} km")
+            # Indeks przestrzenny obejmuje cały kraj, więc stacje zza granicy województwa też są uwzględniane
+            self.filtered_df = self.filter_transmitters_by_location(self.location, self.radius_km)
+            if self.cancel_token.cancelled:
+                return
+            self.result.emit(self.filtered_df)
+        except Cancelled:
+            logging.info(f"Wyszukiwanie adresu {self.address} zostało przerwane.")
+        except Exception as e:
+            logging.error(f"Error reading CSV file: {e}")
+            self.result.emit(pd.DataFrame())
+
+    def filter_transmitters_by_location(self, location, radius_km):
+        """
+        Filtruje nadajniki w promieniu, zgłaszając postęp po zakończeniu kolejnych etapów.
+
+        Args:
+            location (tuple): Współrzędne (lat, lon).
+            radius_km (float): Promień w kilometrach.
+
+        Returns:
+            pd.DataFrame: Nadajniki w promieniu.
+        """
+        # Pierwsze wyszukiwanie wczytuje bazę (najdłuższy etap), kolejne korzystają z pamięci
+        self.engine.store.load()
+        self.progress.emit(SEARCH_PROGRESS['load'])
+        filtered_df = self.engine.stations_within(location, radius_km)
+        self.progress.emit(SEARCH_PROGRESS['filter'])
+        return filtered_df
+
+class PdfWorker(QThread):
+    progress = pyqtSignal(int)
+    result = pyqtSignal(list)
+    # StationId zakończonej stacji, jej wyekstrahowane dane (pusta lista przy błędzie) i lista pozostałych stacji
+    station_done = pyqtSignal(str, list, list)
+
+    def __init__(self, station_ids, store=STATION_STORE, http=HTTP_CLIENT, pdf_cache=PDF_CACHE,
+                 azimuth_store=AZIMUTH_STORE, journal=JOB_JOURNAL):
+        super().__init__()
+        self.station_ids = station_ids
+        self.store = store
+        self.http = http
+        self.pdf_cache = pdf_cache
+        self.azimuth_store = azimuth_store
+        self.journal = journal
+        self.job_id = None
+        self.station_states = {}
+        self.failed_stations = {}
+        self.io_executor = None
+        self.pdf_executor = None
+        self.extracted_data = []
+        self.tier_counts = Counter()
+        self.cancel_token = CancelToken()
+
+    def cancel(self):
+        """
+        Przerywa przebieg: nowe zapytania i ekstrakcje nie są uruchamiane, a trwające
+        pobierania są przerywane. Stan stacji zostaje w dzienniku, więc przebieg można wznowić.
+        """
+        self.cancel_token.cancel()
+
+    def set_station_state(self, station_id, state, reason=None, pdf_urls=None):
+        """
+        Zapisuje stan stacji w dzienniku zadania i aktualizuje pasek postępu.
+        """
+        self.station_states[station_id] = state
+        self.journal.mark(self.job_id, station_id, state, reason, pdf_urls)
+        self.emit_progress()
+
+    def emit_progress(self):
+        """
+        Zgłasza postęp przebiegu na podstawie stanów stacji.
+        """
+        completed = sum(STATE_PROGRESS[state] for state in self.station_states.values())
+        self.progress.emit(int(completed / len(self.station_states) * 100))
+
+    def run(self):
+        started = time.perf_counter()
+        try:
+            # Pomijamy identyfikatory, których nie ma w bazie (np. puste StationId zapisane jako 'nan')
+            known_ids = set(self.store.by_station_ids(self.station_ids)['StationId'])
+            self.station_ids = [str(station_id) for station_id in self.station_ids if str(station_id) in known_ids and str(station_id) != 'nan']
+            if not self.station_ids:
+                self.result.emit([])
+                return
+
+            # Nieukończone zadanie dla tych samych stacji jest wznawiane z dziennika
+            self.job_id, journal_states = self.journal.start(self.station_ids)
+            self.station_states = {station_id: state for station_id, (state, _) in journal_states.items()}
+            # Pasek startuje od pracy wykonanej w przerwanym przebiegu (stacje z błędem są ponawiane od zera)
+            self.emit_progress()
+            remaining = list(self.station_ids)
+
+            def finish_station(station_id, info, reason=None):
+                if info:
+                    self.extracted_data.append(info)
+                self.set_station_state(station_id, STATE_FAILED if reason else STATE_PARSED, reason)
+                remaining.remove(station_id)
+                self.station_done.emit(station_id, info or [], list(remaining))
+
+            # Stacje przetworzone w przerwanym przebiegu mają już azymuty w AzimuthStore
+            for station_id, state in list(self.station_states.items()):
+                if state == STATE_PARSED:
+                    remaining.remove(station_id)
+                    self.station_done.emit(station_id, [], list(remaining))
+            # Stacje z zapisanymi URL-ami PDF nie wymagają ponownych zapytań do si2pem
+            station_urls = {
+                station_id: pdf_urls for station_id, (state, pdf_urls) in journal_states.items()
+                if state in (STATE_FETCHED, STATE_DOWNLOADED) and pdf_urls is not None
+            }
+            to_fetch = [station_id for station_id in remaining if station_id not in station_urls]
+
+            # Zapytania HTTP wszystkich stacji trafiają do jednej wspólnej puli wątków,
+            # a HttpClient ogranicza liczbę zapytań na host
+            self.io_executor = concurrent.futures.ThreadPoolExecutor(max_workers=MAX_CONNECTIONS)
+            self.pdf_executor = concurrent.futures.ProcessPoolExecutor(max_workers=PDF_WORKERS)
+            cancelled = False
+            # PDF-y pobrane w tym przebiegu nie mogą zniknąć z cache przed ekstrakcją
+            with self.pdf_cache.deferred_eviction():
+                try:
+                    self.fetch_and_process(to_fetch, station_urls, finish_station)
+                except Cancelled:
+                    cancelled = True
+                    raise
+                finally:
+                    # Po anulowaniu nie czekamy na trwające zapytania i ekstrakcje (bez with, którego
+                    # __exit__ czekałby na nie), a zakolejkowane zadania są odrzucane
+                    self.io_executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
+                    self.pdf_executor.shutdown(wait=not cancelled, cancel_futures=cancelled)
+        except Cancelled:
+            logging.info("Przebieg PdfWorker został przerwany.")
+        except Exception as e:
+            logging.error(f"Error in PdfWorker: {e}")
+        # Stany stacji są już w dzienniku, więc po błędzie ponowne uruchomienie wznowi zadanie
+        if self.job_id is not None:
+            self.failed_stations = self.journal.finish(self.job_id)
+            if self.failed_stations:
+                logging.warning(f"Nieprzetworzone stacje: {len(self.failed_stations)} - można ponowić pobieranie")
+        # Czasy użycia PDF-ów z cache są zapisywane raz na przebieg
+        try:
+            self.pdf_cache.flush()
+        except OSError as e:
+            logging.warning(f"Nie udało się zapisać indeksu cache PDF: {e}")
+        self.log_tier_hit_rates()
+        METRICS.record_span('pdf_run', time.perf_counter() - started, stations=len(self.station_ids))
+        logging.info(f"Metryki po przebiegu PdfWorker:\n{METRICS.summary()}")
+        self.result.emit(self.extracted_data)
+
+    def as_completed(self, futures):
+        """
+        Zwraca zakończone zadania jak concurrent.futures.as_completed, ale co CANCEL_POLL_S
+        sprawdza, czy przebieg anulowano, zamiast czekać na trwające zapytania.
+
+        Raises:
+            Cancelled: Gdy przebieg został anulowany.
+        """
+        waiting = set(futures)
+        while waiting:
+            done, waiting = concurrent.futures.wait(
+                waiting, timeout=CANCEL_POLL_S, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            self.cancel_token.raise_if_cancelled()
+            yield from done
+
+    def fetch_and_process(self, to_fetch, station_urls, finish_station):
+        """
+        Etapy przebiegu: informacje o stacjach, zapytania WFS, pobieranie i ekstrakcja PDF-ów.
+
+        Args:
+            to_fetch (list): StationId, dla których trzeba pobrać informacje z si2pem.
+            station_urls (dict): StationId -> set URL-i PDF dla stacji wznowionych z dziennika.
+            finish_station (callable): Wywoływana po zakończeniu stacji.
+
+        Raises:
+            Cancelled: Gdy przebieg został anulowany.
+        """
+        # 1. Bounding boxy stacji
+        station_bboxes = {}
+        with METRICS.span('station_info', stations=len(to_fetch)):
+            future_to_station = {
+                self.io_executor.submit(self.get_station_bbox, station_id): station_id
+                for station_id in to_fetch
+            }
+            for future in self.as_completed(future_to_station):
+                station_id = future_to_station[future]
+                try:
+                    bbox = future.result()
+                except Cancelled:
+                    raise
+                except Exception as e:
+                    logging.error(f"Błąd podczas pobierania informacji o StationId {station_id}: {e}")
+                    bbox = None
+                if bbox:
+                    station_bboxes[station_id] = bbox
+                else:
+                    finish_station(station_id, None, "Nie udało się pobrać informacji o stacji")
+
+        self.cancel_token.raise_if_cancelled()
+
+        # 2. Zapytania WFS dla kafli zamiast dla każdej stacji osobno
+        with METRICS.span('wfs', stations=len(station_bboxes)):
+            for station_id, pdf_urls in self.collect_pdf_urls(station_bboxes).items():
+                self.set_station_state(station_id, STATE_FETCHED, pdf_urls=pdf_urls)
+                station_urls[station_id] = pdf_urls
+
+        self.cancel_token.raise_if_cancelled()
+
+        # 3. Pobieranie i ekstrakcja PDF-ów - każdy unikalny PDF raz dla całego przebiegu
+        with METRICS.span('pdfs', stations=len(station_urls)):
+            self.process_pdfs(station_urls, finish_station)
+
+    def log_tier_hit_rates(self):
+        """
+        Loguje udział poziomów ekstrakcji azymutów (szybki, pełny, brak wyniku) w przetworzonych PDF-ach.
+        """
+        total = sum(self.tier_counts.values())
+        if not total:
+            return
+        rates = ', '.join(
+            f"{tier}: {count} ({count / total:.0%})" for tier, count in self.tier_counts.most_common()
+        )
+        logging.info(f"Ekstrakcja azymutów z {total} PDF-ów - {rates}")
+
+    def get_base_station_info(self, base_station_id):
+        """
+        Pobiera informacje o nadajniku na podstawie jego ID.
+        """
+        url = f"{BASE_STATION_URL}?search={base_station_id}"
+        response = self.http.get(
+            url, ttl=BASE_STATION_TTL_S, endpoint='base_station', cancel_token=self.cancel_token, timeout=15
+        )
+        if response.status_code != 200:
+            logging.error(f"Błąd HTTP {response.status_code} podczas pobierania informacji o nadajniku.")
+            return None
+        data = response.json()
+        if isinstance(data, list) and len(data) > 0:
+            return data[0]
+        else:
+            logging.error(f"Nie znaleziono nadajnika o ID: {base_station_id}")
+            return None
+
+    def construct_wfs_getfeature_url(self, bbox, feature_type='public:measures_all', output_format='application/json'):
+        """
+        Konstrukcja URL do zapytania WFS GetFeature z filtrem BBOX.
+        """
+        base_url = WFS_URL
+        params = {
+            'service': 'WFS',
+            'version': '1.0.0',
+            'request': 'GetFeature',
+            'typeName': feature_type,
+            'outputFormat': output_format,
+            'srsName': 'EPSG:4326',
+            'bbox': f"{bbox[2]},{bbox[0]},{bbox[3]},{bbox[1]},EPSG:4326"
+        }
+        query_string = urlencode(params)
+        return f"{base_url}?{query_string}"
+
+    def get_feature_data(self, wfs_url):
+        """
+        Wysyła zapytanie WFS GetFeature i zwraca dane GeoJSON.
+        """
+        response = self.http.get(wfs_url, ttl=WFS_TTL_S, endpoint='wfs', cancel_token=self.cancel_token, timeout=60)
+        if response.status_code != 200:
+            logging.error(f"Błąd HTTP {response.status_code} podczas pobierania danych WFS.")
+            return None
+        try:
+            data = response.json()
+            return data
+        except json.JSONDecodeError as e:
+            logging.error(f"Błąd dekodowania JSON: {e}")
+            return None
+
+    def extract_pdf_urls(self, features):
+        """
+        Ekstrahuje URL-e do PDF z cech GeoJSON.
+        Zakładam, że URL do PDF znajduje się w polu 'url' w properties.
+        """
+        pdf_urls = set()
+        for feature in features:
+            pdf_url = self.pdf_url_from_properties(feature.get('properties', {}))
+            if pdf_url:
+                pdf_urls.add(pdf_url)
+        return pdf_urls
+
+    @staticmethod
+    def pdf_url_from_properties(properties):
+        """
+        Zwraca URL do PDF z właściwości cechy WFS (lub None).
+        """
+        return properties.get('url') or properties.get('pdf_url') or properties.get('PDF_URL')
+
+    def download_pdf(self, pdf_url):
+        """
+        Zwraca lokalną ścieżkę PDF z podanego URL, pobierając go tylko wtedy, gdy nie ma go w cache.
+        """
+        with METRICS.span('pdf_download'):
+            return self.pdf_cache.get(pdf_url, cancel_token=self.cancel_token)
+
+    def get_station_bbox(self, station_id):
+        """
+        Pobiera bounding box stacji z API base_station.
+
+        Returns:
+            tuple | None: (min_lat, max_lat, min_lon, max_lon) lub None w przypadku błędu.
+        """
+        base_station = self.get_base_station_info(station_id)
+        if not base_station:
+            return None
+
+        bbox = parse_bbox(base_station.get('boundingbox', []))
+        if bbox is None:
+            logging.error("Nieprawidłowy bounding box.")
+            return None
+        logging.info(f"Bounding box dla StationId {station_id}: {bbox}")
+        return bbox
+
+    def get_tile_features(self, bbox, feature_type):
+        """
+        Pobiera cechy WFS jednej warstwy (lub kilku, rozdzielonych przecinkami) dla kafla.
+
+        Returns:
+            list | None: Cechy GeoJSON lub None w przypadku błędu.
+        """
+        wfs_url = self.construct_wfs_getfeature_url(bbox, feature_type=feature_type)
+        logging.info(f"Wysyłanie zapytania WFS GetFeature dla warstwy '{feature_type}': {wfs_url}")
+        geojson_data = self.get_feature_data(wfs_url)
+        if not geojson_data:
+            logging.error(f"Nie udało się pobrać danych dla warstwy '{feature_type}'.")
+            return None
+        return geojson_data.get('features', [])
+
+    def collect_pdf_urls(self, station_bboxes):
+        """
+        Zbiera URL-e PDF dla wszystkich stacji, odpytując każdą warstwę WFS raz na kafel.
+
+        Stacje leżące blisko siebie są łączone w kafle (si2pem.plan_tiles), a zwrócone
+        cechy są przypisywane do stacji lokalnie, według ich bounding boxów. Jeśli
+        zapytanie kafla się nie powiedzie albo cechy nie mają geometrii, stacje kafla
+        są odpytywane osobno, jak wcześniej.
+
+        Args:
+            station_bboxes (dict): StationId -> (min_lat, max_lat, min_lon, max_lon).
+
+        Returns:
+            dict: StationId -> set URL-i PDF.
+        """
+        station_urls = {station_id: set() for station_id in station_bboxes}
+        if not station_bboxes:
+            return station_urls
+
+        plan = plan_tiles(station_bboxes, WFS_TILE_DEG)
+        layer_groups = [','.join(FEATURE_TYPES)] if WFS_MULTI_TYPENAME else FEATURE_TYPES
+        logging.info(f"Plan WFS: {len(plan)} kafli x {len(layer_groups)} zapytań dla {len(station_bboxes)} stacji")
+
+        future_to_tile = {
+            self.io_executor.submit(self.get_tile_features, tile_bbox, feature_type): tile_index
+            for tile_index, (tile_bbox, _) in enumerate(plan)
+            for feature_type in layer_groups
+        }
+        fallback = set()
+        for future in self.as_completed(future_to_tile):
+            _, tile_station_ids = plan[future_to_tile[future]]
+            try:
+                features = future.result()
+            except Cancelled:
+                raise
+            except Exception as e:
+                logging.error(f"Błąd zapytania WFS dla kafla: {e}")
+                features = None
+            if features is None:
+                fallback.update(tile_station_ids)
+                continue
+            tile_bboxes = {station_id: station_bboxes[station_id] for station_id in tile_station_ids}
+            urls, complete = assign_features_to_stations(features, tile_bboxes, self.pdf_url_from_properties)
+            if not complete:
+                fallback.update(tile_station_ids)
+            for station_id, pdf_urls in urls.items():
+                station_urls[station_id].update(pdf_urls)
+
+        if fallback:
+            logging.warning(f"Zapytania WFS dla pojedynczych stacji: {len(fallback)}")
+            future_to_station = {
+                self.io_executor.submit(self.get_tile_features, station_bboxes[station_id], feature_type):
+                    (station_id, feature_type)
+                for station_id in fallback
+                for feature_type in FEATURE_TYPES
+            }
+            for future in self.as_completed(future_to_station):
+                station_id, feature_type = future_to_station[future]
+                try:
+                    features = future.result()
+                except Cancelled:
+                    raise
+                except Exception as e:
+                    logging.error(f"Błąd zapytania WFS dla StationId {station_id}: {e}")
+                    continue
+                pdf_urls = self.extract_pdf_urls(features or [])
+                if pdf_urls:
+                    logging.info(f"Znaleziono {len(pdf_urls)} PDF-ów w warstwie '{feature_type}' dla StationId {station_id}.")
+                station_urls[station_id].update(pdf_urls)
+
+        return station_urls
+
+    def process_pdfs(self, station_urls, finish_station):
+        """
+        Pobiera i przetwarza każdy unikalny PDF przebiegu dokładnie raz.
+
+        Raporty pomiarowe często są wspólne dla stacji w jednej lokalizacji. Każdy URL
+        jest pobierany raz, ekstrakcja w puli procesów szuka na stronie wszystkich
+        stacji, które wskazały ten PDF, a wyniki są rozdzielane do tych stacji. Stacja
+        jest zapisywana i zgłaszana, gdy tylko wszystkie jej PDF-y zostaną przetworzone.
+
+        Args:
+            station_urls (dict): StationId -> set URL-i PDF.
+            finish_station (callable): Wywoływana z (StationId, dane lub None, przyczyna błędu) po zakończeniu stacji.
+        """
+        url_stations = {}
+        for station_id, urls in station_urls.items():
+            if not urls:
+                logging.info(f"Nie znaleziono żadnych PDF-ów dla StationId {station_id}.")
+                finish_station(station_id, None)
+            for url in urls:
+                url_stations.setdefault(url, []).append(station_id)
+        if not url_stations:
+            return
+
+        shared = sum(len(station_ids) for station_ids in url_stations.values())
+        logging.info(f"Unikalne PDF-y: {len(url_stations)} (bez deduplikacji: {shared})")
+
+        station_results = {station_id: [] for station_id, urls in station_urls.items() if urls}
+        pending = {station_id: len(station_urls[station_id]) for station_id in station_results}
+        pending_downloads = dict(pending)
+        failed_pdfs = Counter()
+
+        def pdf_downloaded(url):
+            for station_id in url_stations[url]:
+                pending_downloads[station_id] -= 1
+                if not pending_downloads[station_id]:
+                    self.set_station_state(station_id, STATE_DOWNLOADED)
+
+        def pdf_finished(url, results):
+            if results:
+                # Poziom ekstrakcji liczony raz na PDF, niezależnie od liczby stacji, które go wskazały
+                self.tier_counts[next((entry['Tier'] for entry in results if 'Tier' in entry), 'brak')] += 1
+            for entry in results:
+                station_results[entry['Station ID']].append(entry)
+            for station_id in url_stations[url]:
+                if not results:
+                    failed_pdfs[station_id] += 1
+                pending[station_id] -= 1
+                if pending[station_id]:
+                    continue
+                extracted_data = station_results.pop(station_id)
+                if extracted_data:
+                    self.azimuth_store.save_station(station_id, extracted_data)
+                else:
+                    logging.info(f"Nie udało się wyekstrahować żadnych informacji z PDF-ów dla StationId {station_id}.")
+                # Stacja z nieudanym pobraniem lub ekstrakcją któregoś PDF-a zostanie ponowiona
+                reason = None
+                if failed_pdfs[station_id]:
+                    reason = f"Nie udało się przetworzyć {failed_pdfs[station_id]} z {len(station_urls[station_id])} PDF-ów"
+                finish_station(station_id, extracted_data or None, reason)
+
+        # Ekstrakcja każdego PDF-a startuje w puli procesów zaraz po jego pobraniu,
+        # a do wątku wracają tylko wyniki z azymutami
+        download_futures = {self.io_executor.submit(self.download_pdf, url): url for url in url_stations}
+        extraction_futures = {}
+        waiting = set(download_futures)
+        while waiting:
+            done, waiting = concurrent.futures.wait(
+                waiting, timeout=CANCEL_POLL_S, return_when=concurrent.futures.FIRST_COMPLETED
+            )
+            self.cancel_token.raise_if_cancelled()
+            for future in done:
+                if future in download_futures:
+                    url = download_futures[future]
+                    try:
+                        pdf_path = future.result()
+                    except Cancelled:
+                        raise
+                    except Exception as e:
+                        logging.error(f"Błąd podczas pobierania PDF z {url}: {e}")
+                        pdf_path = None
+                    pdf_downloaded(url)
+                    if not pdf_path:
+                        pdf_finished(url, [])
+                        continue
+                    extraction = self.pdf_executor.submit(
+                        extract_information_for_stations_timed, pdf_path, url_stations[url], url.split('/')[-1],
+                        PDF_PAGE_NR, EXTRACTED_TEXT_DIR if DUMP_EXTRACTED_TEXT else None
+                    )
+                    extraction_futures[extraction] = url
+                    waiting.add(extraction)
+                else:
+                    url = extraction_futures[future]
+                    try:
+                        results, seconds = future.result()
+                        METRICS.observe('pdf_parse_seconds', seconds)
+                    except Exception as e:
+                        logging.error(f"Błąd podczas ekstrakcji PDF z {url}: {e}")
+                        results = []
+                    pdf_finished(url, results)
+
+class MetricsDialog(QDialog):
+    """
+    Okno z podsumowaniem metryk (czasy etapów, HTTP, cache) odświeżanym co sekundę.
+    """
+
+    def __init__(self, metrics=METRICS, parent=None):
+        super().__init__(parent)
+        self.metrics = metrics
+        self.setWindowTitle("Metryki")
+        self.resize(760, 480)
+        layout = QVBoxLayout(self)
+
+        self.text = QPlainTextEdit(self)
+        self.text.setReadOnly(True)
+        self.text.setFont(QFontDatabase.systemFont(QFontDatabase.FixedFont))
+        layout.addWidget(self.text)
+
+        buttons = QHBoxLayout()
+        self.export_button = QPushButton("Eksportuj...", self)
+        self.export_button.clicked.connect(self.export)
+        buttons.addWidget(self.export_button)
+        self.reset_button = QPushButton("Wyzeruj", self)
+        self.reset_button.clicked.connect(self.reset)
+        buttons.addWidget(self.reset_button)
+        layout.addLayout(buttons)
+
+        self.timer = QTimer(self)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(METRICS_REFRESH_MS)
+        self.refresh()
+
+    def refresh(self):
+        self.text.setPlainText(self.metrics.summary())
+
+    def reset(self):
+        self.metrics.reset()
+        self.refresh()
+
+    def export(self):
+        """
+        Zapisuje metryki do pliku JSON lub Prometheus (według rozszerzenia).
+        """
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Eksport metryk", "metrics.json", "JSON (*.json);;Prometheus (*.prom *.txt)"
+        )
+        if not path:
+            return
+        try:
+            self.metrics.export(path)
+        except OSError as e:
+            QMessageBox.warning(self, "Błąd", f"Nie udało się zapisać metryk: {e}")
+            return
+        logging.info(f"Zapisano metryki do {path}")
+
+
+class MainWindow(QMainWindow):
+    def __init__(self):
+        super().__init__()
+        self.setWindowTitle("MNSM by Merituum")
+        self.setGeometry(100, 100, 800, 800)
+        self.central_widget = QWidget()
+        self.setCentralWidget(self.central_widget)
+        self.layout = QVBoxLayout(self.central_widget)
+        
+        self.setWindowIcon(QIcon("ikona.ico"))
+
+        self.address_input = QLineEdit(self)
+        self.address_input.setPlaceholderText("Podaj adres: ")
+        self.layout.addWidget(self.address_input)
+
+        self.api_key_input = QLineEdit(self)
+        self.api_key_input.setPlaceholderText("Podaj klucz API (OpenCage)")
+        self.layout.addWidget(self.api_key_input)
+
+        self.radius_spinbox = QSpinBox(self)
+        self.radius_spinbox.setRange(1, MAX_RADIUS_KM)
+        self.radius_spinbox.setValue(1)
+        self.radius_spinbox.setPrefix("Promień[km]: ")
+        self.layout.addWidget(self.radius_spinbox)
+
+        self.show_map_button = QPushButton("Wyświetl mapę", self)
+        self.show_map_button.clicked.connect(self.show_map)
+        self.layout.addWidget(self.show_map_button)
+
+        self.download_pdf_button = QPushButton("Pobierz dane azymutów anten", self)
+        self.download_pdf_button.clicked.connect(self.run_pdf_worker)
+        self.layout.addWidget(self.download_pdf_button)
+
+        self.clear_map_button = QPushButton("Wyczyść mapę", self)
+        self.clear_map_button.clicked.connect(self.clear_map)
+        self.layout.addWidget(self.clear_map_button)
+
+        # Panel metryk jest opcjonalny (metrics_panel w config.ini)
+        self.metrics_dialog = None
+        if METRICS_PANEL:
+            self.metrics_button = QPushButton("Metryki", self)
+            self.metrics_button.clicked.connect(self.show_metrics)
+            self.layout.addWidget(self.metrics_button)
+
+        self.map_view = QWebEngineView(self)
+        self.layout.addWidget(self.map_view, 3)
+        # Strona mapy z API JavaScript jest wczytywana raz, kolejne wyniki są do niej dopisywane
+        self.map_loaded = False
+        self.pending_map_js = []
+        self.map_view.loadFinished.connect(self.on_map_loaded)
+        with METRICS.span('map_page'):
+            map_page = build_map_page()
+        # setHtml działa asynchronicznie - czas jest zapisywany w on_map_loaded
+        self.map_load_started = time.perf_counter()
+        self.map_view.setHtml(map_page)
+
+        self.progress_bar = QProgressBar(self)
+        self.layout.addWidget(self.progress_bar)
+
+        self.pdf_progress_bar = QProgressBar(self)
+        self.pdf_progress_bar.setVisible(False)
+        self.layout.addWidget(self.pdf_progress_bar)
+
+        self.pdf_queue_label = QLabel(self)
+        self.pdf_queue_label.setWordWrap(True)
+        self.layout.addWidget(self.pdf_queue_label)
+
+        self.status_label = QLabel(self)
+        self.layout.addWidget(self.status_label)
+
+        self.worker = None
+        self.pdf_worker = None
+        # Numery kolejnych wyszukiwań i przebiegów PdfWorker - wyniki starszych są odrzucane
+        self.search_generation = 0
+        self.pdf_generation = 0
+        self.station_store = STATION_STORE
+        self.engine = ENGINE
+        self.azimuth_store = AZIMUTH_STORE
+        self.azimuth_store.migrate_csv_files()
+        self.displayed_sites = None
+        self.azimuth_site_ids = set()
+        self.azimuth_length = 0.01 * (min(self.radius_spinbox.value(), AZIMUTH_LENGTH_MAX_RADIUS_KM) / 2)
+
+    def show_map(self):
+        address = self.address_input.text()
+        api_key = self.api_key_input.text()
+        
+     
+        radius = self.radius_spinbox.value()
+        if not api_key:
+            self.status_label.setText("Klucz API, który został podany jest niepoprawny.")
+            return
+        self.start_worker(address, api_key, radius)
+
+    def start_worker(self, address, api_key, radius):
+        """
+        Uruchamia wątek Worker, który geokoduje adres i filtruje nadajniki w promieniu.
+        
+        Args:
+            address (str): Adres do geokodowania.
+            api_key (str): Klucz API OpenCage.
+            radius (int): Promień wyszukiwania w kilometrach.
+        """
+        # Poprzednie wyszukiwanie jest przerywane, a jego wynik odrzucany
+        if self.worker is not None:
+            self.worker.cancel()
+        self.search_generation += 1
+        self.worker = Worker(address, api_key, radius)
+        self.worker.progress.connect(partial(self.update_progress, self.search_generation))
+        self.worker.result.connect(partial(self.display_map, self.search_generation))
+        self.worker.failed.connect(partial(self.search_failed, self.search_generation))
+        self.worker.start()
+        self.status_label.setText("Wyszukiwanie lokalizacji...")
+
+    def search_failed(self, generation, message):
+        """
+        Pokazuje komunikat, gdy wyszukiwanie nie ustaliło lokalizacji.
+
+        Args:
+            generation (int): Numer wyszukiwania.
+            message (str): Komunikat dla użytkownika.
+        """
+        if generation != self.search_generation:
+            return
+        self.status_label.setText(message)
+
+    def update_progress(self, generation, value):
+        """
+        Aktualizuje pasek postępu podczas filtrowania nadajników.
+        
+        Args:
+            generation (int): Numer wyszukiwania, które zgłosiło postęp.
+            value (int): Wartość postępu (0-100).
+        """
+        if generation != self.search_generation:
+            return
+        self.progress_bar.setValue(value)
+
+    def display_map(self, generation, filtered_df):
+        """
+        Wyświetla mapę z nadajnikami i liniami azymutów.
+        
+        Args:
+            generation (int): Numer wyszukiwania, które zwróciło wynik.
+            filtered_df (pd.DataFrame): Filtrowane dane nadajników.
+        """
+        if generation != self.search_generation:
+            logging.info(f"Pominięto nieaktualny wynik wyszukiwania nr {generation}")
+            return
+        self.progress_bar.setValue(100)
+
+        if filtered_df.empty:
+            self.status_label.setText("Brak danych, spróbuj ponownie później.")
+            logging.warning("Brak nadajników w podanym promieniu.")
+            return
+
+        user_lat, user_lon = self.worker.location
+        # Dynamiczna długość linii azymutów na podstawie promienia
+        radius_km = self.radius_spinbox.value()
+        self.azimuth_length = 0.01 * (min(radius_km, AZIMUTH_LENGTH_MAX_RADIUS_KM) / 2)  # Proporcjonalna długość linii
+
+        # Dla dużych promieni mapa startuje oddalona, a lokalizacje są grupowane w klastry
+        zoom_start = DETAIL_ZOOM
+        if radius_km > AZIMUTH_LENGTH_MAX_RADIUS_KM:
+            zoom_start = max(CLUSTER_MIN_ZOOM, DETAIL_ZOOM - ceil(log2(radius_km / AZIMUTH_LENGTH_MAX_RADIUS_KM)))
+
+        # Lokalizacje są zagregowane przy wczytywaniu bazy (operatorzy, pasma, gotowy HTML)
+        sites = self.station_store.sites_for(filtered_df)
+        self.displayed_sites = sites
+        self.azimuth_site_ids = set()
+
+        # Strona mapy jest wczytana raz, tu wysyłamy tylko nowe dane
+        with METRICS.span('html', sites=len(sites)):
+            script = (
+                js_call('clear')
+                + js_call('setLocation', user_lat, user_lon)
+                + js_call('setView', user_lat, user_lon, zoom_start)
+                + js_call('addSites', site_payload(sites))
+            )
+        self.run_map_js(script)
+        self.push_azimuths(sites)
+
+        self.progress_bar.setValue(0)
+        self.status_label.setText("Mapa z azymutami została wygenerowana.")
+        logging.info(f"Mapa wygenerowana z {len(sites)} nadajnikami.")
+
+    def push_azimuths(self, sites):
+        """
+        Dorysowuje na mapie azymuty lokalizacji, które jeszcze ich nie mają.
+
+        Args:
+            sites (pd.DataFrame): Lokalizacje z tabeli lokalizacji.
+        """
+        sites = sites[~sites.index.isin(self.azimuth_site_ids)]
+        # Azymuty wszystkich lokalizacji (pierwszy StationId lokalizacji) jednym zapytaniem
+        station_azimuths = self.engine.site_azimuths(sites)
+
+        azimuth_sites = []
+        for site in sites.itertuples():
+            azimuths = station_azimuths.get(site.station_id)
+            if azimuths:
+                azimuth_sites.append((float(site.LATIuke), float(site.LONGuke), site.operators, azimuths))
+                self.azimuth_site_ids.add(site.Index)
+
+        # Wszystkie azymuty trafiają do jednej warstwy GeoJSON zamiast dwóch PolyLine na linię
+        segments = azimuth_segments(azimuth_sites, self.azimuth_length)
+        if len(segments['azimuth']):
+            self.run_map_js(js_call('addAzimuths', azimuth_feature_collection(segments)))
+            logging.info(f"Narysowano {len(segments['azimuth'])} linii azymutów dla {len(azimuth_sites)} lokalizacji.")
+
+    def run_map_js(self, script):
+        """
+        Wykonuje kod JavaScript na stronie mapy; przed jej wczytaniem kod jest kolejkowany.
+
+        Args:
+            script (str): Kod JavaScript (zwykle wywołania js_call).
+        """
+        if self.map_loaded:
+            self.execute_map_js(script)
+        else:
+            self.pending_map_js.append(script)
+
+    def execute_map_js(self, script):
+        """
+        Wysyła kod JavaScript do strony i zapisuje czas jego wykonania (span run_js).
+
+        Args:
+            script (str): Kod JavaScript.
+        """
+        started = time.perf_counter()
+
+        def finished(_):
+            METRICS.record_span('run_js', time.perf_counter() - started, chars=len(script))
+
+        self.map_view.page().runJavaScript(script, finished)
+
+    def on_map_loaded(self, ok):
+        """
+        Obsługuje zakończenie wczytywania strony mapy i wykonuje zakolejkowany kod.
+
+        Args:
+            ok (bool): Czy strona została wczytana poprawnie.
+        """
+        if not ok:
+            logging.error("Nie udało się wczytać strony mapy.")
+            return
+        METRICS.record_span('set_html', time.perf_counter() - self.map_load_started)
+        self.map_loaded = True
+        for script in self.pending_map_js:
+            self.execute_map_js(script)
+        self.pending_map_js = []
+
+    def show_metrics(self):
+        """
+        Pokazuje panel metryk (jedno okno na cały program).
+        """
+        if self.metrics_dialog is None:
+            self.metrics_dialog = MetricsDialog(parent=self)
+        self.metrics_dialog.show()
+        self.metrics_dialog.raise_()
+
+    def run_pdf_worker(self):
+        """
+        Uruchamia wątek PdfWorker do pobierania i przetwarzania PDF-ów dla wybranych StationId.
+        """
+        if not hasattr(self, 'worker') or self.worker is None:
+            self.status_label.setText("Najpierw wyświetl mapę, aby wybrać nadajniki.")
+            logging.warning("Próba uruchomienia PdfWorker bez wcześniejszego filtrowania nadajników.")
+            return
+
+        filtered_df = getattr(self.worker, 'filtered_df', pd.DataFrame())
+        if filtered_df.empty:
+            self.status_label.setText("Brak nadajników do pobrania PDF.")
+            logging.warning("Brak nadajników w filtered_df.")
+            return
+
+        station_ids = filtered_df['StationId'].unique()
+        logging.info(f"Przetwarzane StationIds: {list(station_ids)}")
+
+        self.pdf_progress_bar.setVisible(True)
+        self.pdf_progress_bar.setValue(0)
+        self.pdf_queue_label.setText(f"Pozostało stacji: {len(station_ids)}")
+
+        # Trwający przebieg jest przerywany; jego stan zostaje w dzienniku zadań
+        if self.pdf_worker is not None:
+            self.pdf_worker.cancel()
+        self.pdf_generation += 1
+        self.pdf_worker = PdfWorker(station_ids)
+        self.pdf_worker.progress.connect(partial(self.update_pdf_progress, self.pdf_generation))
+        self.pdf_worker.station_done.connect(partial(self.pdf_station_finished, self.pdf_generation))
+        self.pdf_worker.result.connect(partial(self.pdf_processing_finished, self.pdf_generation))
+        self.pdf_worker.start()
+
+    def update_pdf_progress(self, generation, value):
+        """
+        Aktualizuje pasek postępu podczas pobierania i przetwarzania PDF-ów.
+        
+        Args:
+            generation (int): Numer przebiegu PdfWorker.
+            value (int): Wartość postępu (0-100).
+        """
+        if generation != self.pdf_generation:
+            return
+        self.pdf_progress_bar.setValue(value)
+
+    def pdf_station_finished(self, generation, station_id, extracted_data, remaining):
+        """
+        Dorysowuje azymuty stacji zaraz po jej przetworzeniu i pokazuje listę pozostałych stacji.
+
+        Args:
+            generation (int): Numer przebiegu PdfWorker.
+            station_id (str): StationId zakończonej stacji.
+            extracted_data (list): Wyekstrahowane dane stacji (pusta lista przy błędzie).
+            remaining (list): StationId stacji, które pozostały do przetworzenia.
+        """
+        if generation != self.pdf_generation:
+            return
+        if remaining:
+            preview = ', '.join(remaining[:PDF_QUEUE_PREVIEW])
+            more = f" (+{len(remaining) - PDF_QUEUE_PREVIEW})" if len(remaining) > PDF_QUEUE_PREVIEW else ''
+            self.pdf_queue_label.setText(f"Pozostało stacji: {len(remaining)} - {preview}{more}")
+        else:
+            self.pdf_queue_label.setText("")
+
+        if not extracted_data or self.displayed_sites is None:
+            return
+        sites = self.displayed_sites
+        self.push_azimuths(sites[sites['station_id'] == station_id])
+
+    def pdf_processing_finished(self, generation, extracted_data):
+        """
+        Obsługuje zakończenie przetwarzania PDF-ów.
+        
+        Args:
+            generation (int): Numer przebiegu PdfWorker.
+            extracted_data (list): Lista wyekstrahowanych danych z PDF-ów.
+        """
+        if generation != self.pdf_generation:
+            return
+        self.pdf_progress_bar.setValue(100)
+        self.pdf_progress_bar.setVisible(False)
+        self.pdf_queue_label.setText("")
+        failed = self.pdf_worker.failed_stations
+        if failed:
+            self.download_pdf_button.setText(f"Ponów pobieranie ({len(failed)} stacji)")
+        else:
+            self.download_pdf_button.setText("Pobierz dane azymutów anten")
+        if not extracted_data:
+            if failed:
+                self.status_label.setText(f"Nie udało się przetworzyć {len(failed)} stacji. Kliknij przycisk, aby ponowić.")
+            else:
+                self.status_label.setText("Brak nowych danych do pobrania.")
+            logging.warning("Brak danych po przetworzeniu PDF-ów.")
+            return
+
+        self.status_label.setText("PDF-y zostały pobrane i przetworzone pomyślnie.")
+        message = "PDF-y zostały pobrane i przetworzone.\nDane zostały zapisane w bazie azymutów."
+        if failed:
+            message += f"\nNie udało się przetworzyć {len(failed)} stacji - można ponowić pobieranie."
+        QMessageBox.information(self, "Sukces", message)
+        logging.info(f"Pomyślnie przetworzono {len(extracted_data)} PDF-ów.")
+
+    def clear_map(self):
+        """
+        Czyści mapę i resetuje dane.
+        """
+        self.run_map_js(js_call('clear'))
+        self.displayed_sites = None
+        self.azimuth_site_ids = set()
+        self.progress_bar.setValue(0)
+        self.pdf_progress_bar.setValue(0)
+        self.status_label.setText("Mapa została wyczyszczona.")
+        if self.worker is not None:
+            self.worker.cancel()
+        self.search_generation += 1
+        self.worker = None
+        logging.info("Mapa i dane zostały wyczyszczone.")
+        # todo: change texts displayed in program, that are not necesarly correct
+
+    def closeEvent(self, event):
+        """
+        Przerywa działające wątki przy zamykaniu okna; stan pobierania zostaje w dzienniku zadań.
+
+        Jeśli ustawiono metrics_export_path, metryki sesji są zapisywane do tego pliku.
+        """
+        for worker in (self.worker, self.pdf_worker):
+            if worker is not None and worker.isRunning():
+                worker.cancel()
+                worker.wait(5000)
+        if METRICS_EXPORT_PATH:
+            try:
+                METRICS.export(METRICS_EXPORT_PATH)
+                logging.info(f"Zapisano metryki do {METRICS_EXPORT_PATH}")
+            except OSError as e:
+                logging.warning(f"Nie udało się zapisać metryk do {METRICS_EXPORT_PATH}: {e}")
+        super().closeEvent(event)
+
+def run():
+    """
+    Uruchamia okno programu (wywoływane z main.py).
+
+    Returns:
+        int: Kod wyjścia pętli zdarzeń Qt.
+    """
+    app = QApplication(sys.argv)
+    main_window = MainWindow()
+    main_window.show()
+    return app.exec_()
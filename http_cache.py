@@ -0,0 +1,95 @@
+import gzip
+import json
+import sqlite3
+import threading
+import time
+
+# Wpisy przeterminowane dłużej niż tyle sekund są usuwane przy otwarciu cache
+STALE_RETENTION_S = 30 * 24 * 3600
+
+
+class CachedResponse:
+    """
+    Odpowiedź HTTP odtworzona z cache (lub wygenerowana w trybie offline).
+
+    Udostępnia podzbiór interfejsu requests.Response używany w programie.
+    """
+
+    def __init__(self, status_code, content=b'', headers=None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.from_cache = True
+
+    def json(self):
+        return json.loads(self.content)
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            yield self.content[start:start + chunk_size]
+
+    def close(self):
+        pass
+
+
+class ResponseCache:
+    """
+    Trwały cache odpowiedzi HTTP w bazie SQLite.
+
+    Treść odpowiedzi jest zapisywana skompresowana gzipem, razem z czasem ważności
+    zależnym od endpointu. Przeterminowane wpisy są nadal dostępne w trybie offline.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                'url TEXT PRIMARY KEY, endpoint TEXT, body BLOB, stored_at REAL, expires_at REAL)'
+            )
+            self._connection.execute(
+                'DELETE FROM responses WHERE expires_at < ?', (time.time() - STALE_RETENTION_S,)
+            )
+
+    def get(self, url, allow_stale=False):
+        """
+        Zwraca zapisaną treść odpowiedzi.
+
+        Args:
+            url (str): Pełny URL zapytania.
+            allow_stale (bool): Czy zwracać również przeterminowane wpisy.
+
+        Returns:
+            bytes | None: Treść odpowiedzi lub None, gdy brak ważnego wpisu.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT body, expires_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, expires_at = row
+        if not allow_stale and expires_at < time.time():
+            return None
+        return gzip.decompress(body)
+
+    def put(self, url, endpoint, content, ttl):
+        """
+        Zapisuje treść odpowiedzi z podanym czasem ważności.
+
+        Args:
+            url (str): Pełny URL zapytania.
+            endpoint (str): Nazwa endpointu (do statystyk i czyszczenia).
+            content (bytes): Treść odpowiedzi.
+            ttl (float): Czas ważności w sekundach.
+        """
+        now = time.time()
+        body = gzip.compress(content)
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO responses (url, endpoint, body, stored_at, expires_at) VALUES (?, ?, ?, ?, ?)',
+                (url, endpoint, body, now, now + ttl)
+            )
@@ -0,0 +1,149 @@
+import random
+import threading
+import time
+
+from cancellation import sleep
+
+
+class TokenBucket:
+    """
+    Limit średniej liczby zapytań na sekundę z dopuszczalną krótką serią.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, cancel_token=None):
+        """
+        Czeka, aż dostępny będzie token, i go zużywa.
+
+        Raises:
+            Cancelled: Gdy cancel_token zostanie anulowany w trakcie oczekiwania.
+        """
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            sleep(wait, cancel_token)
+
+
+class AdaptiveConcurrency:
+    """
+    Limit równoległych zapytań dostosowywany metodą AIMD.
+
+    Każde udane zapytanie o czasie odpowiedzi bliskim bazowemu zwiększa limit
+    o 1/limit (ok. +1 na "rundę" zapytań). Odpowiedź 429/5xx, błąd połączenia lub
+    czas odpowiedzi przekraczający latency_factor razy czas bazowy zmniejsza limit
+    o połowę, nie częściej niż raz na okres bazowego czasu odpowiedzi.
+    """
+
+    def __init__(self, max_limit, min_limit=1, initial=None, latency_factor=3.0):
+        self.max_limit = max_limit
+        self.min_limit = min_limit
+        self.limit = float(initial or max(min_limit, max_limit // 2))
+        self.latency_factor = latency_factor
+        self.baseline = None
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    def acquire(self, cancel_token=None):
+        with self._condition:
+            while self._in_flight >= int(self.limit):
+                if cancel_token is not None:
+                    cancel_token.raise_if_cancelled()
+                self._condition.wait(0.5)
+            self._in_flight += 1
+
+    def release(self, latency, overloaded):
+        """
+        Zwalnia miejsce i aktualizuje limit.
+
+        Args:
+            latency (float): Czas odpowiedzi w sekundach.
+            overloaded (bool): Czy serwer zgłosił przeciążenie (429/5xx, błąd połączenia).
+        """
+        with self._condition:
+            self._in_flight -= 1
+            if not overloaded:
+                # Bazowy czas odpowiedzi to wolno zmieniająca się średnia z udanych zapytań
+                self.baseline = latency if self.baseline is None else 0.9 * self.baseline + 0.1 * latency
+            slow = self.baseline is not None and latency > self.latency_factor * self.baseline
+            now = time.monotonic()
+            if overloaded or slow:
+                if now - self._last_decrease > (self.baseline or 1.0):
+                    self.limit = max(self.min_limit, self.limit / 2)
+                    self._last_decrease = now
+            else:
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+
+class CircuitBreaker:
+    """
+    Bezpiecznik dla hosta: po serii błędów wstrzymuje zapytania na czas cooldown.
+
+    Po upływie cooldown przepuszczane jest jedno zapytanie próbne; jego powodzenie
+    zamyka bezpiecznik, a błąd otwiera go ponownie.
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_started = None
+        self._lock = threading.Lock()
+
+    def wait_time(self):
+        """
+        Zwraca 0, jeśli zapytanie może zostać wysłane, w przeciwnym razie liczbę sekund do próby.
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            remaining = self._opened_at + self.cooldown - time.monotonic()
+            if remaining > 0:
+                return remaining
+            # Próba, która nie zakończyła się w ciągu cooldown (np. anulowana), nie blokuje kolejnej
+            if self._trial_started is not None and time.monotonic() - self._trial_started < self.cooldown:
+                return min(1.0, self.cooldown)
+            self._trial_started = time.monotonic()
+            return 0
+
+    def record(self, success):
+        with self._lock:
+            self._trial_started = None
+            if success:
+                self._failures = 0
+                self._opened_at = None
+                return
+            self._failures += 1
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+
+
+def backoff_delay(attempt, base=0.5, cap=30.0):
+    """
+    Czas oczekiwania przed kolejną próbą: wykładniczy z pełnym losowym rozrzutem.
+
+    Args:
+        attempt (int): Numer nieudanej próby (od 0).
+        base (float): Opóźnienie bazowe w sekundach.
+        cap (float): Maksymalne opóźnienie w sekundach.
+
+    Returns:
+        float: Opóźnienie w sekundach.
+    """
+    return random.uniform(0, min(cap, base * 2 ** attempt))
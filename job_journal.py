@@ -0,0 +1,149 @@
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+# Stany stacji w przebiegu PdfWorker
+STATE_PENDING = 'pending'
+STATE_FETCHED = 'fetched'
+STATE_DOWNLOADED = 'downloaded'
+STATE_PARSED = 'parsed'
+STATE_FAILED = 'failed'
+
+# Udział stanu w postępie przebiegu
+STATE_PROGRESS = {
+    STATE_PENDING: 0.0,
+    STATE_FETCHED: 1 / 3,
+    STATE_DOWNLOADED: 2 / 3,
+    STATE_PARSED: 1.0,
+    STATE_FAILED: 1.0,
+}
+
+
+def job_id_for(station_ids):
+    """
+    Zwraca identyfikator zadania dla zbioru StationId (niezależny od kolejności).
+    """
+    return hashlib.sha1('\n'.join(sorted(station_ids)).encode('utf-8')).hexdigest()
+
+
+class JobJournal:
+    """
+    Trwały dziennik przebiegów PdfWorker w bazie SQLite.
+
+    Dla każdej stacji zadania zapisywany jest stan (pending, fetched, downloaded,
+    parsed, failed), przyczyna błędu i lista URL-i PDF. Zadanie, które nie zostało
+    ukończone (zamknięcie programu, wyjątek, stacje z błędem), jest przy ponownym
+    uruchomieniu dla tych samych stacji wznawiane: stacje parsed są pomijane, a stacje
+    fetched nie wymagają ponownych zapytań do si2pem.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute('PRAGMA journal_mode=WAL')
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, completed INTEGER, created_at REAL, updated_at REAL)'
+            )
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS job_stations ('
+                'job_id TEXT NOT NULL, station_id TEXT NOT NULL, state TEXT NOT NULL, reason TEXT, pdf_urls TEXT, '
+                'updated_at REAL, PRIMARY KEY (job_id, station_id))'
+            )
+
+    def start(self, station_ids):
+        """
+        Rozpoczyna nowe zadanie lub wznawia nieukończone zadanie dla tych samych stacji.
+
+        Przy wznowieniu stacje zakończone błędem wracają do stanu STATE_PENDING, bo
+        zostaną przetworzone od początku.
+
+        Args:
+            station_ids (list): StationId przebiegu.
+
+        Returns:
+            tuple: (job_id, dict StationId -> (stan, set URL-i PDF lub None)).
+        """
+        job_id = job_id_for(station_ids)
+        now = time.time()
+        with self._lock, self._connection:
+            job = self._connection.execute('SELECT completed FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            if job is not None and not job[0]:
+                rows = self._connection.execute(
+                    'SELECT station_id, state, pdf_urls FROM job_stations WHERE job_id = ?', (job_id,)
+                ).fetchall()
+                self._connection.execute('UPDATE jobs SET updated_at = ? WHERE job_id = ?', (now, job_id))
+                self._connection.execute(
+                    'UPDATE job_stations SET state = ?, reason = NULL, pdf_urls = NULL, updated_at = ? '
+                    'WHERE job_id = ? AND state = ?',
+                    (STATE_PENDING, now, job_id, STATE_FAILED)
+                )
+                rows = [
+                    (station_id, STATE_PENDING, None) if state == STATE_FAILED else (station_id, state, pdf_urls)
+                    for station_id, state, pdf_urls in rows
+                ]
+                states = {
+                    station_id: (state, set(json.loads(pdf_urls)) if pdf_urls is not None else None)
+                    for station_id, state, pdf_urls in rows
+                }
+                resumed = sum(state == STATE_PARSED for state, _ in states.values())
+                logging.info(f"Wznawianie zadania {job_id[:8]}: {resumed} z {len(states)} stacji już przetworzonych")
+                return job_id, states
+
+            self._connection.execute('DELETE FROM job_stations WHERE job_id = ?', (job_id,))
+            self._connection.execute(
+                'INSERT OR REPLACE INTO jobs (job_id, completed, created_at, updated_at) VALUES (?, 0, ?, ?)',
+                (job_id, now, now)
+            )
+            self._connection.executemany(
+                'INSERT INTO job_stations (job_id, station_id, state, updated_at) VALUES (?, ?, ?, ?)',
+                [(job_id, station_id, STATE_PENDING, now) for station_id in station_ids]
+            )
+        return job_id, {station_id: (STATE_PENDING, None) for station_id in station_ids}
+
+    def mark(self, job_id, station_id, state, reason=None, pdf_urls=None):
+        """
+        Zapisuje nowy stan stacji.
+
+        Args:
+            job_id (str): Identyfikator zadania.
+            station_id (str): StationId.
+            state (str): Nowy stan.
+            reason (str): Przyczyna błędu (dla STATE_FAILED).
+            pdf_urls (set): URL-e PDF stacji (zapisywane, gdy podane).
+        """
+        now = time.time()
+        with self._lock, self._connection:
+            if pdf_urls is None:
+                self._connection.execute(
+                    'UPDATE job_stations SET state = ?, reason = ?, updated_at = ? WHERE job_id = ? AND station_id = ?',
+                    (state, reason, now, job_id, station_id)
+                )
+            else:
+                self._connection.execute(
+                    'UPDATE job_stations SET state = ?, reason = ?, pdf_urls = ?, updated_at = ? '
+                    'WHERE job_id = ? AND station_id = ?',
+                    (state, reason, json.dumps(sorted(pdf_urls)), now, job_id, station_id)
+                )
+
+    def finish(self, job_id):
+        """
+        Oznacza zadanie jako ukończone, jeśli żadna stacja nie wymaga ponowienia.
+
+        Returns:
+            dict: StationId -> przyczyna błędu dla stacji, które nie zostały przetworzone.
+        """
+        with self._lock, self._connection:
+            failed = dict(self._connection.execute(
+                'SELECT station_id, COALESCE(reason, state) FROM job_stations WHERE job_id = ? AND state != ?',
+                (job_id, STATE_PARSED)
+            ).fetchall())
+            self._connection.execute(
+                'UPDATE jobs SET completed = ?, updated_at = ? WHERE job_id = ?',
+                (int(not failed), time.time(), job_id)
+            )
+        return failed
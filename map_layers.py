@@ -0,0 +1,327 @@
+import io
+import json
+
+import folium
+import numpy as np
+import pandas as pd
+from branca.element import MacroElement
+from jinja2 import Template
+
+from sites import SITE_OPERATOR_COLORS
+
+# Przesunięcie między liniami kolejnych operatorów w jednej lokalizacji (stopnie)
+OPERATOR_OFFSET_DEG = 0.00005
+
+# Poziomy szczegółowości: poniżej DETAIL_ZOOM lokalizacje są grupowane w siatce
+# CLUSTER_CELL_PX x CLUSTER_CELL_PX pikseli, azymuty są rysowane od AZIMUTH_MIN_ZOOM
+CLUSTER_MIN_ZOOM = 5
+DETAIL_ZOOM = 12
+AZIMUTH_MIN_ZOOM = 12
+CLUSTER_CELL_PX = 60
+
+
+def azimuth_segments(sites, length):
+    """
+    Oblicza wektorowo odcinki azymutów dla wszystkich lokalizacji.
+
+    Każdy operator lokalizacji dostaje pełny zestaw azymutów, lekko przesunięty
+    prostopadle do kierunku linii dla lepszej widoczności.
+
+    Args:
+        sites (list): Krotki (lat, lon, operators, azimuths) dla lokalizacji z azymutami.
+        length (float): Długość linii w stopniach.
+
+    Returns:
+        dict: Tablice start_lat, start_lon, end_lat, end_lon, azimuth oraz lista operator.
+    """
+    lats, lons, op_index, op_count, azimuths, operators = [], [], [], [], [], []
+    for lat, lon, site_operators, site_azimuths in sites:
+        n_ops = len(site_operators)
+        n_az = len(site_azimuths)
+        if not n_ops or not n_az:
+            continue
+        lats.append(np.full(n_ops * n_az, lat, dtype=np.float64))
+        lons.append(np.full(n_ops * n_az, lon, dtype=np.float64))
+        op_index.append(np.repeat(np.arange(n_ops), n_az))
+        op_count.append(np.full(n_ops * n_az, n_ops))
+        azimuths.append(np.tile(np.asarray(site_azimuths, dtype=np.float64), n_ops))
+        for operator in site_operators:
+            operators.extend([operator] * n_az)
+
+    if not lats:
+        empty = np.empty(0)
+        return {'start_lat': empty, 'start_lon': empty, 'end_lat': empty, 'end_lon': empty,
+                'azimuth': empty, 'operator': []}
+
+    lat = np.concatenate(lats)
+    lon = np.concatenate(lons)
+    azimuth = np.concatenate(azimuths)
+    offset = (np.concatenate(op_index) - np.concatenate(op_count) / 2) * OPERATOR_OFFSET_DEG
+    az_rad = np.radians(azimuth)
+    perp_rad = np.radians(azimuth + 90)
+    start_lat = lat + offset * np.cos(perp_rad)
+    start_lon = lon + offset * np.sin(perp_rad)
+    return {
+        'start_lat': start_lat,
+        'start_lon': start_lon,
+        'end_lat': start_lat + length * np.cos(az_rad),
+        'end_lon': start_lon + length * np.sin(az_rad),
+        'azimuth': azimuth,
+        'operator': operators,
+    }
+
+
+def azimuth_feature_collection(segments, operator_colors=SITE_OPERATOR_COLORS):
+    """
+    Zamienia odcinki azymutów na zwarty GeoJSON FeatureCollection.
+
+    Właściwości cech: 'o' - operator, 'a' - azymut, 'c' - kolor linii.
+
+    Args:
+        segments (dict): Wynik azimuth_segments.
+        operator_colors (dict): Słownik mapujący operatorów na kolory.
+
+    Returns:
+        dict: FeatureCollection.
+    """
+    coords = np.round(np.column_stack([
+        segments['start_lon'], segments['start_lat'], segments['end_lon'], segments['end_lat']
+    ]), 6).tolist()
+    features = [
+        {
+            'type': 'Feature',
+            'geometry': {'type': 'LineString', 'coordinates': [[x1, y1], [x2, y2]]},
+            'properties': {'o': operator, 'a': round(azimuth, 1), 'c': operator_colors.get(operator, 'red')},
+        }
+        for (x1, y1, x2, y2), operator, azimuth in zip(coords, segments['operator'], segments['azimuth'].tolist())
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def cluster_sites(lats, lons, zoom, cell_px=CLUSTER_CELL_PX):
+    """
+    Grupuje lokalizacje w siatce pikseli Web Mercator dla danego poziomu powiększenia.
+
+    Args:
+        lats (array-like): Szerokości geograficzne lokalizacji.
+        lons (array-like): Długości geograficzne lokalizacji.
+        zoom (int): Poziom powiększenia mapy.
+        cell_px (int): Rozmiar komórki siatki w pikselach.
+
+    Returns:
+        list: Lista [lat, lon, liczba] - środki ciężkości i liczności klastrów.
+    """
+    lats = np.asarray(lats, dtype=np.float64)
+    lons = np.asarray(lons, dtype=np.float64)
+    if len(lats) == 0:
+        return []
+    scale = 256 * 2 ** zoom / cell_px
+    x = (lons + 180) / 360 * scale
+    sin_lat = np.sin(np.radians(lats))
+    y = (0.5 - np.log((1 + sin_lat) / (1 - sin_lat)) / (4 * np.pi)) * scale
+    cells = np.floor(x).astype(np.int64) * (int(scale) + 1) + np.floor(y).astype(np.int64)
+    _, inverse, counts = np.unique(cells, return_inverse=True, return_counts=True)
+    mean_lat = np.bincount(inverse, weights=lats) / counts
+    mean_lon = np.bincount(inverse, weights=lons) / counts
+    return [
+        [round(lat, 6), round(lon, 6), count]
+        for lat, lon, count in zip(mean_lat.tolist(), mean_lon.tolist(), counts.tolist())
+    ]
+
+
+def site_payload(sites, min_zoom=CLUSTER_MIN_ZOOM, detail_zoom=DETAIL_ZOOM):
+    """
+    Przygotowuje dane lokalizacji dla funkcji mnsm.addSites na stronie mapy.
+
+    Args:
+        sites (pd.DataFrame): Lokalizacje z tabeli lokalizacji (LATIuke, LONGuke, tooltip, icon_html).
+        min_zoom (int): Najmniejszy poziom powiększenia z wyliczonymi klastrami.
+        detail_zoom (int): Poziom, od którego wyświetlane są pojedyncze lokalizacje.
+
+    Returns:
+        dict: Dane lokalizacji i klastrów.
+    """
+    lats = sites['LATIuke'].to_numpy(dtype=np.float64)
+    lons = sites['LONGuke'].to_numpy(dtype=np.float64)
+    # Ikony powtarzają się (kombinacje operatorów), więc są zapisywane raz
+    icon_codes, icons = pd.factorize(sites['icon_html'])
+    return {
+        'id': [int(site_id) for site_id in sites.index],
+        'lat': np.round(lats, 6).tolist(),
+        'lon': np.round(lons, 6).tolist(),
+        'tooltip': sites['tooltip'].tolist(),
+        'icon': icon_codes.tolist(),
+        'icons': [html.strip() for html in icons],
+        'clusters': {zoom: cluster_sites(lats, lons, zoom) for zoom in range(min_zoom, detail_zoom)},
+    }
+
+
+def js_call(function, *args):
+    """
+    Buduje wywołanie funkcji API strony mapy (window.mnsm) z argumentami w JSON.
+
+    Args:
+        function (str): Nazwa funkcji API (np. 'addSites').
+        *args: Argumenty serializowane do JSON.
+
+    Returns:
+        str: Kod JavaScript.
+    """
+    return f"mnsm.{function}({','.join(_script_json(arg) for arg in args)});"
+
+
+class MapApi(MacroElement):
+    """
+    API JavaScript (window.mnsm) strony mapy wczytywanej raz do QWebEngineView.
+
+    Python aktualizuje mapę przez page().runJavaScript, bez przeładowania strony:
+    addSites dopisuje lokalizacje (pomija już wyświetlone) i podmienia klastry,
+    addAzimuths dopisuje linie azymutów, clear czyści dane, setView i setLocation
+    ustawiają widok i znacznik podanego adresu.
+
+    Poniżej detail_zoom lokalizacje są wyświetlane jako klastry (kółka na kanwie),
+    od detail_zoom jako ikony, ale tylko w bieżącym widoku mapy. Linie azymutów
+    (czarne obramowanie i kolorowa linia na wspólnej kanwie) są widoczne od
+    azimuth_min_zoom.
+    """
+
+    _template = Template("""
+        {% macro script(this, kwargs) %}
+            window.mnsm = (function(map) {
+                var renderer = L.canvas({padding: 0.5});
+                var siteGroup = L.layerGroup().addTo(map);
+                var azimuthOutline = L.geoJSON(null, {
+                    renderer: renderer,
+                    interactive: false,
+                    style: function() { return {color: 'black', weight: 4, opacity: 0.8}; }
+                });
+                var azimuthLine = L.geoJSON(null, {
+                    renderer: renderer,
+                    style: function(feature) { return {color: feature.properties.c, weight: 2, opacity: 0.8}; },
+                    onEachFeature: function(feature, layer) {
+                        layer.bindTooltip('Operator: ' + feature.properties.o + ', Azymut: ' + feature.properties.a + '°', {sticky: true});
+                    }
+                });
+                var azimuthGroup = L.layerGroup([azimuthOutline, azimuthLine]);
+                var sites, icons, iconIndex, clusters, locationMarker = null;
+
+                function reset() {
+                    sites = {ids: {}, lat: [], lon: [], tooltip: [], icon: []};
+                    icons = [];
+                    iconIndex = {};
+                    clusters = {};
+                }
+
+                function renderSites() {
+                    var zoom = map.getZoom();
+                    siteGroup.clearLayers();
+                    if (zoom >= {{ this.detail_zoom }}) {
+                        var bounds = map.getBounds().pad(0.2);
+                        for (var i = 0; i < sites.lat.length; i++) {
+                            if (!bounds.contains([sites.lat[i], sites.lon[i]])) { continue; }
+                            L.marker([sites.lat[i], sites.lon[i]], {icon: icons[sites.icon[i]]})
+                                .bindTooltip(sites.tooltip[i]).addTo(siteGroup);
+                        }
+                        return;
+                    }
+                    var level = Math.max(zoom, {{ this.min_zoom }});
+                    (clusters[level] || []).forEach(function(cluster) {
+                        L.circleMarker([cluster[0], cluster[1]], {
+                            renderer: renderer,
+                            radius: 8 + 4 * Math.log10(cluster[2]),
+                            color: 'black', weight: 1, fillColor: '#3388ff', fillOpacity: 0.7
+                        }).bindTooltip(cluster[2] + ' lokalizacji').on('click', function() {
+                            map.setView([cluster[0], cluster[1]], Math.min(zoom + 2, {{ this.detail_zoom }}));
+                        }).addTo(siteGroup);
+                    });
+                }
+
+                function updateAzimuths() {
+                    if (map.getZoom() >= {{ this.azimuth_min_zoom }}) {
+                        map.addLayer(azimuthGroup);
+                    } else {
+                        map.removeLayer(azimuthGroup);
+                    }
+                }
+
+                reset();
+                map.on('zoomend moveend', renderSites);
+                map.on('zoomend', updateAzimuths);
+                updateAzimuths();
+
+                return {
+                    addSites: function(payload) {
+                        for (var i = 0; i < payload.id.length; i++) {
+                            if (sites.ids[payload.id[i]]) { continue; }
+                            var html = payload.icons[payload.icon[i]];
+                            if (!(html in iconIndex)) {
+                                iconIndex[html] = icons.length;
+                                icons.push(L.divIcon({className: 'empty', html: html}));
+                            }
+                            sites.ids[payload.id[i]] = true;
+                            sites.lat.push(payload.lat[i]);
+                            sites.lon.push(payload.lon[i]);
+                            sites.tooltip.push(payload.tooltip[i]);
+                            sites.icon.push(iconIndex[html]);
+                        }
+                        clusters = payload.clusters;
+                        renderSites();
+                    },
+                    addAzimuths: function(featureCollection) {
+                        azimuthOutline.addData(featureCollection);
+                        azimuthLine.addData(featureCollection);
+                        updateAzimuths();
+                    },
+                    clear: function() {
+                        reset();
+                        siteGroup.clearLayers();
+                        azimuthOutline.clearLayers();
+                        azimuthLine.clearLayers();
+                        if (locationMarker) {
+                            map.removeLayer(locationMarker);
+                            locationMarker = null;
+                        }
+                    },
+                    setView: function(lat, lon, zoom) {
+                        map.setView([lat, lon], zoom);
+                    },
+                    setLocation: function(lat, lon) {
+                        if (locationMarker) { map.removeLayer(locationMarker); }
+                        locationMarker = L.marker([lat, lon], {
+                            icon: L.AwesomeMarkers.icon({icon: 'info-sign', markerColor: 'blue', prefix: 'glyphicon', iconColor: 'white'})
+                        }).bindTooltip('Podany adres').addTo(map);
+                    }
+                };
+            })({{ this._parent.get_name() }});
+        {% endmacro %}
+    """)
+
+    def __init__(self, min_zoom=CLUSTER_MIN_ZOOM, detail_zoom=DETAIL_ZOOM, azimuth_min_zoom=AZIMUTH_MIN_ZOOM):
+        super().__init__()
+        self._name = 'MapApi'
+        self.min_zoom = min_zoom
+        self.detail_zoom = detail_zoom
+        self.azimuth_min_zoom = azimuth_min_zoom
+
+
+def build_map_page(location=(52.07, 19.48), zoom_start=6):
+    """
+    Tworzy HTML strony mapy z API window.mnsm (wczytywany do QWebEngineView raz).
+
+    Args:
+        location (tuple): Początkowy środek mapy (domyślnie środek Polski).
+        zoom_start (int): Początkowy poziom powiększenia.
+
+    Returns:
+        str: HTML strony.
+    """
+    map_ = folium.Map(location=list(location), zoom_start=zoom_start, prefer_canvas=True)
+    MapApi().add_to(map_)
+    data = io.BytesIO()
+    map_.save(data, close_file=False)
+    return data.getvalue().decode()
+
+
+def _script_json(data):
+    # '</' jest escapowane, aby teksty w danych nie mogły zamknąć znacznika <script>
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).replace('</', '<\\/')
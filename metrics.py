@@ -0,0 +1,290 @@
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Progi histogramów czasu (sekundy) w eksporcie Prometheus
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# Przedrostek nazw metryk w eksporcie Prometheus
+PROMETHEUS_PREFIX = 'mnsm_'
+
+# Liczba ostatnich spanów przechowywanych do podglądu
+RECENT_SPANS = 200
+
+# Opisy metryk (HELP w eksporcie Prometheus)
+METRIC_HELP = {
+    'span_seconds': 'Czas etapów przetwarzania',
+    'http_request_seconds': 'Czas zapytań HTTP (pojedyncza próba)',
+    'http_requests_total': 'Zapytania HTTP według endpointu i statusu',
+    'http_response_bytes_total': 'Bajty odpowiedzi HTTP według endpointu',
+    'cache_requests_total': 'Odczyty cache według wyniku (hit, miss, stale, revalidated)',
+    'pdf_parse_seconds': 'Czas ekstrakcji azymutów z jednego PDF-a',
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class Histogram:
+    """
+    Rozkład wartości: liczba, suma, minimum, maksimum i liczniki progów.
+    """
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+        }
+
+
+class Metrics:
+    """
+    Lekki, bezpieczny wątkowo rejestr metryk i spanów.
+
+    Liczniki (inc) i histogramy (observe) są identyfikowane nazwą i etykietami.
+    span mierzy czas etapu: zapisuje go w histogramie span_seconds i na liście
+    ostatnich spanów (z nazwą spanu nadrzędnego w tym samym wątku). Dane można
+    wyeksportować jako JSON (snapshot, to_json) lub tekst Prometheus (to_prometheus).
+    """
+
+    def __init__(self, recent_spans=RECENT_SPANS):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters = {}
+        self._histograms = {}
+        self._recent = deque(maxlen=recent_spans)
+        self.started_at = time.time()
+
+    def inc(self, name, value=1, **labels):
+        """
+        Zwiększa licznik.
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        """
+        Dodaje wartość (np. czas w sekundach) do histogramu.
+        """
+        key = (name, _label_key(labels))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+            self._histograms[key].observe(value)
+
+    def cache_result(self, cache, result):
+        """
+        Zlicza odczyt cache (hit, miss, stale, revalidated).
+        """
+        self.inc('cache_requests_total', cache=cache, result=result)
+
+    @contextmanager
+    def span(self, name, **labels):
+        """
+        Mierzy czas bloku kodu jako etap name.
+
+        Args:
+            name (str): Nazwa etapu (np. 'geocode', 'filter').
+            **labels: Dodatkowe informacje zapisywane przy spanie (np. liczba wierszy).
+        """
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        parent = stack[-1] if stack else None
+        stack.append(name)
+        started_at = time.time()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            stack.pop()
+            self.record_span(name, time.perf_counter() - start, started_at, parent, **labels)
+
+    def record_span(self, name, seconds, started_at=None, parent=None, **labels):
+        """
+        Zapisuje zmierzony czas etapu (np. dla operacji asynchronicznych mierzonych ręcznie).
+        """
+        self.observe('span_seconds', seconds, span=name)
+        with self._lock:
+            self._recent.append({
+                'span': name,
+                'parent': parent,
+                'started_at': started_at if started_at is not None else time.time() - seconds,
+                'seconds': round(seconds, 6),
+                'thread': threading.current_thread().name,
+                **labels,
+            })
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._recent.clear()
+            self.started_at = time.time()
+
+    def snapshot(self):
+        """
+        Zwraca wszystkie metryki jako słownik gotowy do zapisu w JSON.
+
+        Returns:
+            dict: counters, histograms, cache_hit_rates i recent_spans.
+        """
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            histograms = [
+                {'name': name, 'labels': dict(labels), **histogram.as_dict()}
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+            recent = list(self._recent)
+        return {
+            'started_at': self.started_at,
+            'uptime_s': round(time.time() - self.started_at, 3),
+            'counters': counters,
+            'histograms': histograms,
+            'cache_hit_rates': self.cache_hit_rates(counters),
+            'recent_spans': recent,
+        }
+
+    @staticmethod
+    def cache_hit_rates(counters):
+        """
+        Liczy udział trafień dla każdego cache z liczników cache_requests_total.
+
+        Trafieniem są odczyty hit, stale i revalidated (dane z cache bez pobierania całości).
+        """
+        totals, hits = {}, {}
+        for counter in counters:
+            if counter['name'] != 'cache_requests_total':
+                continue
+            cache = counter['labels']['cache']
+            totals[cache] = totals.get(cache, 0) + counter['value']
+            if counter['labels']['result'] != 'miss':
+                hits[cache] = hits.get(cache, 0) + counter['value']
+        return {cache: round(hits.get(cache, 0) / total, 4) for cache, total in sorted(totals.items()) if total}
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """
+        Zwraca metryki w formacie tekstowym Prometheus (liczniki i histogramy).
+        """
+        def format_labels(labels, extra=()):
+            pairs = list(labels) + list(extra)
+            if not pairs:
+                return ''
+            escaped = (
+                '{}="{}"'.format(key, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+                for key, value in pairs
+            )
+            return '{' + ','.join(escaped) + '}'
+
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+            declared = set()
+            for (name, labels), value in counters:
+                metric = PROMETHEUS_PREFIX + name
+                if metric not in declared:
+                    declared.add(metric)
+                    lines.append(f"# HELP {metric} {METRIC_HELP.get(name, name)}")
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{format_labels(labels)} {value}")
+            for (name, labels), histogram in histograms:
+                metric = PROMETHEUS_PREFIX + name
+                if metric not in declared:
+                    declared.add(metric)
+                    lines.append(f"# HELP {metric} {METRIC_HELP.get(name, name)}")
+                    lines.append(f"# TYPE {metric} histogram")
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    lines.append(f"{metric}_bucket{format_labels(labels, [('le', bound)])} {count}")
+                lines.append(f"{metric}_bucket{format_labels(labels, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{metric}_sum{format_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"{metric}_count{format_labels(labels)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def export(self, path):
+        """
+        Zapisuje metryki do pliku: .prom/.txt w formacie Prometheus, pozostałe jako JSON.
+        """
+        content = self.to_prometheus() if path.endswith(('.prom', '.txt')) else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    def summary(self):
+        """
+        Zwraca czytelne podsumowanie: etapy (łączny i średni czas), HTTP według endpointu i trafienia cache.
+
+        Returns:
+            str: Tekst do logów lub panelu metryk.
+        """
+        snapshot = self.snapshot()
+        lines = ['Etapy:']
+        spans = sorted(
+            (h for h in snapshot['histograms'] if h['name'] == 'span_seconds'), key=lambda h: -h['sum']
+        )
+        for h in spans:
+            lines.append(
+                f"  {h['labels']['span']:<20}{h['count']:>7} x  razem {h['sum']:>9.3f} s  "
+                f"śr. {h['mean'] * 1000:>9.1f} ms  maks. {h['max'] * 1000:>9.1f} ms"
+            )
+
+        requests = {}
+        for c in snapshot['counters']:
+            if c['name'] == 'http_requests_total':
+                requests[c['labels']['endpoint']] = requests.get(c['labels']['endpoint'], 0) + c['value']
+        response_bytes = {
+            c['labels']['endpoint']: c['value'] for c in snapshot['counters'] if c['name'] == 'http_response_bytes_total'
+        }
+        latency = {h['labels']['endpoint']: h for h in snapshot['histograms'] if h['name'] == 'http_request_seconds'}
+        if requests or response_bytes:
+            lines.append('HTTP:')
+            for endpoint in sorted(set(requests) | set(response_bytes)):
+                h = latency.get(endpoint)
+                mean = f"śr. {h['mean'] * 1000:.0f} ms, maks. {h['max'] * 1000:.0f} ms" if h else 'z cache'
+                lines.append(
+                    f"  {endpoint:<20}{requests.get(endpoint, 0):>7} zapytań  "
+                    f"{response_bytes.get(endpoint, 0) / 1024:>10.1f} kB  {mean}"
+                )
+
+        parse = [h for h in snapshot['histograms'] if h['name'] == 'pdf_parse_seconds']
+        for h in parse:
+            lines.append(f"Ekstrakcja PDF: {h['count']} plików, śr. {h['mean'] * 1000:.0f} ms, maks. {h['max'] * 1000:.0f} ms")
+
+        if snapshot['cache_hit_rates']:
+            lines.append('Trafienia cache: ' + ', '.join(
+                f"{cache} {rate:.0%}" for cache, rate in snapshot['cache_hit_rates'].items()
+            ))
+        return '\n'.join(lines)
+
+
+# Wspólny rejestr metryk procesu
+METRICS = Metrics()
@@ -0,0 +1,335 @@
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from email.utils import formatdate
+
+from cancellation import Cancelled
+from metrics import METRICS
+
+INDEX_VERSION = 1
+CHUNK_SIZE = 64 * 1024
+
+# Najkrótszy odstęp (s) między zapisami indeksu po samych odczytach z cache
+INDEX_FLUSH_INTERVAL_S = 30
+
+
+def file_sha256(path, chunk_size=CHUNK_SIZE):
+    """
+    Liczy skrót SHA-256 pliku, czytając go fragmentami.
+
+    Args:
+        path (str): Ścieżka do pliku.
+        chunk_size (int): Rozmiar fragmentu w bajtach.
+
+    Returns:
+        str: Skrót w postaci szesnastkowej.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def looks_like_complete_pdf(path):
+    """
+    Sprawdza, czy plik zaczyna się nagłówkiem PDF i kończy znacznikiem %%EOF.
+
+    Pozwala odrzucić pliki ucięte przez przerwane pobieranie.
+
+    Args:
+        path (str): Ścieżka do pliku.
+
+    Returns:
+        bool: True, jeśli plik wygląda na kompletny PDF.
+    """
+    try:
+        with open(path, 'rb') as f:
+            if f.read(5) != b'%PDF-':
+                return False
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 1024))
+            return b'%%EOF' in f.read()
+    except OSError:
+        return False
+
+
+class PdfCache:
+    """
+    Dyskowy cache raportów PDF adresowany zawartością.
+
+    Pliki są zapisywane jako objects/<sha256>.pdf, a index.json mapuje URL na skrót
+    zawartości, rozmiar, nagłówki ETag/Last-Modified i czas ostatniego użycia. Kilka
+    URL-i z tą samą zawartością dzieli jeden plik. Pobieranie idzie strumieniowo do
+    pliku tymczasowego i kończy się atomową zmianą nazwy, a po przekroczeniu limitu
+    rozmiaru usuwane są najdawniej używane pliki.
+
+    Odczyt z cache zmienia czas użycia tylko w pamięci; indeks jest zapisywany przy
+    dodaniu pliku, nie częściej niż co INDEX_FLUSH_INTERVAL_S po samych odczytach
+    oraz w flush (np. na koniec przebiegu PdfWorker).
+
+    W deferred_eviction usuwanie plików jest wstrzymane do końca przebiegu, aby nie
+    usunąć PDF-ów pobranych w tym przebiegu, które czekają jeszcze na ekstrakcję.
+    """
+
+    def __init__(self, directory, http, max_bytes=1024 * 1024 * 1024, revalidate=False, timeout=60):
+        self.directory = directory
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.index_path = os.path.join(directory, 'index.json')
+        self.http = http
+        self.max_bytes = max_bytes
+        self.revalidate = revalidate
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._url_locks = {}
+        self._entries = None
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self._deferring = 0
+
+    def _load_index(self):
+        # Wywoływane pod self._lock
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            with open(self.index_path, encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') == INDEX_VERSION:
+                self._entries = index.get('urls', {})
+        except (OSError, ValueError) as e:
+            if os.path.exists(self.index_path):
+                logging.warning(f"Nie udało się wczytać indeksu cache PDF {self.index_path}: {e}")
+
+    def _save_index(self):
+        # Wywoływane pod self._lock
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.index_path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': INDEX_VERSION, 'urls': self._entries}, f)
+        os.replace(tmp_path, self.index_path)
+        self._dirty = False
+        self._saved_at = time.monotonic()
+
+    def flush(self):
+        """
+        Zapisuje indeks, jeśli od ostatniego zapisu zmieniły się czasy użycia plików.
+        """
+        with self._lock:
+            if self._dirty:
+                self._save_index()
+
+    @contextlib.contextmanager
+    def deferred_eviction(self):
+        """
+        Wstrzymuje usuwanie plików z cache na czas przebiegu.
+
+        Po zakończeniu ostatniego przebiegu cache jest przycinany do limitu rozmiaru,
+        a zmieniony indeks zapisywany.
+        """
+        with self._lock:
+            self._deferring += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._deferring -= 1
+                if not self._deferring and self._entries is not None and self._evict():
+                    self._save_index()
+
+    def _url_lock(self, url):
+        with self._lock:
+            if url not in self._url_locks:
+                self._url_locks[url] = threading.Lock()
+            return self._url_locks[url]
+
+    def object_path(self, sha256):
+        """
+        Zwraca ścieżkę pliku o podanym skrócie zawartości.
+        """
+        return os.path.join(self.objects_dir, f"{sha256}.pdf")
+
+    def _valid_entry(self, entry):
+        path = self.object_path(entry['sha256'])
+        try:
+            return os.path.getsize(path) == entry['size']
+        except OSError:
+            return False
+
+    def _store(self, url, path, etag=None, last_modified=None):
+        """
+        Przenosi gotowy plik do magazynu obiektów i zapisuje wpis w indeksie.
+        """
+        sha256 = file_sha256(path)
+        target = self.object_path(sha256)
+        os.makedirs(self.objects_dir, exist_ok=True)
+        if os.path.exists(target):
+            os.remove(path)
+        else:
+            os.replace(path, target)
+        now = time.time()
+        entry = {
+            'sha256': sha256,
+            'size': os.path.getsize(target),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': now,
+            'last_used': now,
+        }
+        with self._lock:
+            self._entries[url] = entry
+            if not self._deferring:
+                self._evict(keep=sha256)
+            self._save_index()
+        return target
+
+    def _touch(self, url, fetched=False):
+        with self._lock:
+            entry = self._entries[url]
+            entry['last_used'] = time.time()
+            if fetched:
+                entry['fetched_at'] = entry['last_used']
+            self._dirty = True
+            if time.monotonic() - self._saved_at >= INDEX_FLUSH_INTERVAL_S:
+                self._save_index()
+
+    def _adopt_legacy_file(self, url):
+        """
+        Przejmuje plik pdfs/<nazwa> pobrany przez wcześniejsze wersje programu.
+        """
+        legacy_path = os.path.join(self.directory, url.split('/')[-1])
+        if not os.path.isfile(legacy_path) or not looks_like_complete_pdf(legacy_path):
+            return None
+        logging.info(f"Przejęcie istniejącego pliku PDF do cache: {legacy_path}")
+        return self._store(url, legacy_path)
+
+    def _download(self, url, headers, cancel_token=None):
+        """
+        Pobiera PDF strumieniowo do pliku tymczasowego.
+
+        Returns:
+            tuple: (odpowiedź HTTP, ścieżka pliku tymczasowego lub None).
+
+        Raises:
+            Cancelled: Gdy cancel_token zostanie anulowany w trakcie pobierania.
+        """
+        response = self.http.get(
+            url, headers=headers, stream=True, timeout=self.timeout, endpoint='pdf', cancel_token=cancel_token
+        )
+        if response.status_code != 200:
+            response.close()
+            return response, None
+        os.makedirs(self.objects_dir, exist_ok=True)
+        tmp_path = os.path.join(self.objects_dir, f"download.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    if cancel_token is not None and cancel_token.cancelled:
+                        raise Cancelled()
+                    f.write(chunk)
+                    METRICS.inc('http_response_bytes_total', len(chunk), endpoint='pdf')
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        finally:
+            response.close()
+        return response, tmp_path
+
+    def get(self, url, cancel_token=None):
+        """
+        Zwraca ścieżkę lokalnej kopii PDF, pobierając go tylko wtedy, gdy to konieczne.
+
+        Plik obecny w cache jest zwracany bez połączenia z serwerem. Przy włączonej
+        rewalidacji wysyłane jest zapytanie warunkowe (If-None-Match/If-Modified-Since),
+        a odpowiedź 304 oznacza użycie kopii lokalnej.
+
+        Args:
+            url (str): URL pliku PDF.
+            cancel_token (CancelToken): Przerywa pobieranie.
+
+        Returns:
+            str | None: Ścieżka do pliku lub None w przypadku błędu.
+        """
+        with self._url_lock(url):
+            with self._lock:
+                self._load_index()
+                entry = self._entries.get(url)
+            if entry is not None and not self._valid_entry(entry):
+                entry = None
+
+            if entry is None:
+                adopted = self._adopt_legacy_file(url)
+                if adopted and not self.revalidate:
+                    METRICS.cache_result('pdf', 'hit')
+                    return adopted
+                with self._lock:
+                    entry = self._entries.get(url)
+
+            if entry is not None and not self.revalidate:
+                self._touch(url)
+                METRICS.cache_result('pdf', 'hit')
+                logging.debug(f"PDF z cache: {url}")
+                return self.object_path(entry['sha256'])
+
+            headers = {}
+            if entry is not None:
+                if entry.get('etag'):
+                    headers['If-None-Match'] = entry['etag']
+                headers['If-Modified-Since'] = entry.get('last_modified') or formatdate(entry['fetched_at'], usegmt=True)
+
+            response, tmp_path = self._download(url, headers, cancel_token)
+            if response.status_code == 304 and entry is not None:
+                self._touch(url, fetched=True)
+                METRICS.cache_result('pdf', 'revalidated')
+                logging.debug(f"PDF aktualny (304): {url}")
+                return self.object_path(entry['sha256'])
+            if tmp_path is None:
+                logging.error(f"Błąd HTTP {response.status_code} podczas pobierania PDF z {url}.")
+                # Nieudana rewalidacja nie unieważnia poprawnej kopii lokalnej
+                return self.object_path(entry['sha256']) if entry is not None else None
+
+            path = self._store(url, tmp_path, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            METRICS.cache_result('pdf', 'miss')
+            logging.info(f"PDF zapisany jako: {path}")
+            return path
+
+    def _evict(self, keep=None):
+        """
+        Usuwa najdawniej używane pliki, dopóki cache przekracza limit rozmiaru.
+
+        Wywoływane pod self._lock.
+
+        Returns:
+            bool: True, jeśli usunięto jakiekolwiek pliki.
+        """
+        objects = {}
+        for entry in self._entries.values():
+            size, last_used = objects.get(entry['sha256'], (entry['size'], 0))
+            objects[entry['sha256']] = (size, max(last_used, entry['last_used']))
+        total = sum(size for size, _ in objects.values())
+        if total <= self.max_bytes:
+            return False
+
+        evicted = set()
+        for sha256, (size, _) in sorted(objects.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            if sha256 == keep:
+                continue
+            try:
+                os.remove(self.object_path(sha256))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.warning(f"Nie udało się usunąć pliku z cache PDF: {e}")
+                continue
+            evicted.add(sha256)
+            total -= size
+        self._entries = {url: entry for url, entry in self._entries.items() if entry['sha256'] not in evicted}
+        logging.info(f"Usunięto z cache PDF {len(evicted)} plików, rozmiar cache: {total / 1024 / 1024:.1f} MB")
+        return bool(evicted)
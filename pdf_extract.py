@@ -0,0 +1,251 @@
+import logging
+import os
+import re
+import time
+
+import pdfplumber
+
+AZIMUTH_HEADERS = [
+    'Azymut H', 'Azimuth H', 'Kierunek H', 'Direction H',
+    'Azymut', 'Azimuth', 'Kierunek', 'Direction'
+]
+
+# Pierwsze słowa nagłówków kolumny z azymutami, szukane w warstwie tekstowej strony
+AZIMUTH_HEADER_WORDS = {header.split()[0].lower() for header in AZIMUTH_HEADERS}
+AZIMUTH_VALUE = re.compile(r'^(\d{1,3})\s*°$')
+
+# Poziomy ekstrakcji: szybki (pozycje słów) i pełna detekcja tabel pdfplumber
+TIER_WORDS = 'words'
+TIER_TABLES = 'tables'
+
+# Maksymalny odstęp (pt) między słowami jednego nagłówka i margines kolumny wokół nagłówka
+HEADER_WORD_GAP = 4
+COLUMN_MARGIN = 6
+
+# Maksymalna różnica położenia (pt) słów jednej linii tabeli
+LINE_TOLERANCE = 2
+
+
+def header_span(words, header):
+    """
+    Zwraca poziomy zakres nagłówka, łącząc słowa stojące tuż za nim w tej samej linii (np. "Azymut H [°]").
+    """
+    x0, x1 = header['x0'], header['x1']
+    line = sorted((w for w in words if abs(w['top'] - header['top']) < 2 and w['x0'] >= header['x1']), key=lambda w: w['x0'])
+    for word in line:
+        if word['x0'] - x1 > HEADER_WORD_GAP:
+            break
+        x1 = word['x1']
+    return x0, x1
+
+
+def count_lines(words, top, bottom):
+    """
+    Liczy linie tekstu (słowa o zbliżonym położeniu pionowym) między top a bottom włącznie.
+    """
+    tops = sorted(
+        w['top'] for w in words if top - LINE_TOLERANCE <= w['top'] <= bottom + LINE_TOLERANCE
+    )
+    lines = 0
+    last = None
+    for value in tops:
+        if last is None or value - last > LINE_TOLERANCE:
+            lines += 1
+        last = value
+    return lines
+
+
+def extract_azimuths_from_words(words):
+    """
+    Szybka ekstrakcja azymutów na podstawie pozycji słów, bez detekcji tabel.
+
+    Kolumną z azymutami jest obszar pod nagłówkiem z AZIMUTH_HEADERS (najwyższa linia
+    z takimi nagłówkami). Wartości są zbierane od góry, aż do pierwszego słowa, które
+    nie jest azymutem w stopniach. Słowa przed pierwszą wartością (np. dalsza część
+    nagłówka w drugiej linii) są pomijane.
+
+    Kolumna z przerwą (np. "-" lub pusta komórka między wartościami) nie przechodzi
+    walidacji: po przerwie w kolumnie jest kolejny azymut albo między pierwszą a ostatnią
+    wartością jest więcej linii tabeli niż wartości. Pełna detekcja tabel zachowuje
+    wtedy wszystkie wiersze.
+
+    Args:
+        words (list): Słowa strony z page.extract_words().
+
+    Returns:
+        list | None: Azymuty (np. "120°") w kolejności wierszy lub None, gdy wynik nie
+        przechodzi walidacji i trzeba użyć pełnej detekcji tabel.
+    """
+    headers = [w for w in words if w['text'].strip(':').lower() in AZIMUTH_HEADER_WORDS]
+    if not headers:
+        return None
+    top = min(w['top'] for w in headers)
+    headers = [w for w in headers if abs(w['top'] - top) < 2]
+
+    values = []
+    for header in headers:
+        x0, x1 = header_span(words, header)
+        column = sorted(
+            (w for w in words if w['top'] > header['bottom'] and x0 - COLUMN_MARGIN <= (w['x0'] + w['x1']) / 2 <= x1 + COLUMN_MARGIN),
+            key=lambda w: w['top']
+        )
+        column_values = []
+        for i, word in enumerate(column):
+            match = AZIMUTH_VALUE.match(word['text'])
+            if not match:
+                if column_values:
+                    # Azymut pod słowem przerywającym kolumnę oznacza przerwę, a nie koniec tabeli
+                    if any(AZIMUTH_VALUE.match(w['text']) for w in column[i + 1:]):
+                        return None
+                    break
+                continue
+            if not 0 <= int(match.group(1)) <= 360:
+                return None
+            column_values.append((word['top'], word['x0'], f"{int(match.group(1))}°"))
+        if not column_values:
+            return None
+        if count_lines(words, column_values[0][0], column_values[-1][0]) != len(column_values):
+            return None
+        values.extend(column_values)
+
+    # Kolejność jak przy odczycie tabeli: wiersz po wierszu, kolumny od lewej
+    return [value for _, _, value in sorted(values, key=lambda v: (round(v[0]), v[1]))]
+
+
+def extract_azimuths_from_tables(page, pdf_path, page_number):
+    """
+    Pełna ekstrakcja azymutów z pierwszej tabeli strony (page.extract_tables()).
+
+    Returns:
+        list | str: Azymuty lub komunikat o przyczynie niepowodzenia.
+    """
+    tables = page.extract_tables()
+    if not tables:
+        logging.warning(f"Nie znaleziono tabel na stronie {page_number} w PDF: {pdf_path}")
+        return 'Nie znaleziono tabel'
+
+    table = tables[0]
+    headers = table[0]
+    normalized_headers = [header.strip().lower() if header else '' for header in headers]
+    azimuth_col_indices = [
+        i for i, header in enumerate(normalized_headers)
+        if any(re.search(r'\b{}\b'.format(re.escape(h.lower())), header) for h in AZIMUTH_HEADERS)
+    ]
+
+    if not azimuth_col_indices:
+        logging.warning(f"Nie znaleziono kolumny z azymutami w tabeli na stronie {page_number} w PDF: {pdf_path}")
+        return 'Nie znaleziono kolumny z azymutami'
+
+    logging.debug(f"Znalezione nagłówki tabeli: {headers}")
+    logging.debug(f"Indeksy kolumn z azymutami: {azimuth_col_indices}")
+
+    azimuths = []
+    for row in table[1:]:
+        for index in azimuth_col_indices:
+            if index < len(row):
+                azimuth_value = row[index].strip() if row[index] else ''
+                if azimuth_value:
+                    match = re.match(r'(\d{1,3})\s*°', azimuth_value)
+                    if match:
+                        az_value = int(match.group(1))
+                        if 0 <= az_value <= 360:
+                            azimuths.append(str(az_value) + '°')
+                        else:
+                            logging.warning(f"Niewłaściwa wartość azymutu: {azimuth_value} w PDF: {pdf_path}")
+                    else:
+                        azimuths.append(azimuth_value)
+    return azimuths
+
+
+def extract_information_for_stations(pdf_path, station_ids, pdf_name=None, page_number=3, text_dump_dir=None):
+    """
+    Ekstrahuje azymuty z pliku PDF jeden raz dla wszystkich podanych stacji.
+
+    Ten sam raport pomiarowy często dotyczy kilku stacji w jednej lokalizacji. Strona
+    jest czytana raz, a tabela azymutów jest ekstrahowana tylko wtedy, gdy na stronie
+    występuje co najmniej jeden z podanych StationId. Najpierw próbowana jest szybka
+    ścieżka oparta na pozycjach słów, a pełna detekcja tabel pdfplumber jest używana
+    tylko wtedy, gdy szybka ścieżka nie przejdzie walidacji. Użyty poziom jest
+    zwracany w polu 'Tier'.
+
+    Args:
+        pdf_path (str): Ścieżka do pliku PDF.
+        station_ids (list): StationId, których szukamy na stronie.
+        pdf_name (str): Nazwa PDF-a zapisywana w wynikach (domyślnie nazwa pliku).
+        page_number (int): Numer strony (od 1) z tabelą azymutów.
+        text_dump_dir (str): Katalog na tekst strony (None - bez zapisu).
+
+    Returns:
+        list: Dla każdej stacji słownik z Station ID, PDF File, Azymuts (lista lub komunikat) i Tier.
+    """
+    pdf_name = pdf_name or os.path.basename(pdf_path)
+
+    def results(azimuths, found=None, tier=None):
+        entries = []
+        for station_id in station_ids:
+            entry = {'Station ID': station_id, 'PDF File': pdf_name}
+            if found is not None and station_id not in found:
+                entry['Azymuts'] = 'ID stacji nie znaleziono'
+            else:
+                entry['Azymuts'] = azimuths
+                if tier and isinstance(azimuths, list):
+                    entry['Tier'] = tier
+            entries.append(entry)
+        return entries
+
+    if not os.path.exists(pdf_path):
+        logging.error(f"Plik PDF {pdf_path} nie istnieje.")
+        return results('Plik nie istnieje')
+
+    with pdfplumber.open(pdf_path) as pdf:
+        if len(pdf.pages) < page_number:
+            logging.warning(f"PDF {pdf_path} ma mniej niż {page_number} strony.")
+            return results('Nie znaleziono tabel')
+
+        page = pdf.pages[page_number - 1]
+        words = page.extract_words()
+        if not words:
+            logging.error(f"Brak tekstu na stronie {page_number} w PDF: {pdf_path}")
+            return results('Brak tekstu')
+
+        if text_dump_dir:
+            text_save_path = os.path.join(text_dump_dir, f"{pdf_name}_page_{page_number}.txt")
+            os.makedirs(text_dump_dir, exist_ok=True)
+            with open(text_save_path, 'w', encoding='utf-8') as f:
+                f.write(page.extract_text() or '')
+            logging.debug(f"Zapisano wyciągnięty tekst ze strony {page_number} w PDF: {pdf_path} do {text_save_path}")
+
+        found = {
+            station_id for station_id in station_ids
+            if any(station_id in word['text'] for word in words)
+        }
+        for station_id in set(station_ids) - found:
+            logging.error(f"ID stacji {station_id} nie znaleziono na stronie {page_number} PDF: {pdf_path}")
+        if not found:
+            return results(None, found)
+
+        tier = TIER_WORDS
+        azimuths = extract_azimuths_from_words(words)
+        if azimuths is None:
+            tier = TIER_TABLES
+            azimuths = extract_azimuths_from_tables(page, pdf_path, page_number)
+
+    if isinstance(azimuths, list) and not azimuths:
+        logging.warning(f"Nie znaleziono azymutów w tabeli PDF: {pdf_path}")
+        azimuths = 'Nie znaleziono azymutów'
+    return results(azimuths, found, tier)
+
+
+def extract_information_for_stations_timed(*args, **kwargs):
+    """
+    Wywołuje extract_information_for_stations i mierzy czas ekstrakcji.
+
+    Metryki procesu roboczego puli nie trafiają do procesu głównego, więc czas jest
+    zwracany razem z wynikami.
+
+    Returns:
+        tuple: (wyniki extract_information_for_stations, czas w sekundach).
+    """
+    start = time.perf_counter()
+    results = extract_information_for_stations(*args, **kwargs)
+    return results, time.perf_counter() - start
@@ -0,0 +1,40 @@
+import configparser
+import os
+
+# Konfiguracja (config.ini, sekcje Paths i Settings) współdzielona przez GUI i CLI
+config = configparser.ConfigParser()
+config.read('config.ini')
+DATABASE_PATH = config.get('Paths', 'database_path', fallback='output.csv')
+PDF_DIR = config.get('Paths', 'pdf_dir', fallback='pdfs')
+EXTRACTED_TEXT_DIR = config.get('Paths', 'extracted_text_dir', fallback='extracted_texts')
+PDF_PAGE_NR = config.getint('Settings', 'pdf_page_nr', fallback=3)
+DUMP_EXTRACTED_TEXT = config.getboolean('Settings', 'dump_extracted_text', fallback=False)
+MAX_RADIUS_KM = config.getint('Settings', 'max_radius_km', fallback=150)
+MAX_CONNECTIONS = config.getint('Settings', 'max_connections', fallback=16)
+MAX_CONNECTIONS_PER_HOST = config.getint('Settings', 'max_connections_per_host', fallback=8)
+HTTP_RATE_LIMIT = config.getfloat('Settings', 'http_rate_limit', fallback=10.0)
+HTTP_BURST = config.getint('Settings', 'http_burst', fallback=20)
+HTTP_MAX_RETRIES = config.getint('Settings', 'http_max_retries', fallback=4)
+HTTP_CIRCUIT_FAILURES = config.getint('Settings', 'http_circuit_failures', fallback=5)
+HTTP_CIRCUIT_COOLDOWN_S = config.getfloat('Settings', 'http_circuit_cooldown_s', fallback=30.0)
+HTTP_TIMEOUT_S = config.getfloat('Settings', 'http_timeout_s', fallback=30.0)
+WFS_TILE_DEG = config.getfloat('Settings', 'wfs_tile_deg', fallback=0.05)
+WFS_MULTI_TYPENAME = config.getboolean('Settings', 'wfs_multi_typename', fallback=False)
+PDF_CACHE_MAX_MB = config.getint('Settings', 'pdf_cache_max_mb', fallback=1024)
+PDF_REVALIDATE = config.getboolean('Settings', 'pdf_revalidate', fallback=False)
+HTTP_CACHE_PATH = config.get('Settings', 'http_cache_path', fallback='http_cache.sqlite')
+AZIMUTH_DB_PATH = config.get('Settings', 'azimuth_db_path', fallback='azimuths.sqlite')
+JOB_JOURNAL_PATH = config.get('Settings', 'job_journal_path', fallback='jobs.sqlite')
+GEOCODE_CACHE_PATH = config.get('Settings', 'geocode_cache_path', fallback='geocode.sqlite')
+GEOCODE_CACHE_SIZE = config.getint('Settings', 'geocode_cache_size', fallback=1000)
+BASE_STATION_TTL_S = config.getint('Settings', 'base_station_ttl_s', fallback=7 * 24 * 3600)
+WFS_TTL_S = config.getint('Settings', 'wfs_ttl_s', fallback=24 * 3600)
+OFFLINE = config.getboolean('Settings', 'offline', fallback=False)
+# Adres serwisu si2pem (np. lokalny serwer z benchmarks/si2pem_fixture.py)
+SI2PEM_URL = config.get('Settings', 'si2pem_url', fallback='https://si2pem.gov.pl').rstrip('/')
+# Liczba procesów ekstrakcji PDF (0 - liczba rdzeni procesora)
+PDF_WORKERS = config.getint('Settings', 'pdf_workers', fallback=0) or os.cpu_count() or 1
+# Panel metryk w oknie programu i plik, do którego metryki są zapisywane przy zamknięciu
+# (.prom/.txt - format Prometheus, inne - JSON; puste - bez zapisu)
+METRICS_PANEL = config.getboolean('Settings', 'metrics_panel', fallback=False)
+METRICS_EXPORT_PATH = config.get('Settings', 'metrics_export_path', fallback='')
@@ -0,0 +1,297 @@
+import logging
+import threading
+import time
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from cancellation import sleep
+from http_cache import CachedResponse
+from http_limits import AdaptiveConcurrency, CircuitBreaker, TokenBucket, backoff_delay
+from metrics import METRICS
+from settings import SI2PEM_URL
+
+BASE_STATION_URL = f"{SI2PEM_URL}/api/public/base_station"
+WFS_URL = f"{SI2PEM_URL}/geoserver/public/wfs"
+
+# Warstwy WFS z pomiarami PEM, w których szukamy raportów PDF
+FEATURE_TYPES = [
+    'public:measures_all',
+    'public:measures_14_21',
+    'public:measures_21_28',
+    'public:measures_28',
+    'public:measures_7',
+    'public:measures_7_14'
+]
+
+# Odpowiedzi oznaczające przeciążenie lub chwilową awarię serwera - zapytanie jest ponawiane
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+HostLimits = namedtuple('HostLimits', ['bucket', 'concurrency', 'breaker'])
+
+
+class HttpClient:
+    """
+    Współdzielona sesja HTTP z pulą połączeń i ochroną serwera przed przeciążeniem.
+
+    Połączenia TCP/TLS są ponownie używane między zapytaniami i wątkami. Dla każdego
+    hosta działa limit zapytań na sekundę (TokenBucket), adaptacyjny limit równoległych
+    zapytań (AdaptiveConcurrency, maksymalnie max_per_host) i bezpiecznik
+    (CircuitBreaker). Zapytania zakończone błędem połączenia lub odpowiedzią 429/5xx
+    są ponawiane z wykładniczym, losowym opóźnieniem (lub zgodnie z Retry-After).
+    Opcjonalny ResponseCache przechowuje odpowiedzi zapytań wywołanych z ttl; w trybie
+    offline odpowiedzi są brane wyłącznie z cache. Czas, status i rozmiar odpowiedzi
+    każdej próby trafiają do metryk z etykietą endpointu.
+    """
+
+    def __init__(self, max_connections=16, max_per_host=8, cache=None, offline=False, rate_limit=10.0,
+                 burst=20, max_retries=4, circuit_failures=5, circuit_cooldown=30.0, timeout=30):
+        self.max_per_host = max_per_host
+        self.cache = cache
+        self.offline = offline
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.max_retries = max_retries
+        self.circuit_failures = circuit_failures
+        self.circuit_cooldown = circuit_cooldown
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._host_limits = {}
+        self._lock = threading.Lock()
+
+    def _limits_for(self, url):
+        host = urlsplit(url).netloc
+        with self._lock:
+            if host not in self._host_limits:
+                self._host_limits[host] = HostLimits(
+                    TokenBucket(self.rate_limit, self.burst),
+                    AdaptiveConcurrency(self.max_per_host),
+                    CircuitBreaker(self.circuit_failures, self.circuit_cooldown),
+                )
+            return self._host_limits[host]
+
+    @staticmethod
+    def _retry_after(response):
+        value = response.headers.get('Retry-After', '') if response is not None else ''
+        return min(float(value), 60.0) if value.isdigit() else None
+
+    @staticmethod
+    def _release_on_close(response, concurrency, start):
+        """
+        Zwalnia miejsce w limicie współbieżności dopiero po zamknięciu odpowiedzi.
+
+        Dzięki temu pobieranie treści odpowiedzi strumieniowej podlega limitowi hosta,
+        a AIMD mierzy czas całego transferu zamiast czasu do nagłówków.
+
+        Args:
+            response (requests.Response): Odpowiedź z stream=True.
+            concurrency (AdaptiveConcurrency): Limit, w którym zajęto miejsce.
+            start (float): Czas wysłania zapytania (time.monotonic()).
+        """
+        close = response.close
+        released = threading.Lock()
+
+        def close_and_release():
+            try:
+                close()
+            finally:
+                if released.acquire(blocking=False):
+                    concurrency.release(time.monotonic() - start, False)
+
+        response.close = close_and_release
+
+    def get(self, url, ttl=None, endpoint=None, cancel_token=None, **kwargs):
+        """
+        Wysyła zapytanie GET z limitami hosta, ponowieniami i bezpiecznikiem.
+
+        Args:
+            url (str): Adres URL.
+            ttl (float): Czas ważności odpowiedzi w cache w sekundach (None - bez cache).
+            endpoint (str): Nazwa endpointu zapisywana w cache i w metrykach (domyślnie host).
+            cancel_token (CancelToken): Przerywa oczekiwanie na limity i ponowienia.
+            **kwargs: Dodatkowe argumenty requests (np. timeout, stream).
+
+        Returns:
+            requests.Response | CachedResponse: Odpowiedź serwera, odpowiedź z cache lub
+            odpowiedź 503, gdy bezpiecznik hosta pozostał otwarty. Odpowiedź ze stream=True
+            zajmuje miejsce w limicie hosta, dopóki odbiorca jej nie zamknie (response.close()).
+
+        Raises:
+            requests.RequestException: Gdy wszystkie próby zakończyły się błędem połączenia.
+            Cancelled: Gdy cancel_token został anulowany przed wysłaniem zapytania.
+        """
+        label = endpoint or urlsplit(url).netloc
+        use_cache = self.cache is not None and ttl is not None
+        if use_cache:
+            content = self.cache.get(url, allow_stale=self.offline)
+            METRICS.cache_result('http', 'miss' if content is None else 'hit')
+            if content is not None:
+                logging.debug(f"GET {url} (cache)")
+                return CachedResponse(200, content)
+        if self.offline:
+            logging.warning(f"Tryb offline: brak odpowiedzi w cache dla {url}")
+            return CachedResponse(504)
+
+        kwargs.setdefault('timeout', self.timeout)
+        limits = self._limits_for(url)
+        response = error = None
+        for attempt in range(self.max_retries + 1):
+            if cancel_token is not None:
+                cancel_token.raise_if_cancelled()
+            wait = limits.breaker.wait_time()
+            if wait:
+                logging.warning(f"Bezpiecznik dla {urlsplit(url).netloc} otwarty, oczekiwanie {wait:.0f} s")
+                sleep(wait, cancel_token)
+                if limits.breaker.wait_time():
+                    continue
+
+            limits.bucket.acquire(cancel_token)
+            limits.concurrency.acquire(cancel_token)
+            start = time.monotonic()
+            response = error = None
+            try:
+                logging.debug(f"GET {url}")
+                response = self.session.get(url, **kwargs)
+            except requests.RequestException as e:
+                error = e
+            finally:
+                failed = error is not None or response is None or response.status_code in RETRY_STATUSES
+                # Odpowiedź strumieniowa zajmuje miejsce hosta do zamknięcia jej treści przez odbiorcę
+                if kwargs.get('stream') and not failed:
+                    self._release_on_close(response, limits.concurrency, start)
+                else:
+                    limits.concurrency.release(time.monotonic() - start, failed)
+            latency = time.monotonic() - start
+            METRICS.observe('http_request_seconds', latency, endpoint=label)
+            METRICS.inc('http_requests_total', endpoint=label, status='error' if error is not None else response.status_code)
+            limits.breaker.record(not failed)
+            if not failed or attempt == self.max_retries:
+                break
+
+            delay = self._retry_after(response) or backoff_delay(attempt)
+            logging.warning(
+                f"Ponowienie zapytania {url} za {delay:.1f} s (próba {attempt + 2}/{self.max_retries + 1}): "
+                f"{error or f'HTTP {response.status_code}'}"
+            )
+            if response is not None:
+                response.close()
+            sleep(delay, cancel_token)
+
+        if error is not None:
+            raise error
+        if response is None:
+            return CachedResponse(503)
+        # Treść odpowiedzi strumieniowych jest liczona przez odbiorcę (np. PdfCache)
+        if not kwargs.get('stream'):
+            METRICS.inc('http_response_bytes_total', len(response.content), endpoint=label)
+        if use_cache and response.status_code == 200:
+            self.cache.put(url, endpoint or urlsplit(url).path, response.content, ttl)
+        return response
+
+
+def parse_bbox(bbox):
+    """
+    Zamienia bounding box z API base_station na liczby.
+
+    Args:
+        bbox (list): [min_lat, max_lat, min_lon, max_lon] (liczby lub teksty).
+
+    Returns:
+        tuple | None: (min_lat, max_lat, min_lon, max_lon) lub None dla niepoprawnych danych.
+    """
+    if not bbox or len(bbox) != 4:
+        return None
+    try:
+        return tuple(float(value) for value in bbox)
+    except (TypeError, ValueError):
+        return None
+
+
+def plan_tiles(station_bboxes, tile_deg=0.05):
+    """
+    Grupuje stacje w kafle, aby jedna warstwa WFS była odpytywana raz na kafel.
+
+    Stacja trafia do kafla siatki o boku tile_deg, w którym leży środek jej bounding
+    boxa. Zakres zapytania kafla to suma bounding boxów jego stacji, więc obejmuje
+    wszystko, co zwróciłyby zapytania dla pojedynczych stacji.
+
+    Args:
+        station_bboxes (dict): StationId -> (min_lat, max_lat, min_lon, max_lon).
+        tile_deg (float): Bok kafla w stopniach.
+
+    Returns:
+        list: Krotki (bbox kafla, lista StationId).
+    """
+    tiles = {}
+    for station_id, (min_lat, max_lat, min_lon, max_lon) in station_bboxes.items():
+        key = (int((min_lat + max_lat) / 2 // tile_deg), int((min_lon + max_lon) / 2 // tile_deg))
+        tiles.setdefault(key, []).append(station_id)
+
+    plan = []
+    for station_ids in tiles.values():
+        boxes = [station_bboxes[station_id] for station_id in station_ids]
+        bbox = (
+            min(box[0] for box in boxes),
+            max(box[1] for box in boxes),
+            min(box[2] for box in boxes),
+            max(box[3] for box in boxes),
+        )
+        plan.append((bbox, station_ids))
+    return plan
+
+
+def feature_points(feature):
+    """
+    Zwraca współrzędne (lon, lat) geometrii cechy GeoJSON.
+
+    Args:
+        feature (dict): Cecha GeoJSON.
+
+    Returns:
+        list: Lista punktów (lon, lat); pusta, gdy cecha nie ma geometrii.
+    """
+    geometry = feature.get('geometry') or {}
+    points = []
+
+    def collect(coords):
+        if isinstance(coords, (list, tuple)) and len(coords) >= 2 and all(isinstance(c, (int, float)) for c in coords[:2]):
+            points.append((float(coords[0]), float(coords[1])))
+        elif isinstance(coords, (list, tuple)):
+            for item in coords:
+                collect(item)
+
+    collect(geometry.get('coordinates'))
+    return points
+
+
+def assign_features_to_stations(features, station_bboxes, url_getter):
+    """
+    Przypisuje adresy PDF z cech WFS do stacji, których bounding box zawiera geometrię cechy.
+
+    Args:
+        features (list): Cechy GeoJSON zwrócone dla kafla.
+        station_bboxes (dict): StationId -> (min_lat, max_lat, min_lon, max_lon) dla stacji kafla.
+        url_getter (callable): Funkcja zwracająca URL PDF z właściwości cechy (lub None).
+
+    Returns:
+        tuple: (dict StationId -> set URL-i, bool - czy wszystkie cechy z PDF miały geometrię).
+    """
+    urls = {station_id: set() for station_id in station_bboxes}
+    complete = True
+    for feature in features:
+        pdf_url = url_getter(feature.get('properties', {}))
+        if not pdf_url:
+            continue
+        points = feature_points(feature)
+        if not points:
+            complete = False
+            continue
+        for station_id, (min_lat, max_lat, min_lon, max_lon) in station_bboxes.items():
+            if any(min_lat <= lat <= max_lat and min_lon <= lon <= max_lon for lon, lat in points):
+                urls[station_id].add(pdf_url)
+    return urls, complete
@@ -0,0 +1,207 @@
+import json
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+
+# Kolory operatorów na mapie (klucze to wartości siec_id z bazy UKE)
+SITE_OPERATOR_COLORS = {
+    'T-Mobile': 'pink',
+    'Orange': 'orange',
+    'Play': 'purple',
+    'Plus': 'green'
+}
+
+SITES_VERSION = 1
+
+
+def render_site_icon_html(operators, operator_colors=SITE_OPERATOR_COLORS):
+    """
+    Tworzy HTML ikony lokalizacji z paskami w kolorach operatorów.
+
+    Args:
+        operators (list): Operatorzy w kolejności wyświetlania.
+        operator_colors (dict): Słownik mapujący operatorów na kolory.
+
+    Returns:
+        str: HTML ikony dla folium.DivIcon.
+    """
+    color_blocks = [
+        f'<div style="flex: 1; background-color: {operator_colors.get(operator, "blue")};"></div>'
+        for operator in operators
+    ]
+    return f'''
+                <div style="width: 30px; height: 30px; display: flex; border-radius: 50%; border: 2px solid #000;">
+                    {''.join(color_blocks)}
+                </div>
+            '''
+
+
+def assign_site_ids(df):
+    """
+    Nadaje każdemu wierszowi numer fizycznej lokalizacji (unikalna para LATIuke, LONGuke).
+
+    Numery są nadawane w kolejności sortowania współrzędnych, tak jak w groupby.
+
+    Args:
+        df (pd.DataFrame): Tabela nadajników.
+
+    Returns:
+        np.ndarray: Numery lokalizacji (int32, -1 dla brakujących współrzędnych).
+    """
+    codes = df.groupby(['LATIuke', 'LONGuke'], sort=True).ngroup().to_numpy()
+    return codes.astype(np.int32)
+
+
+def build_site_table(df, site_ids):
+    """
+    Agreguje tabelę nadajników do jednej pozycji na fizyczną lokalizację.
+
+    Dla każdej lokalizacji zapisywane są: operatorzy (kolejność wystąpienia, używana
+    przy rysowaniu azymutów), StationId, opis pasm i standardów dla każdego operatora
+    oraz gotowy HTML podpowiedzi i ikony.
+
+    Args:
+        df (pd.DataFrame): Tabela nadajników.
+        site_ids (np.ndarray): Numery lokalizacji z assign_site_ids.
+
+    Returns:
+        pd.DataFrame: Tabela lokalizacji indeksowana numerem lokalizacji.
+    """
+    # Sortowanie stabilne zachowuje kolejność wystąpienia wierszy w ramach lokalizacji
+    order = np.argsort(site_ids, kind='stable')
+    order = order[site_ids[order] >= 0]
+    columns = zip(
+        site_ids[order].tolist(),
+        df['siec_id'].astype(str).to_numpy()[order].tolist(),
+        df['StationId'].astype(str).to_numpy()[order].tolist(),
+        df['pasmo'].astype(str).to_numpy()[order].tolist(),
+        df['standard'].astype(str).to_numpy()[order].tolist(),
+    )
+    lats = df['LATIuke'].to_numpy()
+    lons = df['LONGuke'].to_numpy()
+
+    records = {
+        'site_id': [], 'LATIuke': [], 'LONGuke': [], 'operators': [], 'station_ids': [],
+        'tooltip_operators': [], 'band_summary': [], 'tooltip': [],
+    }
+
+    def flush(site_id, first_row, operators, station_ids, bands):
+        # Opis "pasmo (standardy)" dla każdego operatora, jak w dotychczasowym tooltipie
+        tooltip_operators = sorted(bands)
+        summary = [
+            '; '.join(f"{band} ({', '.join(standards)})" for band, standards in sorted(bands[operator].items()))
+            for operator in tooltip_operators
+        ]
+        records['site_id'].append(site_id)
+        records['LATIuke'].append(lats[first_row])
+        records['LONGuke'].append(lons[first_row])
+        records['operators'].append(operators)
+        records['station_ids'].append(station_ids)
+        records['tooltip_operators'].append(tooltip_operators)
+        records['band_summary'].append(summary)
+        records['tooltip'].append('<br>'.join(
+            f"{operator}: {detail}" for operator, detail in zip(tooltip_operators, summary)
+        ))
+
+    current = None
+    for row, (site_id, operator, station_id, band, standard) in zip(order.tolist(), columns):
+        if site_id != current:
+            if current is not None:
+                flush(current, first_row, operators, station_ids, bands)
+            current, first_row = site_id, row
+            operators, station_ids, bands = [], [], {}
+        if operator not in bands:
+            operators.append(operator)
+            bands[operator] = {}
+        if station_id not in station_ids:
+            station_ids.append(station_id)
+        standards = bands[operator].setdefault(band, [])
+        if standard not in standards:
+            standards.append(standard)
+    if current is not None:
+        flush(current, first_row, operators, station_ids, bands)
+
+    sites = pd.DataFrame(records).set_index('site_id')
+    sites['LATIuke'] = sites['LATIuke'].astype(np.float32)
+    sites['LONGuke'] = sites['LONGuke'].astype(np.float32)
+    sites['icon_html'] = sites['tooltip_operators'].map(render_site_icon_html)
+    sites['station_id'] = sites['station_ids'].str[0]
+    return sites
+
+
+def save_site_table(sites, site_ids, directory):
+    """
+    Zapisuje numery lokalizacji i tabelę lokalizacji w katalogu cache.
+
+    Args:
+        sites (pd.DataFrame): Tabela z build_site_table.
+        site_ids (np.ndarray): Numery lokalizacji dla wierszy tabeli nadajników.
+        directory (str): Katalog cache.
+    """
+    np.save(os.path.join(directory, f'site_id_v{SITES_VERSION}.npy'), site_ids)
+    records = {
+        column: sites[column].tolist()
+        for column in ['LATIuke', 'LONGuke', 'operators', 'station_ids', 'tooltip_operators', 'band_summary', 'tooltip']
+    }
+    tmp_path = os.path.join(directory, f'sites_v{SITES_VERSION}.json.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(directory, f'sites_v{SITES_VERSION}.json'))
+
+
+def load_site_table(directory, n_rows):
+    """
+    Wczytuje zapisaną tabelę lokalizacji z katalogu cache.
+
+    Args:
+        directory (str): Katalog cache.
+        n_rows (int): Oczekiwana liczba wierszy tabeli nadajników.
+
+    Returns:
+        tuple: (site_ids, sites) lub (None, None), gdy brak aktualnych plików.
+    """
+    try:
+        site_ids = np.load(os.path.join(directory, f'site_id_v{SITES_VERSION}.npy'))
+        with open(os.path.join(directory, f'sites_v{SITES_VERSION}.json'), encoding='utf-8') as f:
+            records = json.load(f)
+    except (OSError, ValueError):
+        return None, None
+    if len(site_ids) != n_rows:
+        return None, None
+
+    sites = pd.DataFrame(records)
+    sites['LATIuke'] = sites['LATIuke'].astype(np.float32)
+    sites['LONGuke'] = sites['LONGuke'].astype(np.float32)
+    sites['icon_html'] = sites['tooltip_operators'].map(render_site_icon_html)
+    sites['station_id'] = sites['station_ids'].str[0]
+    sites.index.name = 'site_id'
+    return site_ids, sites
+
+
+def site_table_for(df, cache_directory=None):
+    """
+    Zwraca numery lokalizacji i tabelę lokalizacji, korzystając z cache, jeśli to możliwe.
+
+    Args:
+        df (pd.DataFrame): Tabela nadajników.
+        cache_directory (str): Katalog cache kolumnowego (opcjonalnie).
+
+    Returns:
+        tuple: (site_ids, sites).
+    """
+    if cache_directory and os.path.isdir(cache_directory):
+        site_ids, sites = load_site_table(cache_directory, len(df))
+        if sites is not None:
+            return site_ids, sites
+
+    logging.info("Budowanie tabeli lokalizacji nadajników")
+    site_ids = assign_site_ids(df)
+    sites = build_site_table(df, site_ids)
+    if cache_directory and os.path.isdir(cache_directory):
+        try:
+            save_site_table(sites, site_ids, cache_directory)
+        except OSError as e:
+            logging.warning(f"Nie udało się zapisać tabeli lokalizacji: {e}")
+    return site_ids, sites
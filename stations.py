@@ -0,0 +1,405 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from geo import SpatialIndex
+from metrics import METRICS
+from sites import site_table_for
+
+# Kolumny bazy UKE używane przez aplikację
+STATION_COLUMNS = ['siec_id', 'LONGuke', 'LATIuke', 'StationId', 'wojewodztwo_id', 'pasmo', 'standard']
+STRING_COLUMNS = ['siec_id', 'StationId', 'wojewodztwo_id', 'pasmo', 'standard']
+FLOAT_COLUMNS = ['LONGuke', 'LATIuke']
+
+CACHE_VERSION = 2
+
+
+def read_stations_csv(csv_path):
+    """
+    Wczytuje bazę nadajników z pliku CSV UKE (separator ';').
+
+    Args:
+        csv_path (str): Ścieżka do pliku CSV.
+
+    Returns:
+        pd.DataFrame: Dane nadajników.
+    """
+    return pd.read_csv(
+        csv_path,
+        delimiter=';',
+        encoding='utf-8-sig',
+        usecols=STATION_COLUMNS,
+        dtype={
+            'siec_id': str,
+            'LONGuke': float,
+            'LATIuke': float,
+            'StationId': str,
+            'wojewodztwo_id': str,
+            'pasmo': str,
+            'standard': str
+        }
+    )[STATION_COLUMNS]
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """
+    Oblicza skrót SHA-256 zawartości pliku.
+
+    Args:
+        path (str): Ścieżka do pliku.
+        chunk_size (int): Rozmiar czytanego bloku w bajtach.
+
+    Returns:
+        str: Skrót w postaci szesnastkowej.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_dir_for(csv_path):
+    """
+    Zwraca katalog cache kolumnowego dla pliku CSV.
+    """
+    return csv_path + '.cache'
+
+
+def write_cache(df, csv_path, content_hash=None):
+    """
+    Zapisuje dane nadajników jako katalog tablic NumPy (po jednej na kolumnę).
+
+    Kolumny tekstowe są kodowane słownikowo: kody int32 w pliku .npy i lista
+    wartości w meta.json. Brakujące wartości mają kod -1. Współrzędne są zapisywane
+    jako float32, tak jak w compact_station_table, więc wczytana tabela nie wymaga konwersji.
+
+    Args:
+        df (pd.DataFrame): Dane wczytane przez read_stations_csv.
+        csv_path (str): Ścieżka pliku CSV, z którego pochodzą dane.
+        content_hash (str): Skrót zawartości CSV (liczony, jeśli nie podano).
+    """
+    stat = os.stat(csv_path)
+    cache_dir = cache_dir_for(csv_path)
+    tmp_dir = cache_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    dictionaries = {}
+    for column in STATION_COLUMNS:
+        if column in STRING_COLUMNS:
+            codes, categories = pd.factorize(df[column])
+            np.save(os.path.join(tmp_dir, f'{column}.npy'), codes.astype(np.int32))
+            dictionaries[column] = categories.tolist()
+        else:
+            np.save(os.path.join(tmp_dir, f'{column}.npy'), df[column].to_numpy(dtype=np.float32))
+
+    meta = {
+        'version': CACHE_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': content_hash or file_hash(csv_path),
+        'rows': len(df),
+        'dictionaries': dictionaries,
+    }
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    os.replace(tmp_dir, cache_dir)
+    logging.info(f"Zapisano cache kolumnowy {cache_dir} ({len(df)} wierszy)")
+
+
+def _read_meta(cache_dir):
+    with open(os.path.join(cache_dir, 'meta.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def cache_is_valid(csv_path):
+    """
+    Sprawdza, czy cache odpowiada bieżącej zawartości pliku CSV.
+
+    Zgodny rozmiar i czas modyfikacji wystarczają. Gdy zmienił się tylko czas
+    modyfikacji, porównywany jest skrót zawartości i przy zgodności meta.json
+    jest aktualizowany, bez ponownej konwersji.
+
+    Args:
+        csv_path (str): Ścieżka pliku CSV.
+
+    Returns:
+        tuple: (bool, str | None) - czy cache jest aktualny i obliczony skrót CSV (jeśli liczono).
+    """
+    cache_dir = cache_dir_for(csv_path)
+    try:
+        meta = _read_meta(cache_dir)
+    except (OSError, ValueError):
+        return False, None
+
+    stat = os.stat(csv_path)
+    if meta.get('version') != CACHE_VERSION or meta.get('size') != stat.st_size:
+        return False, None
+    if meta.get('mtime_ns') == stat.st_mtime_ns:
+        return True, None
+
+    content_hash = file_hash(csv_path)
+    if content_hash != meta.get('sha256'):
+        return False, content_hash
+
+    meta['mtime_ns'] = stat.st_mtime_ns
+    with open(os.path.join(cache_dir, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    return True, content_hash
+
+
+def read_cache(csv_path):
+    """
+    Wczytuje dane nadajników z cache kolumnowego.
+
+    Kolumny liczbowe są mapowane z dysku (mmap) bez kopiowania, a tekstowe
+    wracają jako kategorie zbudowane bezpośrednio z zapisanych kodów.
+
+    Args:
+        csv_path (str): Ścieżka pliku CSV, dla którego utworzono cache.
+
+    Returns:
+        pd.DataFrame: Dane nadajników.
+    """
+    cache_dir = cache_dir_for(csv_path)
+    meta = _read_meta(cache_dir)
+    columns = {}
+    for column in STATION_COLUMNS:
+        values = np.load(os.path.join(cache_dir, f'{column}.npy'), mmap_mode='r')
+        if column in STRING_COLUMNS:
+            # Kody -1 oznaczają brak wartości (NaN)
+            columns[column] = pd.Categorical.from_codes(values, categories=meta['dictionaries'][column])
+        else:
+            columns[column] = values
+    return pd.DataFrame(columns, copy=False)
+
+
+def compact_station_table(df):
+    """
+    Zamienia tabelę nadajników na zwartą postać.
+
+    Kolumny tekstowe stają się kategoriami (kody całkowite + słownik, np. siec_id
+    ma kody int8), a współrzędne są zapisywane jako float32 (~0.5 m dokładności).
+    Kolumny, które mają już docelowy typ (np. z cache kolumnowego), nie są kopiowane,
+    więc tablice mapowane z dysku pozostają mapowane.
+
+    Args:
+        df (pd.DataFrame): Tabela nadajników.
+
+    Returns:
+        pd.DataFrame: Zwarta tabela nadajników.
+    """
+    columns = {}
+    for column in df.columns:
+        if column in STRING_COLUMNS:
+            columns[column] = df[column].astype('category', copy=False)
+        elif column in FLOAT_COLUMNS:
+            columns[column] = df[column].astype(np.float32, copy=False)
+        else:
+            columns[column] = df[column]
+    return pd.DataFrame(columns, copy=False)
+
+
+def memory_report(before, after):
+    """
+    Porównuje zużycie pamięci kolumn dwóch tabel.
+
+    Args:
+        before (pd.DataFrame): Tabela przed kompresją.
+        after (pd.DataFrame): Tabela po kompresji.
+
+    Returns:
+        dict: Bajty na kolumnę ('columns') oraz sumy ('total_before', 'total_after').
+    """
+    before_usage = before.memory_usage(deep=True, index=False)
+    after_usage = after.memory_usage(deep=True, index=False)
+    columns = {
+        column: {'before': int(before_usage.get(column, 0)), 'after': int(after_usage.get(column, 0))}
+        for column in before.columns
+    }
+    return {
+        'rows': len(before),
+        'columns': columns,
+        'total_before': int(before_usage.sum()),
+        'total_after': int(after_usage.sum()),
+    }
+
+
+def load_stations(csv_path):
+    """
+    Wczytuje bazę nadajników, korzystając z cache kolumnowego, jeśli jest aktualny.
+
+    Przy braku lub nieaktualności cache dane są wczytywane z CSV, a cache jest
+    tworzony na nowo.
+
+    Args:
+        csv_path (str): Ścieżka do pliku CSV.
+
+    Returns:
+        pd.DataFrame: Dane nadajników.
+    """
+    valid, content_hash = cache_is_valid(csv_path)
+    if valid:
+        try:
+            df = read_cache(csv_path)
+            METRICS.cache_result('stations', 'hit')
+            return df
+        except (OSError, ValueError, KeyError) as e:
+            logging.warning(f"Nie udało się wczytać cache dla {csv_path}, wczytywanie CSV: {e}")
+
+    METRICS.cache_result('stations', 'miss')
+
+    df = read_stations_csv(csv_path)
+    try:
+        write_cache(df, csv_path, content_hash)
+    except OSError as e:
+        logging.warning(f"Nie udało się zapisać cache dla {csv_path}: {e}")
+    return df
+
+
+StationData = namedtuple('StationData', ['df', 'index', 'lats', 'lons', 'sites'])
+
+
+class StationStore:
+    """
+    Współdzielona, bezpieczna wątkowo baza nadajników.
+
+    Tabela, indeks przestrzenny i tabela lokalizacji są wczytywane leniwie przy pierwszym zapytaniu
+    i trzymane w pamięci przez cały czas działania programu. Zmiana pliku CSV
+    (rozmiar lub czas modyfikacji) powoduje ponowne wczytanie. Zwracane ramki
+    są wycinkami tabeli i nie powinny być modyfikowane w miejscu.
+    """
+
+    def __init__(self, csv_path):
+        self.csv_path = csv_path
+        self._lock = threading.Lock()
+        self._state = None
+        self._source_stat = None
+
+    def _current_stat(self):
+        stat = os.stat(self.csv_path)
+        return stat.st_size, stat.st_mtime_ns
+
+    def _ensure_loaded(self):
+        with self._lock:
+            stat = self._current_stat()
+            if self._state is not None and stat == self._source_stat:
+                return self._state
+            with METRICS.span('load'):
+                df = compact_station_table(load_stations(self.csv_path))
+                logging.info(f"Kolumny w CSV: {df.columns.tolist()}")
+                lats = df['LATIuke'].to_numpy()
+                lons = df['LONGuke'].to_numpy()
+                index = SpatialIndex.for_csv(self.csv_path, lats, lons)
+                cache_directory = cache_dir_for(self.csv_path) if cache_is_valid(self.csv_path)[0] else None
+                site_ids, sites = site_table_for(df, cache_directory)
+                df['site_id'] = site_ids
+            # Jedna krotka podmieniana atomowo, aby zapytania nie mieszały starych i nowych danych
+            self._state = StationData(df, index, lats, lons, sites)
+            self._source_stat = stat
+            logging.info(f"Wczytano bazę nadajników: {len(df)} wierszy")
+            return self._state
+
+    def load(self):
+        """
+        Wymusza wczytanie tabeli (np. przy starcie programu).
+
+        Returns:
+            pd.DataFrame: Pełna tabela nadajników.
+        """
+        return self._ensure_loaded().df
+
+    def query_radius(self, location, radius_km):
+        """
+        Zwraca nadajniki w promieniu od lokalizacji.
+
+        Args:
+            location (tuple): Współrzędne (lat, lon).
+            radius_km (float): Promień w kilometrach.
+
+        Returns:
+            pd.DataFrame: Nadajniki w promieniu.
+        """
+        df, index, lats, lons, _ = self._ensure_loaded()
+        return df.iloc[index.query_radius(location, radius_km, lats, lons)]
+
+    def query_bbox(self, min_lat, max_lat, min_lon, max_lon):
+        """
+        Zwraca nadajniki w prostokącie współrzędnych.
+
+        Args:
+            min_lat (float): Minimalna szerokość geograficzna.
+            max_lat (float): Maksymalna szerokość geograficzna.
+            min_lon (float): Minimalna długość geograficzna.
+            max_lon (float): Maksymalna długość geograficzna.
+
+        Returns:
+            pd.DataFrame: Nadajniki w prostokącie.
+        """
+        df, index, all_lats, all_lons, _ = self._ensure_loaded()
+        candidates = np.sort(index.candidates_in_bbox(min_lat, max_lat, min_lon, max_lon))
+        lats = all_lats[candidates]
+        lons = all_lons[candidates]
+        mask = (lats >= min_lat) & (lats <= max_lat) & (lons >= min_lon) & (lons <= max_lon)
+        return df.iloc[candidates[mask]]
+
+    def query(self, operator=None, band=None, standard=None, df=None):
+        """
+        Filtruje nadajniki po operatorze, paśmie i standardzie.
+
+        Args:
+            operator (str | list): Operator (siec_id) lub lista operatorów.
+            band (str | list): Pasmo lub lista pasm.
+            standard (str | list): Standard lub lista standardów.
+            df (pd.DataFrame): Ramka do przefiltrowania (domyślnie cała tabela).
+
+        Returns:
+            pd.DataFrame: Przefiltrowane nadajniki.
+        """
+        if df is None:
+            df = self.load()
+        mask = np.ones(len(df), dtype=bool)
+        for column, value in (('siec_id', operator), ('pasmo', band), ('standard', standard)):
+            if value is None:
+                continue
+            values = [value] if isinstance(value, str) else list(value)
+            mask &= df[column].isin(values).to_numpy()
+        return df[mask]
+
+    def by_station_ids(self, station_ids):
+        """
+        Zwraca wiersze dla podanych StationId.
+
+        Args:
+            station_ids (iterable): Lista StationId.
+
+        Returns:
+            pd.DataFrame: Wiersze pasujących stacji.
+        """
+        df = self.load()
+        return df[df['StationId'].isin([str(station_id) for station_id in station_ids]).to_numpy()]
+
+    def sites_for(self, df):
+        """
+        Zwraca zagregowane lokalizacje dla wierszy zwróconych przez zapytanie.
+
+        Args:
+            df (pd.DataFrame): Wynik zapytania (musi zawierać kolumnę site_id).
+
+        Returns:
+            pd.DataFrame: Lokalizacje posortowane według współrzędnych.
+        """
+        sites = self._ensure_loaded().sites
+        with METRICS.span('aggregation'):
+            site_ids = np.unique(df['site_id'].to_numpy())
+            return sites.iloc[site_ids[site_ids >= 0]]
@@ -0,0 +1,60 @@
+import io
+import os
+import sys
+
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from si2pem import HttpClient  # noqa: E402
+
+URL = 'https://example.test/plik.pdf'
+
+
+class FakeSession:
+    """
+    Sesja zwracająca przygotowane odpowiedzi lub zgłaszająca przygotowany wyjątek.
+    """
+
+    def __init__(self, result):
+        self.result = result
+
+    def get(self, url, **kwargs):
+        if isinstance(self.result, Exception):
+            raise self.result
+        response = requests.Response()
+        response.status_code = self.result
+        response.raw = io.BytesIO(b"%PDF")
+        return response
+
+
+def client_with(result):
+    http = HttpClient(rate_limit=0, max_retries=0)
+    http.session = FakeSession(result)
+    return http
+
+
+def in_flight(http):
+    return http._limits_for(URL).concurrency._in_flight
+
+
+def test_unexpected_exception_releases_slot():
+    http = client_with(ValueError('błąd'))
+    with pytest.raises(ValueError):
+        http.get(URL)
+    assert in_flight(http) == 0
+
+
+def test_stream_response_holds_slot_until_closed():
+    http = client_with(200)
+    response = http.get(URL, stream=True)
+    assert in_flight(http) == 1
+    response.close()
+    response.close()
+    assert in_flight(http) == 0
+
+
+def test_failed_stream_response_releases_slot():
+    http = client_with(503)
+    http.get(URL, stream=True)
+    assert in_flight(http) == 0
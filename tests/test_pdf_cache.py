@@ -0,0 +1,44 @@
+import io
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pdf_cache import PdfCache  # noqa: E402
+
+
+class FakeHttp:
+    """
+    Klient HTTP zwracający dla każdego URL-a osobny, kompletny plik PDF.
+    """
+
+    def get(self, url, **kwargs):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(b'%PDF-1.4\n' + url.encode() * 40 + b'\n%%EOF\n')
+        return response
+
+
+def make_cache(tmp_path):
+    # Limit mieści tylko jeden plik
+    return PdfCache(str(tmp_path), FakeHttp(), max_bytes=1500)
+
+
+def test_store_evicts_least_recently_used(tmp_path):
+    cache = make_cache(tmp_path)
+    first = cache.get('https://example.test/a.pdf')
+    second = cache.get('https://example.test/b.pdf')
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+
+
+def test_deferred_eviction_keeps_files_until_run_ends(tmp_path):
+    cache = make_cache(tmp_path)
+    with cache.deferred_eviction():
+        first = cache.get('https://example.test/a.pdf')
+        second = cache.get('https://example.test/b.pdf')
+        assert os.path.exists(first) and os.path.exists(second)
+    assert not os.path.exists(first)
+    assert os.path.exists(second)
+    assert cache.get('https://example.test/b.pdf') == second
@@ -0,0 +1,48 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.si2pem_fixture import make_report_pdf  # noqa: E402
+from pdf_extract import TIER_WORDS, extract_azimuths_from_words, extract_information_for_stations  # noqa: E402
+
+
+def word(text, x0, top, width=30, height=10):
+    return {'text': text, 'x0': x0, 'x1': x0 + width, 'top': top, 'bottom': top + height}
+
+
+def table_words(azimuths):
+    """
+    Słowa tabeli z kolumnami Sektor i Azymut H [°]; None to pusta komórka azymutu.
+    """
+    words = [word('Sektor', 50, 100), word('Azymut', 150, 100), word('H', 183, 100, 8), word('[°]', 193, 100, 12)]
+    for row, azimuth in enumerate(azimuths):
+        top = 120 + row * 18
+        words.append(word(str(row + 1), 50, top, 8))
+        if azimuth is not None:
+            words.append(word(azimuth, 155, top, 22))
+    return words
+
+
+def test_words_tier_reads_whole_column():
+    assert extract_azimuths_from_words(table_words(['120°', '240°', '360°'])) == ['120°', '240°', '360°']
+
+
+def test_words_tier_rejects_column_with_dash_gap():
+    assert extract_azimuths_from_words(table_words(['120°', '-', '240°'])) is None
+
+
+def test_words_tier_rejects_column_with_blank_gap():
+    assert extract_azimuths_from_words(table_words(['120°', None, '240°'])) is None
+
+
+def test_words_tier_stops_at_text_below_table():
+    words = table_words(['10°', '130°']) + [word('Uwagi', 150, 200)]
+    assert extract_azimuths_from_words(words) == ['10°', '130°']
+
+
+def test_report_pdf_uses_words_tier(tmp_path):
+    pdf_path = tmp_path / 'raport.pdf'
+    pdf_path.write_bytes(make_report_pdf(['100001', '100002'], [0, 120, 240]))
+    results = extract_information_for_stations(str(pdf_path), ['100001', '100002'])
+    assert [entry['Azymuts'] for entry in results] == [['0°', '120°', '240°']] * 2
+    assert {entry['Tier'] for entry in results} == {TIER_WORDS}